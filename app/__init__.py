@@ -3,8 +3,11 @@ from flask_login import current_user
 from app.models import User
 from app.extensions import app, login_manager, db
 from app.routes import blueprints
+from app.commands import commands
 from app.utils.converters import MediaTypeConverter
 from app.services.db import get_user_pfp
+from app.services.season_scanner import new_season_task
+from app.services.change_feed import change_feed
 
 
 @login_manager.user_loader
@@ -16,6 +19,13 @@ def unauthorized():
     """Handle unauthorized access by redirecting to login with next parameter"""
     return redirect(url_for('auth.login', next=request.endpoint))
 
+@app.before_request
+def start_background_jobs():
+    """Start this worker's periodic jobs on its first request (no-op afterwards)"""
+    change_feed.start()
+    if app.config["NEW_SEASON_SCAN_ENABLED"]:
+        new_season_task.start()
+
 @app.context_processor
 def inject_user_pfp():
     """Make has_pfp available in all templates"""
@@ -23,6 +33,11 @@ def inject_user_pfp():
         return {'has_pfp': get_user_pfp(current_user.id) is not None}
     return {'has_pfp': False}
 
+@app.template_global()
+def tmdb_image(path, size):
+    """URL of a TMDB poster/backdrop served by the local image proxy"""
+    return url_for('images.tmdb_image', size=size, filename=path.lstrip('/'))
+
 def create_app():
     # app is already created in extensions.py
 
@@ -33,6 +48,10 @@ def create_app():
     for bp in blueprints:
         app.register_blueprint(bp)
 
+    # Register CLI commands (flask catalog ...)
+    for command in commands:
+        app.cli.add_command(command)
+
     # Create tables if they don't exist
     with app.app_context():
         db.create_all()
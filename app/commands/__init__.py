@@ -0,0 +1,5 @@
+from app.commands.catalog import catalog_cli
+from app.commands.series import series_cli
+from app.commands.library import library_cli
+
+commands = [catalog_cli, series_cli, library_cli]
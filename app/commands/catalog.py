@@ -0,0 +1,50 @@
+import click
+from flask.cli import AppGroup
+from app.exceptions import CatalogImportError
+from app.services.catalog_import import import_export, load_progress, progress_path
+from app.services.db import count_catalog_titles
+# Constants
+from app.constants import CATALOG_BATCH_SIZE
+
+catalog_cli = AppGroup("catalog", help="Local catalog of TMDB ids.")
+
+
+@catalog_cli.command("import")
+@click.argument("paths", nargs=-1, required=True, type=click.Path(exists=True, dir_okay=False))
+@click.option("--media-type", type=click.Choice(["movie", "tv"]), default=None,
+              help="Media type of the files (default: detected from the file name).")
+@click.option("--batch-size", type=click.IntRange(min=1), default=CATALOG_BATCH_SIZE, show_default=True,
+              help="Rows per upsert.")
+@click.option("--restart", is_flag=True, help="Ignore saved progress and import from the first line.")
+def import_command(paths, media_type, batch_size, restart):
+    """
+    Import TMDB daily export files (movie_ids_*.json.gz, tv_series_ids_*.json.gz).
+
+    Files are streamed, so memory use doesn't grow with their size. Progress is
+    saved after each batch in <file>.progress; run the command again to resume
+    an interrupted import.
+    """
+    for path in paths:
+        saved = load_progress(path)
+        if saved["done"] and not restart:
+            click.echo(f"{path}: already imported ({saved['rows']:,} rows); use --restart to import it again")
+            continue
+        click.echo(f"Importing {path}")
+
+        def report(progress, fraction, rate):
+            click.echo(f"  {progress['rows']:>10,} rows  {fraction:6.1%}  {rate:>8,.0f} rows/s", err=True)
+
+        try:
+            progress = import_export(path, media_type, batch_size, resume=not restart, on_progress=report)
+        except CatalogImportError as e:
+            raise click.ClickException(f"{e} (progress saved in {progress_path(path)}; run again to resume)")
+
+        click.echo(f"  done: {progress['rows']:,} rows, {progress['skipped']:,} malformed lines skipped, {progress['seconds']}s")
+
+
+@catalog_cli.command("stats")
+def stats_command():
+    """Show how many titles the catalog holds."""
+    for media_type in ("movie", "tv"):
+        count = count_catalog_titles(media_type)
+        click.echo(f"{media_type}: {count:,}" if count is not None else f"{media_type}: unavailable")
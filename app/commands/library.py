@@ -0,0 +1,22 @@
+import click
+from flask.cli import AppGroup
+from app.services.library_pages import backfill_sort_keys
+# Constants
+from app.constants import LIBRARY_SORT_BACKFILL_BATCH
+
+library_cli = AppGroup("library", help="Users' watched and watchlist lists.")
+
+
+@library_cli.command("backfill-sort-keys")
+@click.option("--batch-size", type=click.IntRange(min=1), default=LIBRARY_SORT_BACKFILL_BATCH, show_default=True,
+              help="List rows read and given sort keys per batch.")
+def backfill_sort_keys_command(batch_size):
+    """
+    Give the title/year sort keys to list rows added before they existed.
+
+    Titles are read from the title cache and title_metadata first, so only the
+    ones never seen by the app are fetched from TMDB. Safe to run again; rows
+    whose title couldn't be fetched are left for the next run.
+    """
+    stats = backfill_sort_keys(batch_size)
+    click.echo(f"{stats['rows']:,} list rows without sort keys, {stats['filled']:,} filled")
@@ -0,0 +1,23 @@
+import click
+from flask.cli import AppGroup
+from app.services.season_scanner import scan_new_seasons
+# Constants
+from app.constants import SEASON_SCAN_BATCH
+
+series_cli = AppGroup("series", help="Series progress maintenance.")
+
+
+@series_cli.command("scan-new-seasons")
+@click.option("--batch-size", type=click.IntRange(min=1), default=SEASON_SCAN_BATCH, show_default=True,
+              help="Series fetched concurrently and flagged per transaction.")
+def scan_new_seasons_command(batch_size):
+    """
+    Flag series with a newly aired season and notify their users.
+
+    Runs the same scan as the periodic job (see NEW_SEASON_SCAN_ENABLED); safe
+    to run again, users are only notified once per season.
+    """
+    stats = scan_new_seasons(batch_size)
+    click.echo(f"{stats['series']:,} series checked, {stats['flagged']:,} with a new season, {stats['notified']:,} users notified")
+    if stats["failed"]:
+        raise click.ClickException(f"{stats['failed']} batches could not be written; run again to retry them")
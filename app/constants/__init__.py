@@ -2,4 +2,5 @@ from .app_constants import *
 from .title_constants import *
 from .user_constants import *
 from .watchlist_constants import *
-from .search_constants import *
\ No newline at end of file
+from .search_constants import *
+from .api_constants import *
\ No newline at end of file
@@ -0,0 +1,84 @@
+# Connection pool (one per worker process)
+TMDB_POOL_LIMIT = 100           # Total simultaneous connections
+TMDB_POOL_LIMIT_PER_HOST = 30   # Simultaneous connections to api.themoviedb.org
+TMDB_DNS_CACHE_TTL = 300        # Seconds a resolved address is reused
+TMDB_KEEPALIVE_TIMEOUT = 30     # Seconds an idle connection is kept open
+
+# Response cache (seconds a cached TMDB payload is served without a refresh)
+TMDB_CACHE_TTLS = {
+    "lists": 60 * 60,               # trending / popular / top_rated
+    "details": 24 * 60 * 60,        # /movie/{id}, /tv/{id} (edits are evicted earlier by the changes feed)
+    "external_ids": 24 * 60 * 60,   # imdb ids practically never change
+    "related": 6 * 60 * 60,         # similar / recommendations
+    "search": 10 * 60,              # search result pages (prefetched ahead of the user)
+}
+TMDB_CACHE_STALE_TTL = 24 * 60 * 60     # Extra seconds an expired entry is served while refreshing
+TMDB_CACHE_MAX_BYTES = 64 * 1024 * 1024 # Upper bound on cached response bodies
+
+# Persistent title metadata store (title_metadata table)
+TITLE_METADATA_TTL = 14 * 24 * 60 * 60 # Seconds before a stored title record is refetched (edited titles are expired by the changes feed)
+
+# Rate limiting (shared by every TMDB call in a worker)
+TMDB_RATE_BURST = 20            # Tokens the bucket can hold
+TMDB_RATE_MIN = 2.0             # Floor (requests/s) for multiplicative decrease
+TMDB_RATE_INCREASE = 0.5        # Requests/s regained per successful response
+TMDB_RATE_DECREASE = 0.5        # Factor applied to the rate on a 429
+TMDB_MAX_CONCURRENCY = 20       # Simultaneous upstream requests
+TMDB_THROTTLE_RETRIES = 3       # Times a 429 is retried before giving up
+TMDB_DEFAULT_RETRY_AFTER = 1.0  # Pause (s) after a 429 without a Retry-After header
+
+# Deadlines (seconds for a whole call, retries included, by cache class;
+# classes without an entry, like search, use the default)
+TMDB_TIMEOUTS = {
+    "lists": 6.0,
+    "details": 6.0,
+    "external_ids": 4.0,
+    "related": 6.0,
+}
+TMDB_DEFAULT_TIMEOUT = 6.0
+TMDB_ATTEMPT_TIMEOUT = 2.5      # Cap for a single attempt within the deadline
+TMDB_CONNECT_TIMEOUT = 1.5
+
+# Retries for timeouts, connection errors and 5xx (all TMDB calls are idempotent GETs)
+TMDB_MAX_RETRIES = 2
+TMDB_RETRY_BASE_DELAY = 0.2     # Backoff doubles per attempt, with full jitter
+TMDB_RETRY_MAX_DELAY = 2.0
+
+# Circuit breaker
+TMDB_BREAKER_FAILURE_THRESHOLD = 5  # Consecutive failed requests before opening
+TMDB_BREAKER_RESET_TIMEOUT = 30.0   # Seconds open before a probe request is allowed
+
+# Image proxy (see app/services/image_proxy.py)
+IMAGE_VARIANT_WIDTHS = {        # Variants served by /images/<size>/<file>, by TMDB size name
+    "w185": 185,                # Search results
+    "w342": 342,                # Card grids (home, watched, watchlist)
+    "w500": 500,                # Title page poster
+    "w780": 780,
+    "w1280": 1280,              # Backdrops
+}
+IMAGE_SOURCE_SIZE = "original"  # Untouched rendition, fetched when TMDB has none of a variant's width
+IMAGE_MAX_AGE = 365 * 24 * 60 * 60  # TMDB image paths are content-specific, so variants never change
+IMAGE_JPEG_QUALITY = 82
+IMAGE_WEBP_QUALITY = 80
+IMAGE_FETCH_TIMEOUT = 10.0      # Seconds for one upstream image download
+IMAGE_MAX_BYTES = 20 * 1024 * 1024  # Largest upstream image accepted
+IMAGE_CACHE_PRUNE_TARGET = 0.9  # Pruning deletes the least recently used files down to this share of the cap
+IMAGE_TOUCH_INTERVAL = 24 * 60 * 60  # Seconds before a served file's mtime (its LRU age) is refreshed again
+IMAGE_CACHE_PRUNE_INTERVAL = 60  # Seconds between background checks of the cache against its cap
+IMAGE_CACHE_MEASURE_INTERVAL = 60 * 60  # Seconds before the cache is measured again (other workers' writes)
+
+# Title catalog import (TMDB daily id exports, see app/services/catalog_import.py)
+CATALOG_BATCH_SIZE = 10000      # Rows per multi-row upsert
+CATALOG_TITLE_MAX_LENGTH = 512  # title_catalog.title column size
+
+# TMDB changes feed (see app/services/change_feed.py)
+TMDB_CHANGES_POLL_INTERVAL = 10 * 60        # Seconds between polls of /movie/changes and /tv/changes
+TMDB_CHANGES_MAX_LOOKBACK = 24 * 60 * 60    # Furthest back a poll reads; records stored before that are expired wholesale
+TMDB_CHANGES_MAX_PAGES = 500                # Pages read per media type and poll (100 ids each)
+TMDB_CHANGES_EXPIRE_BATCH = 1000            # Ids per title_metadata UPDATE
+
+# Shared title cache (memory-mapped file used by every worker of a host, see app/services/shared_cache.py)
+SHARED_CACHE_SLOTS = 128 * 1024     # Fixed slots (the file is SLOTS * SLOT_SIZE bytes, 32 MB by default)
+SHARED_CACHE_SLOT_SIZE = 256        # Bytes per slot, header included; longer records aren't shared
+SHARED_CACHE_WAYS = 8               # Slots a title can live in (CLOCK eviction among them)
+SHARED_CACHE_READ_RETRIES = 3       # Rereads of a slot caught mid-write before it counts as a miss
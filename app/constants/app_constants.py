@@ -1,3 +1,11 @@
 from datetime import datetime
 
-CURRENT_YEAR = datetime.now().year
\ No newline at end of file
+CURRENT_YEAR = datetime.now().year
+
+# Home page snapshot (see app/services/home_snapshot.py)
+HOME_SNAPSHOT_REFRESH_INTERVAL = 10 * 60  # Seconds between background rebuilds
+HOME_SNAPSHOT_RETRY_DELAY = 5.0  # Seconds before a request retries a failed first build; doubles per failure
+HOME_SNAPSHOT_RETRY_MAX_DELAY = 120.0
+
+# Database calls made from coroutines (see app/services/async_db.py)
+DB_EXECUTOR_WORKERS = 8  # Threads per worker; keep below the SQLAlchemy pool size + overflow
@@ -15,4 +15,28 @@ ALLOWED_FIELDS_DETAILED = {
     "id", "title", "name", "overview", "poster_path",
     "media_type", "release_date", "first_air_date",
     "vote_average", "genre_ids", "backdrop_path", "original_language"
-}
\ No newline at end of file
+}
+
+# Search pagination (TMDB search pages hold 20 results)
+SEARCH_INITIAL_PAGES = 3    # Pages fetched concurrently for the search page
+SEARCH_MORE_PAGES = 2       # Pages fetched per "more results" request
+SEARCH_PREFETCH_PAGES = 2   # Pages warmed in the background after each batch
+SEARCH_MAX_PAGES = 20       # Deepest page served (TMDB's own limit is 500)
+
+# Local title index (see app/services/search_index.py)
+SEARCH_LOCAL_LIMIT = 8              # Local hits shown ahead of TMDB results
+SEARCH_INDEX_MIN_SIMILARITY = 0.3   # Trigram similarity (shared / all) for a fuzzy token match
+SEARCH_INDEX_MAX_FUZZY = 20         # Fuzzy candidate tokens considered per query token
+SEARCH_INDEX_SYNC_INTERVAL = 5 * 60 # Seconds between syncs from title_metadata (picks up other workers' writes)
+SEARCH_INDEX_BUILD_BATCH = 1000     # Rows per title_metadata page while syncing
+SEARCH_INDEX_BACKFILL_BATCH = 50    # Titles fetched from TMDB per batch for user lists without metadata
+
+# Search suggestions (see app/services/suggest.py)
+SUGGEST_LIMIT = 8                   # Suggestions per prefix (also kept per trie node)
+SUGGEST_MAX_WORD_STARTS = 4         # Words of a title a prefix can start at ("knight" finds "The Dark Knight")
+SUGGEST_MIN_REMOTE_PREFIX = 3       # Shorter prefixes never go to TMDB
+SUGGEST_REMOTE_TIMEOUT = 1.5        # Seconds allowed for the TMDB fallback
+SUGGEST_CACHE_SIZE = 5000           # Prefixes whose TMDB fallback result is cached
+SUGGEST_CACHE_TTL = 10 * 60         # Seconds a cached fallback result is used
+SUGGEST_REFRESH_INTERVAL = 5 * 60   # Seconds between feeds from the home lists and the title index
+SUGGEST_RESPONSE_MAX_AGE = 5 * 60   # Browser cache for /search/suggest responses
@@ -31,4 +31,8 @@ GENRES_DEFAULT = {
     "Action", "Adventure", "Animation", "Comedy", "Crime", "Drama",
     "Family", "Fantasy", "History", "Horror", "Music", "Mystery",
     "Romance", "Sci-Fi", "Thriller", "War", "Western"
-}
\ No newline at end of file
+}
+
+# New season scan (see app/services/season_scanner.py)
+SEASON_SCAN_INTERVAL = 12 * 60 * 60 # Seconds between scans
+SEASON_SCAN_BATCH = 200             # Series fetched concurrently and flagged per transaction
@@ -10,3 +10,16 @@ NAME_PATTERN = rf"^(?=.{{{MIN_CHAR_NAME},{MAX_CHAR_NAME}}}$)[A-Za-zÀ-ÿ]+(?:\s+
 USERNAME_PATTERN = rf"^[a-zA-Z0-9_.]{{{MIN_CHAR_USERNAME},{MAX_CHAR_USERNAME}}}$"
 PASSWORD_PATTERN = rf"^(?=.*[A-Z])(?=.*[a-z])(?=.*\d)[A-Za-z\d@$!%*?&]{{{MIN_CHAR_PASSWORD},{MAX_CHAR_PASSWORD}}}$"
 # EMAIL_PATTERN = r"^[a-zA-Z0-9_.+-]{1,64}@[a-zA-Z0-9-]{1,255}\.[a-zA-Z]{2,10}$"
+
+# Library membership cache (see app/services/db/membership.py)
+LIBRARY_CACHE_USERS = 1000  # Users whose seen/watchlist ids are kept in memory per worker
+LIBRARY_VERSION_CHECK_INTERVAL = 3.0  # Seconds a user's library version is trusted before it's read again
+
+# Library list pages (see app/services/library_pages.py)
+LIBRARY_PAGE_CACHE_SIZE = 5000  # Assembled watched/watchlist pages kept per worker
+LIBRARY_PAGE_CACHE_TTL = 60     # Seconds a page is served (writes in this worker drop it earlier)
+
+# Library list sort orders (see app/services/db/library.py) -> default direction
+LIBRARY_SORT_ORDERS = {"recent": "desc", "title": "asc", "year": "desc", "rating": "desc"}
+LIBRARY_SEEN_ONLY_SORTS = ("rating",)  # Only the watched lists have a user rating
+LIBRARY_SORT_BACKFILL_BATCH = 200  # List rows given sort keys per batch by "flask library backfill-sort-keys"
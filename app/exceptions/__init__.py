@@ -4,4 +4,5 @@ from .auth_exceptions import *
 from .search_exceptions import *
 from .watchlist_exceptions import *
 from .titles_exceptions import *
-from .http_exceptions import *
\ No newline at end of file
+from .http_exceptions import *
+from .api_exceptions import *
\ No newline at end of file
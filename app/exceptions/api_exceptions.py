@@ -0,0 +1,14 @@
+from .base_exceptions import MediaError
+
+class TMDBError(MediaError):
+    """Base exception for TMDB API errors."""
+    pass
+
+class TMDBUnavailable(TMDBError):
+    """Raised when TMDB is unreachable, keeps failing or the circuit breaker is open."""
+    pass
+
+
+class CatalogImportError(TMDBError):
+    """Raised when a TMDB export file can't be imported into the title catalog."""
+    pass
@@ -1,4 +1,8 @@
 from app.models.user import User
 from app.models.notifications import Notification
 from app.models.titles_seen import UserMoviesSeen, UserSeriesProgress
-from app.models.titles_watchlist import UserMoviesWatchlist, UserSeriesWatchlist
\ No newline at end of file
+from app.models.titles_watchlist import UserMoviesWatchlist, UserSeriesWatchlist
+from app.models.title_metadata import TitleMetadata
+from app.models.title_catalog import TitleCatalog
+from app.models.sync_state import SyncState
+from app.models.library_version import LibraryVersion
\ No newline at end of file
@@ -0,0 +1,12 @@
+from sqlalchemy import Integer, BigInteger
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.extensions import db
+
+
+class LibraryVersion(db.Model):
+    """Count of committed writes to each user's lists (user_id 0: writes to every user's), checked by the per-worker caches of those lists."""
+    __tablename__ = "library_versions"
+
+    user_id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=False)
+    version: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
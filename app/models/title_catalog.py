@@ -0,0 +1,23 @@
+from datetime import datetime
+from sqlalchemy import Integer, String, Float, Boolean, DateTime, Enum, Index, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.extensions import db
+from app.models.title_metadata import MEDIA_TYPES
+
+
+class TitleCatalog(db.Model):
+    """Every TMDB movie/series id with its original title, loaded from TMDB's daily export files."""
+    __tablename__ = "title_catalog"
+
+    media_type: Mapped[str] = mapped_column(Enum(*MEDIA_TYPES, name="title_media_type"), primary_key=True)
+    tmdb_id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    title: Mapped[str] = mapped_column(String(512), nullable=False)
+    popularity: Mapped[float] = mapped_column(Float, nullable=False, default=0)
+    adult: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now(), nullable=False)
+
+    __table_args__ = (
+        # Most popular titles first (warmers, local search)
+        Index("idx_title_catalog_popularity", "media_type", "popularity"),
+    )
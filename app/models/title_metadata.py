@@ -0,0 +1,18 @@
+from datetime import datetime
+from sqlalchemy import Integer, LargeBinary, DateTime, Enum, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.extensions import db
+
+# Media types stored in the metadata cache
+MEDIA_TYPES = ("movie", "tv")
+
+
+class TitleMetadata(db.Model):
+    """Projected TMDB record (ALLOWED_FIELDS_SEARCH) for a title, zlib-compressed JSON."""
+    __tablename__ = "title_metadata"
+
+    media_type: Mapped[str] = mapped_column(Enum(*MEDIA_TYPES, name="title_media_type"), primary_key=True)
+    tmdb_id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    payload: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)
+    fetched_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now(), nullable=False)
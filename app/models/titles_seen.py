@@ -1,5 +1,5 @@
 from datetime import datetime
-from sqlalchemy import Integer, Float, DateTime, ForeignKey, Enum, CheckConstraint, func
+from sqlalchemy import Integer, SmallInteger, String, Float, DateTime, ForeignKey, Enum, CheckConstraint, func
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.extensions import db
@@ -13,11 +13,17 @@ class UserMoviesSeen(db.Model):
     __table_args__ = (
         CheckConstraint("user_rating >= 0.0 AND user_rating <= 10.0", name="check_movie_rating_range"),
         db.Index("idx_user_movies_seen_pagination", "user_id", "updated_at", "api_movie_id"),
+        db.Index("idx_user_movies_seen_rating", "user_id", "user_rating", "api_movie_id"),
+        db.Index("idx_user_movies_seen_title", "user_id", "title_sort", "api_movie_id"),
+        db.Index("idx_user_movies_seen_year", "user_id", "release_year", "api_movie_id"),
     )
 
     user_id: Mapped[int] = mapped_column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
     api_movie_id: Mapped[int] = mapped_column(Integer, primary_key=True)
     user_rating: Mapped[float | None] = mapped_column(Float, nullable=True)
+    # Sort keys copied from the title's metadata (folded title, release year)
+    title_sort: Mapped[str | None] = mapped_column(String(255), nullable=True)
+    release_year: Mapped[int | None] = mapped_column(SmallInteger, nullable=True)
     updated_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now(), onupdate=func.now(), nullable=False)
 
 
@@ -26,6 +32,10 @@ class UserSeriesProgress(db.Model):
     __table_args__ = (
         CheckConstraint("user_rating >= 0.0 AND user_rating <= 10.0", name="check_series_rating_range"),
         db.Index("idx_user_series_progress_pagination", "user_id", "updated_at", "api_serie_id"),
+        db.Index("idx_user_series_progress_rating", "user_id", "user_rating", "api_serie_id"),
+        db.Index("idx_user_series_progress_title", "user_id", "title_sort", "api_serie_id"),
+        db.Index("idx_user_series_progress_year", "user_id", "release_year", "api_serie_id"),
+        db.Index("idx_user_series_progress_serie", "api_serie_id", "last_season_seen"),
     )
 
     user_id: Mapped[int] = mapped_column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
@@ -33,5 +43,8 @@ class UserSeriesProgress(db.Model):
     last_season_seen: Mapped[int | None] = mapped_column(Integer, default=1, nullable=True)
     status: Mapped[str | None] = mapped_column(Enum(*SERIES_STATUS_TYPES, name="series_status"), nullable=True)
     user_rating: Mapped[float | None] = mapped_column(Float, nullable=True)
+    # Sort keys copied from the title's metadata (folded title, release year)
+    title_sort: Mapped[str | None] = mapped_column(String(255), nullable=True)
+    release_year: Mapped[int | None] = mapped_column(SmallInteger, nullable=True)
     updated_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now(), onupdate=func.now(), nullable=False)
 
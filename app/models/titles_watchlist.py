@@ -1,5 +1,5 @@
 from datetime import datetime
-from sqlalchemy import Integer, DateTime, ForeignKey, func
+from sqlalchemy import Integer, SmallInteger, String, DateTime, ForeignKey, func
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.extensions import db
@@ -9,10 +9,15 @@ class UserMoviesWatchlist(db.Model):
     __tablename__ = "user_movies_watchlist"
     __table_args__ = (
         db.Index("idx_user_movies_watchlist_pagination", "user_id", "updated_at", "api_movie_id"),
+        db.Index("idx_user_movies_watchlist_title", "user_id", "title_sort", "api_movie_id"),
+        db.Index("idx_user_movies_watchlist_year", "user_id", "release_year", "api_movie_id"),
     )
 
     user_id: Mapped[int] = mapped_column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
     api_movie_id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    # Sort keys copied from the title's metadata (folded title, release year)
+    title_sort: Mapped[str | None] = mapped_column(String(255), nullable=True)
+    release_year: Mapped[int | None] = mapped_column(SmallInteger, nullable=True)
     updated_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now(), onupdate=func.now(), nullable=False)
 
 
@@ -20,8 +25,13 @@ class UserSeriesWatchlist(db.Model):
     __tablename__ = "user_series_watchlist"
     __table_args__ = (
         db.Index("idx_user_series_watchlist_pagination", "user_id", "updated_at", "api_serie_id"),
+        db.Index("idx_user_series_watchlist_title", "user_id", "title_sort", "api_serie_id"),
+        db.Index("idx_user_series_watchlist_year", "user_id", "release_year", "api_serie_id"),
     )
 
     user_id: Mapped[int] = mapped_column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
     api_serie_id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    # Sort keys copied from the title's metadata (folded title, release year)
+    title_sort: Mapped[str | None] = mapped_column(String(255), nullable=True)
+    release_year: Mapped[int | None] = mapped_column(SmallInteger, nullable=True)
     updated_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now(), onupdate=func.now(), nullable=False)
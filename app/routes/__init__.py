@@ -6,5 +6,6 @@ from app.routes.titles import titles_bp
 from app.routes.error_handler import error_handler_bp
 from app.routes.movies import movie_bp
 from app.routes.series import serie_bp
+from app.routes.images import images_bp
 
-blueprints = [main_bp, auth_bp, watchlist_bp, watched_bp, titles_bp, error_handler_bp, movie_bp, serie_bp]
\ No newline at end of file
+blueprints = [main_bp, auth_bp, watchlist_bp, watched_bp, titles_bp, error_handler_bp, movie_bp, serie_bp, images_bp]
\ No newline at end of file
@@ -0,0 +1,39 @@
+import re
+from flask import Blueprint, request, send_file, abort
+from app.services.image_proxy import get_image_proxy
+# Constants
+from app.constants import IMAGE_VARIANT_WIDTHS, IMAGE_SOURCE_SIZE, IMAGE_MAX_AGE
+
+images_bp = Blueprint("images", __name__)
+
+# TMDB image file names, e.g. "kqjL17yufvn9OVLyXYpvtyrFfak.jpg"
+FILENAME_RE = re.compile(r"^[A-Za-z0-9_-]{1,64}\.(jpg|jpeg|png)$")
+
+
+@images_bp.route("/images/<size>/<filename>", methods=["GET"])
+def tmdb_image(size, filename):
+    """Serve a TMDB poster/backdrop resized for `size`, from the local image cache."""
+    if (size not in IMAGE_VARIANT_WIDTHS and size != IMAGE_SOURCE_SIZE) or not FILENAME_RE.match(filename):
+        abort(404)
+
+    # Only an explicit entry: */* and image/* also match "image/webp" in accept_mimetypes
+    accept_webp = any(mimetype == "image/webp" and quality > 0 for mimetype, quality in request.accept_mimetypes)
+    proxy = get_image_proxy()
+    # A second pass when the cache was pruned between get() and opening the file: it's fetched again
+    for _ in range(2):
+        image = proxy.get(size, filename, accept_webp=accept_webp)
+        if image is None:
+            abort(404)
+        path, mimetype, etag = image
+        try:
+            response = send_file(path, mimetype=mimetype, etag=etag, max_age=IMAGE_MAX_AGE, conditional=True)
+            break
+        except FileNotFoundError:
+            continue
+    else:
+        abort(404)
+
+    response.cache_control.immutable = True
+    # The format depends on the Accept header
+    response.vary.add("Accept")
+    return response
@@ -1,15 +1,18 @@
-from flask import Blueprint, render_template, flash
+import hmac
+from flask import Blueprint, render_template, flash, jsonify, request
 from flask_login import current_user
-import asyncio
-from app.services.search_info import get_home_page_data
+from config import Config
+from app.services.home_snapshot import home_snapshot
+from app.services.api.tmdb_client import get_tmdb_client
+from app.services.api.circuit_breaker import CLOSED
+from app.services.shared_cache import shared_titles
 
 main_bp = Blueprint("main", __name__, template_folder="../templates/main")
 
 @main_bp.route("/")
 def home():
-    # Get home page data (trending, popular, top rated)
-    home_data = asyncio.run(get_home_page_data())
-    return render_template("home.html", page="home", **home_data)
+    # Precomputed home page data (trending, popular, top rated), refreshed in the background
+    return render_template("home.html", page="home", **home_snapshot.get())
 
 @main_bp.route("/about")
 def about():
@@ -17,4 +20,23 @@ def about():
 
 @main_bp.route("/privacy-policy")
 def privacy():
-    return render_template("privacy.html", page="privacy")
\ No newline at end of file
+    return render_template("privacy.html", page="privacy")
+
+def _metrics_authorized() -> bool:
+    """Whether the request carries Config.HEALTH_METRICS_TOKEN as a bearer token."""
+    token = Config.HEALTH_METRICS_TOKEN
+    auth = request.headers.get("Authorization", "")
+    return bool(token) and auth.startswith("Bearer ") and hmac.compare_digest(auth[7:].encode(), token.encode())
+
+@main_bp.route("/health/tmdb")
+def tmdb_health():
+    """
+    TMDB status: "ok", or "degraded" while the circuit breaker isn't closed.
+    With the metrics token, also the client metrics: circuit breaker, rate
+    limiter, cache and coalescing counters, and the shared title cache.
+    """
+    stats = get_tmdb_client().stats()
+    status = "ok" if stats["circuit_breaker"]["state"] == CLOSED else "degraded"
+    if not _metrics_authorized():
+        return jsonify({"status": status}), 200
+    return jsonify({"status": status, **stats, "shared_cache": shared_titles.stats()}), 200
\ No newline at end of file
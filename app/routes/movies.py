@@ -10,6 +10,7 @@ from app.services.db import (
     is_movie_in_seen,
     is_movie_in_watchlist
 )
+from app.services.library_pages import get_title_sort_key
 from app.validations import validate_title_id, validate_rating
 from app.exceptions import StatusError, StatusUnchanged
 
@@ -48,7 +49,8 @@ def add_movie_seen():
 
     # Insert data
     try:
-        res = add_movie_to_seen(user_id=user_id, api_movie_id=movie_id)
+        title_sort, release_year = get_title_sort_key("movie", movie_id)
+        res = add_movie_to_seen(user_id=user_id, api_movie_id=movie_id, title_sort=title_sort, release_year=release_year)
         if res:
             return jsonify({"success": True, "message": "Movie added to your seen list."}), 200
         else:
@@ -157,7 +159,8 @@ def add_movie_watchlist():
 
     # Insert data
     try:
-        res = add_movie_to_watchlist(user_id=user_id, api_movie_id=movie_id)
+        title_sort, release_year = get_title_sort_key("movie", movie_id)
+        res = add_movie_to_watchlist(user_id=user_id, api_movie_id=movie_id, title_sort=title_sort, release_year=release_year)
         if res:
             return jsonify({"success": True, "message": "Movie added to your watchlist."}), 200
         else:
@@ -12,6 +12,7 @@ from app.services.db import (
     is_series_in_progress,
     is_series_in_watchlist
 )
+from app.services.library_pages import get_title_sort_key
 from app.validations import validate_title_id, validate_season_number, validate_rating
 from app.exceptions import StatusError
 
@@ -51,7 +52,9 @@ def add_serie_to_progress():
 
     # Insert data
     try:
-        res = add_series_to_progress(user_id=user_id, api_serie_id=series_id, last_season_seen=season_number)
+        title_sort, release_year = get_title_sort_key("tv", series_id)
+        res = add_series_to_progress(user_id=user_id, api_serie_id=series_id, last_season_seen=season_number,
+                                     title_sort=title_sort, release_year=release_year)
         if res:
             return jsonify({"success": True, "message": "Series added to your watching list."}), 200
         else:
@@ -187,7 +190,9 @@ def update_serie_last_season_seen():
     # Check if series is in progress list before updating
     if not is_series_in_progress(user_id, series_id):
         try:
-            res = add_series_to_progress(user_id=user_id, api_serie_id=series_id, last_season_seen=season_number)
+            title_sort, release_year = get_title_sort_key("tv", series_id)
+            res = add_series_to_progress(user_id=user_id, api_serie_id=series_id, last_season_seen=season_number,
+                                         title_sort=title_sort, release_year=release_year)
             if res:
                 return jsonify({
                     "success": True, 
@@ -280,7 +285,8 @@ def add_series_watchlist():
 
     # Insert data
     try:
-        res = add_series_to_watchlist(user_id=user_id, api_serie_id=series_id)
+        title_sort, release_year = get_title_sort_key("tv", series_id)
+        res = add_series_to_watchlist(user_id=user_id, api_serie_id=series_id, title_sort=title_sort, release_year=release_year)
         if res:
             return jsonify({"success": True, "message": "Series added to your watchlist."}), 200
         else:
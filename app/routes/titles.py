@@ -1,10 +1,13 @@
-from flask import Blueprint, flash, redirect, url_for, render_template, request, get_flashed_messages
+from flask import Blueprint, flash, redirect, url_for, render_template, request, get_flashed_messages, jsonify
 from flask_login import current_user
-import asyncio
 # Validations
 from app.validations import validate_title
 # API
 from app.services.search_info import search_title, get_title_info
+from app.services.suggest import suggester
+from app.services.api.tmdb_client import run_async
+# Constants
+from app.constants import SEARCH_MORE_PAGES, SEARCH_MAX_PAGES, MAX_TITLE_LENGTH, SUGGEST_RESPONSE_MAX_AGE
 
 titles_bp = Blueprint("titles", __name__, template_folder="../templates/titles")
 
@@ -35,20 +38,65 @@ def search():
         
         # Get results
         try:
-            data = asyncio.run(search_title(query=title, search_type=titleType, user_id=user_id))
+            data = run_async(search_title(query=title, search_type=titleType, user_id=user_id))
         except Exception:
             # Handle API errors gracefully
-            data = []
+            data = {"results": [], "next_cursor": None}
 
-        return render_template("search.html", results=data, query=title, page="search")
+        return render_template("search.html", results=data["results"], next_cursor=data["next_cursor"], query=title, page="search")
+
+@titles_bp.route("/search/more", methods=["GET"])
+def search_more():
+    """Next batch of search results for infinite scroll (JSON)"""
+    title = request.args.get("title", "").strip()
+    titleType = request.args.getlist("titleTypes")
+    if not titleType:
+        titleType = ""
+    cursor = request.args.get("cursor", type=int)
+
+    # Validations
+    try:
+        validate_title(title)
+    except Exception as e:
+        return jsonify({"success": False, "message": str(e)}), 400
+    if cursor is None or cursor < 2 or cursor > SEARCH_MAX_PAGES:
+        return jsonify({"success": False, "message": "Invalid cursor"}), 400
+
+    # Get user ID
+    user_id = current_user.get_id() if current_user.is_authenticated else None
+
+    try:
+        data = run_async(search_title(query=title, search_type=titleType, user_id=user_id, cursor=cursor, pages=SEARCH_MORE_PAGES))
+    except Exception:
+        return jsonify({"success": False, "message": "Search is temporarily unavailable"}), 503
+
+    return jsonify({"success": True, "results": data["results"], "next_cursor": data["next_cursor"]})
     
+@titles_bp.route("/search/suggest", methods=["GET"])
+def search_suggest():
+    """Title suggestions for a partial query, for the search box (JSON)"""
+    query = request.args.get("q", "").strip()
+    media_type = request.args.get("type")
+    if not query or len(query) >= MAX_TITLE_LENGTH:
+        return jsonify({"success": True, "suggestions": []}), 200
+
+    suggestions = [
+        {**s, "url": url_for("titles.title", media_type=s["media_type"], id=s["id"])}
+        for s in suggester.suggest(query, media_type)
+    ]
+    response = jsonify({"success": True, "suggestions": suggestions})
+    # Not user specific: let the browser reuse answers while the user edits the query
+    response.cache_control.public = True
+    response.cache_control.max_age = SUGGEST_RESPONSE_MAX_AGE
+    return response
+
 @titles_bp.route("/title/<media:media_type>/<int:id>", methods=["GET"])
 def title(media_type, id):
     if request.method == "GET":
         # Get user ID
         user_id = current_user.get_id() if current_user.is_authenticated else None
         # Get results
-        data = asyncio.run(get_title_info(id=id, search_type=media_type, user_id=user_id))
+        data = run_async(get_title_info(id=id, search_type=media_type, user_id=user_id))
         if data:
             return render_template("title.html", primaryTitle=data["title"], results=data)
     return render_template("title.html", primaryTitle="Title not found", results=None)
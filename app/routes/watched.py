@@ -1,266 +1,80 @@
 import asyncio
 import random
-from datetime import datetime
 from flask import Blueprint, render_template, request, jsonify
 from flask_login import login_required, current_user
-import aiohttp
-from app.services.db import get_movies_watched, get_movies_watchlist, get_series_watched, get_series_watchlist
-from app.services.search_info import fetch_titles_info_batch
+from app.services.db import get_movies_watched, get_series_watched
+from app.services.library_pages import library_pages
 from app.services.api.api_info import get_similar_titles, get_recommendations
-from app.validations import validate_pagination_params
+from app.services.api.tmdb_client import run_async
+from app.validations import validate_library_page_params
 from app.exceptions import StatusError
 from app.constants import ALLOWED_FIELDS_SEARCH
 
 watched_bp = Blueprint("watched", __name__, template_folder="../templates/watched")
 
 
-def _merge_user_data(title_entry: dict, user_data: dict) -> dict:
-    """Merge user-specific data (rating, status, etc.) into title entry."""
-    if not user_data:
-        return title_entry
-    
-    result = title_entry.copy()
-    
-    if "user_rating" in user_data:
-        result["user_rating"] = user_data["user_rating"]
-    if "updated_at" in user_data:
-        result["updated_at"] = user_data["updated_at"].isoformat() if isinstance(user_data["updated_at"], datetime) else user_data["updated_at"]
-    if "last_season_seen" in user_data:
-        result["last_season_seen"] = user_data["last_season_seen"]
-    if "status" in user_data:
-        result["status"] = user_data["status"]
-    
-    return result
-
-
 @watched_bp.route("/watched", methods=["GET", "POST"])
 @login_required
 def watched():
     return render_template("watched.html", page="watched")
 
 
-@watched_bp.route("/watched/movies", methods=["POST"])
-@login_required
-def get_watched_movies():
-    """Get paginated list of watched movies with title information."""
+def _library_page(media_type: str, list_name: str, error_message: str):
+    """Paginated page of one of the user's lists, with title information."""
     data = request.get_json() or {}
     
-    # Validate pagination parameters
+    # Validate pagination parameters (the cursor, when given, decides the sort)
     try:
-        last_id, last_date, limit = validate_pagination_params(
-            data.get("last_id"),
-            data.get("last_date"),
+        sort, descending, after, limit = validate_library_page_params(
+            media_type,
+            list_name,
+            data.get("cursor"),
+            data.get("sort"),
+            data.get("order"),
             data.get("limit")
         )
     except StatusError as e:
         return jsonify({"success": False, "message": str(e)}), 400
     
     try:
-        # Get movies from database
-        db_results = get_movies_watched(
-            user_id=current_user.id,
-            last_movie_id=last_id,
-            last_date=last_date,
-            limit=limit
-        )
-        
-        if not db_results:
-            return jsonify({"success": True, "results": [], "has_more": False}), 200
-        
-        # Extract movie IDs and user data
-        movie_ids = [r["api_movie_id"] for r in db_results]
-        user_data_map = {r["api_movie_id"]: r for r in db_results}
-        
-        # Fetch title info from TMDB API
-        title_info_map = asyncio.run(fetch_titles_info_batch(movie_ids, "movie"))
-        
-        # Process and combine results
-        results = []
-        for movie_id in movie_ids:
-            title_data = title_info_map.get(movie_id)
-            if title_data:
-                processed = _merge_user_data(title_data, user_data_map.get(movie_id))
-                results.append(processed)
-        
-        # Determine if there are more results
-        has_more = len(db_results) >= limit
-        
-        return jsonify({
-            "success": True,
-            "results": results,
-            "has_more": has_more
-        }), 200
-        
-    except Exception as e:
-        return jsonify({"success": False, "message": "Failed to fetch watched movies"}), 500
+        page = library_pages.get_page(current_user.id, media_type, list_name, sort, descending, after, limit)
+    except Exception:
+        return jsonify({"success": False, "message": error_message}), 500
+    
+    return jsonify({
+        "success": True,
+        "results": page["results"],
+        "has_more": page["has_more"],
+        "next_cursor": page["next_cursor"]
+    }), 200
+
+
+@watched_bp.route("/watched/movies", methods=["POST"])
+@login_required
+def get_watched_movies():
+    """Get paginated list of watched movies with title information."""
+    return _library_page("movie", "seen", "Failed to fetch watched movies")
 
 
 @watched_bp.route("/watched/series", methods=["POST"])
 @login_required
 def get_watched_series():
     """Get paginated list of watched series with title information."""
-    data = request.get_json() or {}
-    
-    # Validate pagination parameters
-    try:
-        last_id, last_date, limit = validate_pagination_params(
-            data.get("last_id"),
-            data.get("last_date"),
-            data.get("limit")
-        )
-    except StatusError as e:
-        return jsonify({"success": False, "message": str(e)}), 400
-    
-    try:
-        # Get series from database
-        db_results = get_series_watched(
-            user_id=current_user.id,
-            last_serie_id=last_id,
-            last_date=last_date,
-            limit=limit
-        )
-        
-        if not db_results:
-            return jsonify({"success": True, "results": [], "has_more": False}), 200
-        
-        # Extract series IDs and user data
-        series_ids = [r["api_serie_id"] for r in db_results]
-        user_data_map = {r["api_serie_id"]: r for r in db_results}
-        
-        # Fetch title info from TMDB API
-        title_info_map = asyncio.run(fetch_titles_info_batch(series_ids, "tv"))
-        
-        # Process and combine results
-        results = []
-        for series_id in series_ids:
-            title_data = title_info_map.get(series_id)
-            if title_data:
-                processed = _merge_user_data(title_data, user_data_map.get(series_id))
-                results.append(processed)
-        
-        # Determine if there are more results
-        has_more = len(db_results) >= limit
-        
-        return jsonify({
-            "success": True,
-            "results": results,
-            "has_more": has_more
-        }), 200
-        
-    except Exception as e:
-        return jsonify({"success": False, "message": "Failed to fetch watched series"}), 500
+    return _library_page("tv", "seen", "Failed to fetch watched series")
 
 
 @watched_bp.route("/watchlist/movies", methods=["POST"])
 @login_required
 def get_watchlist_movies():
     """Get paginated list of movies in watchlist with title information."""
-    data = request.get_json() or {}
-    
-    # Validate pagination parameters
-    try:
-        last_id, last_date, limit = validate_pagination_params(
-            data.get("last_id"),
-            data.get("last_date"),
-            data.get("limit")
-        )
-    except StatusError as e:
-        return jsonify({"success": False, "message": str(e)}), 400
-    
-    try:
-        # Get movies from database
-        db_results = get_movies_watchlist(
-            user_id=current_user.id,
-            last_movie_id=last_id,
-            last_date=last_date,
-            limit=limit
-        )
-        
-        if not db_results:
-            return jsonify({"success": True, "results": [], "has_more": False}), 200
-        
-        # Extract movie IDs and user data
-        movie_ids = [r["api_movie_id"] for r in db_results]
-        user_data_map = {r["api_movie_id"]: r for r in db_results}
-        
-        # Fetch title info from TMDB API
-        title_info_map = asyncio.run(fetch_titles_info_batch(movie_ids, "movie"))
-        
-        # Process and combine results
-        results = []
-        for movie_id in movie_ids:
-            title_data = title_info_map.get(movie_id)
-            if title_data:
-                processed = _merge_user_data(title_data, user_data_map.get(movie_id))
-                results.append(processed)
-        
-        # Determine if there are more results
-        has_more = len(db_results) >= limit
-        
-        return jsonify({
-            "success": True,
-            "results": results,
-            "has_more": has_more
-        }), 200
-        
-    except Exception as e:
-        return jsonify({"success": False, "message": "Failed to fetch watchlist movies"}), 500
+    return _library_page("movie", "watchlist", "Failed to fetch watchlist movies")
 
 
 @watched_bp.route("/watchlist/series", methods=["POST"])
 @login_required
 def get_watchlist_series():
     """Get paginated list of series in watchlist with title information."""
-    data = request.get_json() or {}
-    
-    # Validate pagination parameters
-    try:
-        last_id, last_date, limit = validate_pagination_params(
-            data.get("last_id"),
-            data.get("last_date"),
-            data.get("limit")
-        )
-    except StatusError as e:
-        return jsonify({"success": False, "message": str(e)}), 400
-    
-    try:
-        # Get series from database
-        db_results = get_series_watchlist(
-            user_id=current_user.id,
-            last_serie_id=last_id,
-            last_date=last_date,
-            limit=limit
-        )
-        
-        if not db_results:
-            return jsonify({"success": True, "results": [], "has_more": False}), 200
-        
-        # Extract series IDs and user data
-        series_ids = [r["api_serie_id"] for r in db_results]
-        user_data_map = {r["api_serie_id"]: r for r in db_results}
-        
-        # Fetch title info from TMDB API
-        title_info_map = asyncio.run(fetch_titles_info_batch(series_ids, "tv"))
-        
-        # Process and combine results
-        results = []
-        for series_id in series_ids:
-            title_data = title_info_map.get(series_id)
-            if title_data:
-                processed = _merge_user_data(title_data, user_data_map.get(series_id))
-                results.append(processed)
-        
-        # Determine if there are more results
-        has_more = len(db_results) >= limit
-        
-        return jsonify({
-            "success": True,
-            "results": results,
-            "has_more": has_more
-        }), 200
-        
-    except Exception as e:
-        return jsonify({"success": False, "message": "Failed to fetch watchlist series"}), 500
+    return _library_page("tv", "watchlist", "Failed to fetch watchlist series")
 
 
 def _filter_title_fields(title: dict, media_type: str) -> dict:
@@ -319,11 +133,10 @@ def get_similar_from_watched():
         source_media_type = random_title["media_type"]
         
         async def fetch_similar():
-            async with aiohttp.ClientSession() as session:
-                results = await get_similar_titles(session, source_id, source_media_type)
-                return results or []
+            results = await get_similar_titles(source_id, source_media_type)
+            return results or []
         
-        similar_titles = asyncio.run(fetch_similar())
+        similar_titles = run_async(fetch_similar())
         
         # Get the appropriate watched IDs set based on media type
         watched_ids = watched_movie_ids if source_media_type == "movie" else watched_series_ids
@@ -390,15 +203,14 @@ def get_recommendations_from_watched():
         random_titles = random.sample(all_watched, sample_size)
         
         async def fetch_recommendations():
-            async with aiohttp.ClientSession() as session:
-                tasks = [
-                    get_recommendations(session, t["id"], t["media_type"]) 
-                    for t in random_titles
-                ]
-                results = await asyncio.gather(*tasks)
-                return list(zip(random_titles, results))
-        
-        all_recommendations = asyncio.run(fetch_recommendations())
+            tasks = [
+                get_recommendations(t["id"], t["media_type"]) 
+                for t in random_titles
+            ]
+            results = await asyncio.gather(*tasks)
+            return list(zip(random_titles, results))
+        
+        all_recommendations = run_async(fetch_recommendations())
         
         # Combine and deduplicate results
         filtered_results = []
@@ -1,196 +1,209 @@
+from datetime import date
 from dotenv import load_dotenv
 from config import Config
+from app.services.api.tmdb_client import get_tmdb_client
+from app.services.api.projection import project_list, project_details, project_external_ids
 
 api_key = Config.API_KEY
 
 
-async def get_trending_titles(session, media_type: str = "all", time_window: str = "week"):
+async def get_trending_titles(media_type: str = "all", time_window: str = "week"):
     """Get trending titles from TMDB API.
     
     Args:
-        session: aiohttp session
         media_type: 'all', 'movie', or 'tv'
         time_window: 'day' or 'week'
     """
-    url = f"https://api.themoviedb.org/3/trending/{media_type}/{time_window}"
-    params = {"api_key": api_key}
-    
-    async with session.get(url, params=params) as resp:
-        if resp.status != 200:
-            return None
-        
-        data = await resp.json()
-        if not data.get("results"):
-            return None
+    data = await get_tmdb_client().get_json(f"/trending/{media_type}/{time_window}", ttl_class="lists", project=project_list)
+    if not data or not data.get("results"):
+        return None
     
     return data["results"]
 
 
-async def get_popular_titles(session, media_type: str = "movie"):
+async def get_popular_titles(media_type: str = "movie"):
     """Get popular titles from TMDB API.
     
     Args:
-        session: aiohttp session
         media_type: 'movie' or 'tv'
     """
-    url = f"https://api.themoviedb.org/3/{media_type}/popular"
-    params = {"api_key": api_key}
-    
-    async with session.get(url, params=params) as resp:
-        if resp.status != 200:
-            return None
-        
-        data = await resp.json()
-        if not data.get("results"):
-            return None
+    data = await get_tmdb_client().get_json(f"/{media_type}/popular", ttl_class="lists", project=project_list)
+    if not data or not data.get("results"):
+        return None
     
     return data["results"]
 
 
-async def get_top_rated_titles(session, media_type: str = "movie"):
+async def get_top_rated_titles(media_type: str = "movie"):
     """Get top rated titles from TMDB API.
     
     Args:
-        session: aiohttp session
         media_type: 'movie' or 'tv'
     """
-    url = f"https://api.themoviedb.org/3/{media_type}/top_rated"
-    params = {"api_key": api_key}
-    
-    async with session.get(url, params=params) as resp:
-        if resp.status != 200:
-            return None
-        
-        data = await resp.json()
-        if not data.get("results"):
-            return None
+    data = await get_tmdb_client().get_json(f"/{media_type}/top_rated", ttl_class="lists", project=project_list)
+    if not data or not data.get("results"):
+        return None
     
     return data["results"]
 
 
-async def search_title_on_api(session, query: str, title_type: str = None):
-    """Search title in api. Only returns data["results"]"""
-    base = "https://api.themoviedb.org/3"
+async def search_title_on_api(query: str, title_type: str = None, page: int = 1):
+    """
+    Search title in api.
+    Returns the projected page ({"page", "total_pages", "total_results", "results"})
+    or None when there are no results. Pages are cached briefly so prefetched
+    pages are served without another request.
+    """
     if title_type in ("movie", "tv"):
         search_type = title_type
     else:
         search_type = "multi"
 
-    url = f"{base}/search/{search_type}"
-    params = {"api_key": api_key, "query": query, "include_adult": "false"}
-
+    params = {"query": query, "include_adult": "false", "page": str(page)}
 
-    async with session.get(url, params=params) as resp:
-        if resp.status != 200:
-            return None
+    data = await get_tmdb_client().get_json(f"/search/{search_type}", params, ttl_class="search", project=project_list)
+    if not data or not data.get("results"):
+        return None
 
-        data = await resp.json()
-        if not data["results"]:
-            return None
+    return data
 
-    return data["results"]
-
-async def get_title_tconst_on_api(session, tmdb_id, search_type):
+async def get_title_tconst_on_api(tmdb_id, search_type):
     """Get title tconst from TMDB API"""
-    url = f"https://api.themoviedb.org/3/{search_type}/{tmdb_id}/external_ids"
-    params = {"api_key": api_key}
+    ids_data = await get_tmdb_client().get_json(f"/{search_type}/{tmdb_id}/external_ids", ttl_class="external_ids", project=project_external_ids)
+    if not ids_data:
+        return None
 
-    async with session.get(url, params=params) as resp:
-        ids_data = await resp.json()
-        imdb_id = ids_data.get("imdb_id")
+    return ids_data.get("imdb_id")
 
-    return imdb_id
-
-async def get_title_info_on_api(session, tmdb_id, search_type):
+async def get_title_info_on_api(tmdb_id, search_type):
     """Get title info from TMDB API"""
-    url = f"https://api.themoviedb.org/3/{search_type}/{tmdb_id}"
-    params = {"api_key": api_key}
-
-    async with session.get(url, params=params) as resp:
-        if resp.status != 200:
-            return None
+    data = await get_tmdb_client().get_json(f"/{search_type}/{tmdb_id}", ttl_class="details", project=project_details) # Returns a dict
 
-        data = await resp.json() # Returns a dict
-        
-        return data if data else None
+    return data if data else None
 
 
-async def get_similar_titles(session, tmdb_id: int, media_type: str = "movie"):
+async def get_similar_titles(tmdb_id: int, media_type: str = "movie"):
     """Get similar titles from TMDB API.
     
     Args:
-        session: aiohttp session
         tmdb_id: The TMDB ID of the title
         media_type: 'movie' or 'tv'
     """
-    url = f"https://api.themoviedb.org/3/{media_type}/{tmdb_id}/similar"
-    params = {"api_key": api_key}
-    
-    async with session.get(url, params=params) as resp:
-        if resp.status != 200:
-            return None
-        
-        data = await resp.json()
-        if not data.get("results"):
-            return None
+    data = await get_tmdb_client().get_json(f"/{media_type}/{tmdb_id}/similar", ttl_class="related", project=project_list)
+    if not data or not data.get("results"):
+        return None
     
     return data["results"]
 
 
-async def get_recommendations(session, tmdb_id: int, media_type: str = "movie"):
+async def get_recommendations(tmdb_id: int, media_type: str = "movie"):
     """Get recommended titles from TMDB API based on a specific title.
     
     Args:
-        session: aiohttp session
         tmdb_id: The TMDB ID of the title
         media_type: 'movie' or 'tv'
     """
-    url = f"https://api.themoviedb.org/3/{media_type}/{tmdb_id}/recommendations"
-    params = {"api_key": api_key}
-    
-    async with session.get(url, params=params) as resp:
-        if resp.status != 200:
-            return None
-        
-        data = await resp.json()
-        if not data.get("results"):
-            return None
+    data = await get_tmdb_client().get_json(f"/{media_type}/{tmdb_id}/recommendations", ttl_class="related", project=project_list)
+    if not data or not data.get("results"):
+        return None
     
     return data["results"]
 
 
-async def get_series_seasons_on_api(session, tmdb_id):
+async def get_series_seasons_on_api(tmdb_id):
     """Get series seasons info from TMDB API"""
-    url = f"https://api.themoviedb.org/3/tv/{tmdb_id}"
-    params = {"api_key": api_key}
+    data = await get_tmdb_client().get_json(f"/tv/{tmdb_id}", ttl_class="details", project=project_details)
+    if not data:
+        return None
+    
+    return _format_seasons(data)
+
 
-    async with session.get(url, params=params) as resp:
-        if resp.status != 200:
-            return None
+async def get_series_latest_season_on_api(tmdb_id):
+    """Get the most recent season of a series that has started airing (specials excluded).
 
-        data = await resp.json()
-        if not data:
-            return None
+    Reads the same cached /tv/{id} payload as get_series_seasons_on_api.
+
+    Returns:
+        Dict with 'id', 'name', 'season_number' and 'air_date' (YYYY-MM-DD), or None
+    """
+    data = await get_tmdb_client().get_json(f"/tv/{tmdb_id}", ttl_class="details", project=project_details)
+    if not data:
+        return None
+
+    today = date.today().isoformat()
+    aired = [s for s in _format_seasons(data)["seasons"] if s["air_date"] and s["air_date"] <= today]
+    if not aired:
+        return None
+
+    latest = max(aired, key=lambda s: s["season_number"])
+    return {
+        "id": tmdb_id,
+        "name": data.get("name"),
+        "season_number": latest["season_number"],
+        "air_date": latest["air_date"]
+    }
+
+
+async def get_changes_page_on_api(media_type: str, start_date: str, end_date: str, page: int = 1):
+    """Get one page of the ids changed on TMDB between two days (not cached).
+    
+    Args:
+        media_type: 'movie' or 'tv'
+        start_date: First day (YYYY-MM-DD, UTC)
+        end_date: Last day (YYYY-MM-DD, UTC)
         
-        # Extract season info
-        seasons = data.get("seasons", [])
-        # Filter out "Specials" season (season_number = 0) and format the data
-        formatted_seasons = []
-        for season in seasons:
-            season_number = season.get("season_number", 0)
-            if season_number > 0:  # Skip specials (season 0)
-                formatted_seasons.append({
-                    "season_number": season_number,
-                    "name": season.get("name", f"Season {season_number}"),
-                    "episode_count": season.get("episode_count", 0),
-                    "air_date": season.get("air_date"),
-                    "poster_path": season.get("poster_path")
-                })
+    Returns:
+        The raw page ({"results": [{"id", "adult"}], "page", "total_pages", ...}), or None on failure
+    """
+    params = {"start_date": start_date, "end_date": end_date, "page": str(page)}
+    return await get_tmdb_client().get_json(f"/{media_type}/changes", params)
+
+
+async def get_title_details_on_api(tmdb_id, search_type):
+    """Get title info, tconst and (for series) seasons info from TMDB API in a single request.
+    
+    Args:
+        tmdb_id: The TMDB ID of the title
+        search_type: 'movie' or 'tv'
         
-        return {
-            "number_of_seasons": data.get("number_of_seasons", 0),
-            "seasons": formatted_seasons
-        }
+    Returns:
+        Dict with 'info' (raw details), 'tconst' and 'seasons' (None for movies), or None
+    """
+    params = {"append_to_response": "external_ids"}
+    data = await get_tmdb_client().get_json(f"/{search_type}/{tmdb_id}", params, ttl_class="details", project=project_details)
+    if not data:
+        return None
+    
+    external_ids = data.get("external_ids") or {}
+    return {
+        "info": data,
+        "tconst": external_ids.get("imdb_id"),
+        "seasons": _format_seasons(data) if search_type == "tv" else None
+    }
+
+
+def _format_seasons(data: dict) -> dict:
+    """Extract the seasons summary from a /tv/{id} payload."""
+    # Extract season info
+    seasons = data.get("seasons", [])
+    # Filter out "Specials" season (season_number = 0) and format the data
+    formatted_seasons = []
+    for season in seasons:
+        season_number = season.get("season_number", 0)
+        if season_number > 0:  # Skip specials (season 0)
+            formatted_seasons.append({
+                "season_number": season_number,
+                "name": season.get("name", f"Season {season_number}"),
+                "episode_count": season.get("episode_count", 0),
+                "air_date": season.get("air_date"),
+                "poster_path": season.get("poster_path")
+            })
+    
+    return {
+        "number_of_seasons": data.get("number_of_seasons", 0),
+        "seasons": formatted_seasons
+    }
 
 
 def __check_api_key():
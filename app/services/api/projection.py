@@ -0,0 +1,63 @@
+"""
+JSON decoding and field projection for TMDB responses.
+
+Responses are decoded with orjson when it is installed (falling back to the
+standard library) and immediately projected to the fields the app renders, so
+credits, production companies and other unused subtrees are dropped before
+anything is cached or handed to the services.
+"""
+import json
+# Constants
+from app.constants import ALLOWED_FIELDS_SEARCH, ALLOWED_FIELDS_TITLE_SEARCH
+
+try:
+    import orjson
+except ImportError:  # Optional speed-up
+    orjson = None
+
+# Fields kept from /{type}/{id} payloads: everything the title page and the list cards use
+DETAILS_FIELDS = frozenset(ALLOWED_FIELDS_TITLE_SEARCH | ALLOWED_FIELDS_SEARCH | {"external_ids"})
+LIST_ITEM_FIELDS = frozenset(ALLOWED_FIELDS_SEARCH)
+LIST_PAGE_FIELDS = ("page", "total_pages", "total_results")
+EXTERNAL_IDS_FIELDS = frozenset({"imdb_id"})
+
+
+def decode_json(body: bytes):
+    """Decode a response body, using orjson when available."""
+    if orjson is not None:
+        return orjson.loads(body)
+    return json.loads(body)
+
+
+def encoded_size(value) -> int:
+    """Approximate memory footprint of a decoded value, as its compact JSON size."""
+    if orjson is not None:
+        return len(orjson.dumps(value))
+    return len(json.dumps(value, separators=(",", ":")))
+
+
+def project_fields(item: dict, fields) -> dict:
+    """Keep only the given keys of a dict (iterating the smaller side)."""
+    if len(fields) < len(item):
+        return {k: item[k] for k in fields if k in item}
+    return {k: v for k, v in item.items() if k in fields}
+
+
+def project_list(data: dict) -> dict:
+    """Project a paginated list payload (trending, popular, search, similar...)."""
+    projected = {k: data[k] for k in LIST_PAGE_FIELDS if k in data}
+    projected["results"] = [project_fields(item, LIST_ITEM_FIELDS) for item in data.get("results") or ()]
+    return projected
+
+
+def project_details(data: dict) -> dict:
+    """Project a /movie/{id} or /tv/{id} payload."""
+    projected = project_fields(data, DETAILS_FIELDS)
+    if "external_ids" in projected:
+        projected["external_ids"] = project_fields(projected["external_ids"] or {}, EXTERNAL_IDS_FIELDS)
+    return projected
+
+
+def project_external_ids(data: dict) -> dict:
+    """Project an /external_ids payload."""
+    return project_fields(data, EXTERNAL_IDS_FIELDS)
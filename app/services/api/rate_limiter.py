@@ -0,0 +1,151 @@
+"""
+Adaptive rate limiter for upstream TMDB requests.
+
+A token bucket caps the request rate and a semaphore caps the number of
+requests in flight. The rate adapts with AIMD: it grows additively on every
+successful response and is cut multiplicatively on a 429, when the bucket is
+also paused for the Retry-After interval.
+"""
+import asyncio
+import time
+# Constants
+from app.constants import (
+    TMDB_RATE_BURST,
+    TMDB_RATE_MIN,
+    TMDB_RATE_INCREASE,
+    TMDB_RATE_DECREASE,
+    TMDB_MAX_CONCURRENCY
+)
+
+
+class AdaptiveRateLimiter:
+    """
+    Token bucket + concurrency limit shared by all TMDB calls of a worker.
+    Must be used from a single event loop (the TMDB client loop).
+
+    Usage:
+        async with limiter:
+            ...perform request...
+
+    or, bounded by a deadline:
+        await limiter.acquire(timeout)  # asyncio.TimeoutError if it can't be had in time
+        try:
+            ...perform request...
+        finally:
+            limiter.release()
+    """
+
+    def __init__(self, max_rate: float, burst: int = TMDB_RATE_BURST, max_concurrency: int = TMDB_MAX_CONCURRENCY,
+                 min_rate: float = TMDB_RATE_MIN, increase: float = TMDB_RATE_INCREASE, decrease: float = TMDB_RATE_DECREASE):
+        self.max_rate = max_rate
+        self.rate = max_rate
+        self.burst = burst
+        self.min_rate = min(min_rate, max_rate)
+        self.increase = increase
+        self.decrease = decrease
+        self.max_concurrency = max_concurrency
+        self._tokens = float(burst)
+        self._updated_at = time.monotonic()
+        self._paused_until = 0.0
+        self._bucket_lock = None
+        self._semaphore = None
+        # Counters
+        self.throttled = 0
+        self.waited = 0.0
+
+    def _primitives(self):
+        # Created lazily so they bind to the loop that actually uses them
+        if self._semaphore is None:
+            self._bucket_lock = asyncio.Lock()
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._bucket_lock, self._semaphore
+
+    def _refill(self, now: float):
+        elapsed = now - self._updated_at
+        self._updated_at = now
+        self._tokens = min(float(self.burst), self._tokens + elapsed * self.rate)
+
+    async def _take_token(self, deadline: float = None):
+        """
+        Wait until a token is available. Waiters are served in FIFO order.
+        Raises asyncio.TimeoutError if none is available by deadline (time.monotonic()).
+        """
+        bucket_lock, _ = self._primitives()
+        await asyncio.wait_for(bucket_lock.acquire(), None if deadline is None else max(0.0, deadline - time.monotonic()))
+        try:
+            while True:
+                now = time.monotonic()
+                if now < self._paused_until:
+                    delay = self._paused_until - now
+                else:
+                    self._refill(now)
+                    if self._tokens >= 1:
+                        self._tokens -= 1
+                        return
+                    delay = (1 - self._tokens) / self.rate
+                if deadline is not None and now + delay > deadline:
+                    raise asyncio.TimeoutError("No rate limiter token before the deadline")
+                self.waited += delay
+                await asyncio.sleep(delay)
+        finally:
+            bucket_lock.release()
+
+    async def acquire(self, timeout: float = None):
+        """
+        Wait for a concurrency slot and a token (pair with release()).
+        Raises asyncio.TimeoutError if they can't be had within timeout seconds.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        _, semaphore = self._primitives()
+        await asyncio.wait_for(semaphore.acquire(), None if timeout is None else max(0.0, timeout))
+        try:
+            await self._take_token(deadline)
+        except BaseException:
+            semaphore.release()
+            raise
+
+    def release(self):
+        self._semaphore.release()
+
+    async def __aenter__(self):
+        await self.acquire()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self.release()
+        return False
+
+    # ============================================================
+    # AIMD feedback
+    # ============================================================
+
+    def on_success(self):
+        """Additive increase after a successful response."""
+        if self.rate < self.max_rate:
+            self.rate = min(self.max_rate, self.rate + self.increase)
+
+    def on_throttle(self, retry_after: float):
+        """Multiplicative decrease and pause after a 429."""
+        self.throttled += 1
+        self.rate = max(self.min_rate, self.rate * self.decrease)
+        self._tokens = 0.0
+        self._paused_until = max(self._paused_until, time.monotonic() + retry_after)
+
+    def stats(self) -> dict:
+        return {
+            "rate": round(self.rate, 2),
+            "max_rate": self.max_rate,
+            "max_concurrency": self.max_concurrency,
+            "throttled": self.throttled,
+            "waited_seconds": round(self.waited, 3)
+        }
+
+
+def parse_retry_after(value: str, default: float) -> float:
+    """Parse a Retry-After header given in seconds; falls back to default."""
+    if not value:
+        return default
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        return default  # HTTP-date form is not used by TMDB
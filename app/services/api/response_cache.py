@@ -0,0 +1,172 @@
+"""
+In-memory TTL + LRU cache for decoded TMDB responses.
+
+Entries are keyed by endpoint path and query parameters and bounded by the
+total size of the response bodies they were decoded from. Expired entries are
+kept for a grace period so callers can be served stale data while a single
+background refresh runs (stale-while-revalidate). Response validators (ETag /
+Last-Modified) are stored with each entry so refreshes can be conditional.
+"""
+import threading
+import time
+from collections import OrderedDict
+# Constants
+from app.constants import TMDB_CACHE_TTLS, TMDB_CACHE_STALE_TTL, TMDB_CACHE_MAX_BYTES
+
+# Lookup states
+FRESH = "fresh"
+STALE = "stale"
+MISS = "miss"
+
+
+def make_cache_key(path: str, params: dict = None) -> tuple:
+    """Build a hashable key from an endpoint path and its query parameters."""
+    if not params:
+        return (path, ())
+    return (path, tuple(sorted((k, str(v)) for k, v in params.items())))
+
+
+class CacheEntry:
+    """A decoded response plus the bookkeeping needed for expiry, sizing and revalidation."""
+    __slots__ = ("value", "size", "expires_at", "stale_until", "etag", "last_modified")
+
+    def __init__(self, value, size: int, ttl: float, stale_ttl: float, etag: str = None, last_modified: str = None):
+        self.value = value
+        self.size = size
+        self.etag = etag
+        self.last_modified = last_modified
+        self.extend(ttl, stale_ttl)
+
+    def extend(self, ttl: float, stale_ttl: float):
+        self.expires_at = time.monotonic() + ttl
+        self.stale_until = self.expires_at + stale_ttl
+
+
+class ResponseCache:
+    """
+    Byte-bounded LRU with a TTL per endpoint class.
+    Cached values are shared between callers and must be treated as read-only.
+    """
+
+    def __init__(self, max_bytes: int = TMDB_CACHE_MAX_BYTES, ttls: dict = None, stale_ttl: float = TMDB_CACHE_STALE_TTL):
+        self.max_bytes = max_bytes
+        self.ttls = dict(TMDB_CACHE_TTLS if ttls is None else ttls)
+        self.stale_ttl = stale_ttl
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        # Counters
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, key):
+        """
+        Look up a key.
+
+        Returns:
+            Tuple (state, value) where state is FRESH, STALE or MISS
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or now >= entry.stale_until:
+                # Fully expired entries stay until replaced or evicted (see peek)
+                self.misses += 1
+                return MISS, None
+
+            self._entries.move_to_end(key)
+            if now < entry.expires_at:
+                self.hits += 1
+                return FRESH, entry.value
+
+            self.stale_hits += 1
+            return STALE, entry.value
+
+    def peek(self, key):
+        """Return a cached value regardless of age (degraded mode), or None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry.value if entry is not None else None
+
+    def validators(self, key):
+        """Return (etag, last_modified) stored for a key, or None if neither is known."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or not (entry.etag or entry.last_modified):
+                return None
+            return entry.etag, entry.last_modified
+
+    def refresh(self, key, ttl_class: str):
+        """
+        Restart the TTL of an entry that upstream confirmed unchanged (304).
+        Returns the cached value, or None if the entry is gone.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            entry.extend(self.ttls[ttl_class], self.stale_ttl)
+            self._entries.move_to_end(key)
+            return entry.value
+
+    def set(self, key, value, size: int, ttl_class: str, etag: str = None, last_modified: str = None):
+        """Store a value, evicting least recently used entries over the byte budget."""
+        if size > self.max_bytes:
+            return
+
+        entry = CacheEntry(value, size, self.ttls[ttl_class], self.stale_ttl, etag, last_modified)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = entry
+            self._bytes += size
+
+            while self._bytes > self.max_bytes:
+                old_key = next(iter(self._entries))
+                self._remove(old_key)
+                self.evictions += 1
+
+    def invalidate(self, key) -> bool:
+        """Drop a single entry. Returns True if it was cached."""
+        with self._lock:
+            if key not in self._entries:
+                return False
+            self._remove(key)
+            return True
+
+    def invalidate_where(self, predicate) -> int:
+        """Drop every entry whose key satisfies predicate(key). Returns how many were dropped."""
+        with self._lock:
+            keys = [key for key in self._entries if predicate(key)]
+            for key in keys:
+                self._remove(key)
+            self.invalidations += len(keys)
+            return len(keys)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def _remove(self, key):
+        entry = self._entries.pop(key)
+        self._bytes -= entry.size
+
+    def stats(self) -> dict:
+        """Counters and current size, for logging/metrics."""
+        with self._lock:
+            lookups = self.hits + self.stale_hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "stale_hits": self.stale_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "hit_ratio": (self.hits + self.stale_hits) / lookups if lookups else 0.0
+            }
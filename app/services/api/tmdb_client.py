@@ -0,0 +1,417 @@
+"""
+Pooled TMDB HTTP client.
+
+Each worker process owns one aiohttp session running on a long-lived event loop
+in a background thread. Sync Flask views submit coroutines to that loop through
+run_async(), so keep-alive connections, DNS results and TLS sessions are reused
+across requests instead of being rebuilt by every asyncio.run() call.
+"""
+import asyncio
+import atexit
+import os
+import random
+import threading
+import aiohttp
+from config import Config
+from app.exceptions import TMDBUnavailable
+from app.services.api.response_cache import ResponseCache, make_cache_key, FRESH, STALE
+from app.services.api.rate_limiter import AdaptiveRateLimiter, parse_retry_after
+from app.services.api.circuit_breaker import CircuitBreaker
+from app.services.api.projection import decode_json, encoded_size
+# Constants
+from app.constants import (
+    TMDB_POOL_LIMIT,
+    TMDB_POOL_LIMIT_PER_HOST,
+    TMDB_DNS_CACHE_TTL,
+    TMDB_KEEPALIVE_TIMEOUT,
+    TMDB_THROTTLE_RETRIES,
+    TMDB_DEFAULT_RETRY_AFTER,
+    TMDB_TIMEOUTS,
+    TMDB_DEFAULT_TIMEOUT,
+    TMDB_ATTEMPT_TIMEOUT,
+    TMDB_CONNECT_TIMEOUT,
+    TMDB_MAX_RETRIES,
+    TMDB_RETRY_BASE_DELAY,
+    TMDB_RETRY_MAX_DELAY
+)
+
+# Returned by _fetch when a conditional request is answered with 304
+NOT_MODIFIED = object()
+
+
+class TMDBClient:
+    """Keep-alive aiohttp session for TMDB bound to a background event loop."""
+
+    def __init__(self, base_url: str = None, api_key: str = None):
+        self.base_url = (base_url or Config.TMDB_BASE_URL).rstrip("/")
+        self.api_key = api_key if api_key is not None else Config.API_KEY
+        self._loop = None
+        self._thread = None
+        self._session = None
+        self._lock = threading.Lock()
+        self._closed = False
+        self.cache = ResponseCache()
+        self.limiter = AdaptiveRateLimiter(Config.TMDB_RATE_LIMIT)
+        self.breaker = CircuitBreaker()
+        self._inflight = {}  # cache key -> shared upstream fetch task
+        # Counters
+        self.upstream_requests = 0
+        self.coalesced = 0
+        self.revalidated = 0
+
+    # ============================================================
+    # Event loop
+    # ============================================================
+
+    def start(self):
+        """Start the background event loop thread (idempotent)."""
+        with self._lock:
+            if self._loop is not None:
+                return
+            if self._closed:
+                raise RuntimeError("TMDB client has been closed")
+
+            self._loop = asyncio.new_event_loop()
+            self._thread = threading.Thread(
+                target=self._run_loop, name="tmdb-client-loop", daemon=True
+            )
+            self._thread.start()
+
+    def _run_loop(self):
+        asyncio.set_event_loop(self._loop)
+        self._loop.run_forever()
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        self.start()
+        return self._loop
+
+    def submit(self, coro):
+        """
+        Schedule a coroutine on the client loop from any thread.
+        The caller's context variables (Flask app/request context) are copied
+        into the task, so DB helpers called inside the coroutine keep working.
+
+        Returns:
+            concurrent.futures.Future with the coroutine result
+        """
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def run(self, coro, timeout: float = None):
+        """Run a coroutine on the client loop and block until it finishes."""
+        if self._loop is not None and threading.current_thread() is self._thread:
+            coro.close()
+            raise RuntimeError("run() cannot be called from the TMDB client loop; await the coroutine instead")
+        return self.submit(coro).result(timeout)
+
+    # ============================================================
+    # HTTP
+    # ============================================================
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        """Return the pooled session, creating it on first use (loop thread only)."""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=TMDB_POOL_LIMIT,
+                limit_per_host=TMDB_POOL_LIMIT_PER_HOST,
+                ttl_dns_cache=TMDB_DNS_CACHE_TTL,
+                keepalive_timeout=TMDB_KEEPALIVE_TIMEOUT
+            )
+            self._session = aiohttp.ClientSession(connector=connector)
+        return self._session
+
+    async def get_json(self, path: str, params: dict = None, ttl_class: str = None, project=None):
+        """
+        GET a TMDB endpoint and decode the JSON body.
+
+        Args:
+            path: Endpoint path relative to the API root (e.g. '/movie/550')
+            params: Extra query parameters (api_key is added automatically)
+            ttl_class: Cache class from TMDB_CACHE_TTLS; None bypasses the cache
+            project: Function applied to the decoded body before it is cached/returned,
+                     so only the needed fields are kept (see projection.py)
+
+        Returns:
+            Decoded JSON, or None when TMDB answers with a non-200 status.
+            While TMDB is unavailable the last cached value (however old) is
+            returned instead, or None if there is none.
+        """
+        key = make_cache_key(path, params)
+        if ttl_class is not None:
+            state, value = self.cache.get(key)
+            if state == FRESH:
+                return value
+            if state == STALE:
+                self._start_fetch(key, path, params, ttl_class, project)
+                return value
+
+        try:
+            return await self._single_flight(key, path, params, ttl_class, project)
+        except TMDBUnavailable:
+            # Degrade to whatever we have rather than failing the page
+            return self.cache.peek(key)
+
+    async def _single_flight(self, key, path: str, params: dict, ttl_class: str, project):
+        """
+        Await the upstream fetch for a key, joining one that is already running.
+        Every caller, including views submitting from other threads through
+        run_async(), runs on this loop, so identical lookups share one request.
+        """
+        task = self._inflight.get(key)
+        if task is None:
+            task = self._start_fetch(key, path, params, ttl_class, project)
+        else:
+            self.coalesced += 1
+        # Shield so one cancelled caller doesn't cancel the fetch for the others
+        return await asyncio.shield(task)
+
+    def _start_fetch(self, key, path: str, params: dict, ttl_class: str, project):
+        """Start the upstream fetch for a key unless one is already in flight."""
+        task = self._inflight.get(key)
+        if task is not None:
+            return task
+
+        task = asyncio.get_running_loop().create_task(self._fetch_and_store(key, path, params, ttl_class, project))
+        self._inflight[key] = task
+
+        def done(t):
+            if self._inflight.get(key) is t:
+                del self._inflight[key]
+            if not t.cancelled():
+                t.exception()  # Mark as retrieved; background refreshes have no awaiter
+
+        task.add_done_callback(done)
+        return task
+
+    async def _fetch(self, path: str, params: dict = None, ttl_class: str = None, validators: tuple = None):
+        """
+        Perform the upstream request through the circuit breaker and rate limiter.
+        A 429 slows the limiter down and is retried after Retry-After. Timeouts,
+        connection errors and 5xx responses are retried with jittered backoff
+        while the deadline of the endpoint class allows it; waits for the rate
+        limiter and backoff sleeps are cut short at that deadline. With validators
+        (etag, last_modified) the request is conditional.
+
+        Returns:
+            Tuple (data, body_size, (etag, last_modified)); data is None on a
+            non-retryable, non-200 status and NOT_MODIFIED on a 304
+
+        Raises:
+            TMDBUnavailable: If the breaker is open, all retries failed or the deadline passed
+        """
+        query = {"api_key": self.api_key}
+        if params:
+            query.update(params)
+
+        headers = {}
+        if validators:
+            etag, last_modified = validators
+            if etag:
+                headers["If-None-Match"] = etag
+            if last_modified:
+                headers["If-Modified-Since"] = last_modified
+
+        url = f"{self.base_url}{path}"
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + TMDB_TIMEOUTS.get(ttl_class, TMDB_DEFAULT_TIMEOUT)
+        session = self._get_session()
+        throttled = 0
+        failures = 0
+
+        while True:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                raise TMDBUnavailable(f"TMDB request to {path} exceeded its deadline")
+            if not self.breaker.allow_request():
+                raise TMDBUnavailable("TMDB circuit breaker is open")
+
+            # Every path below records an outcome with the breaker, or releases it (a held probe slot included)
+            try:
+                await self.limiter.acquire(remaining)
+            except asyncio.TimeoutError:
+                self.breaker.release()
+                raise TMDBUnavailable(f"TMDB request to {path} exceeded its deadline waiting for the rate limiter")
+            except BaseException:
+                self.breaker.release()
+                raise
+
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                self.limiter.release()
+                self.breaker.release()
+                raise TMDBUnavailable(f"TMDB request to {path} exceeded its deadline")
+
+            try:
+                try:
+                    timeout = aiohttp.ClientTimeout(
+                        total=min(remaining, TMDB_ATTEMPT_TIMEOUT),
+                        connect=TMDB_CONNECT_TIMEOUT
+                    )
+                    self.upstream_requests += 1
+                    async with session.get(url, params=query, headers=headers, timeout=timeout) as resp:
+                        status = resp.status
+                        if status == 429:
+                            retry_after = parse_retry_after(resp.headers.get("Retry-After"), TMDB_DEFAULT_RETRY_AFTER)
+                        elif status == 200:
+                            body = await resp.read()
+                            new_validators = (resp.headers.get("ETag"), resp.headers.get("Last-Modified"))
+                except (asyncio.TimeoutError, aiohttp.ClientError) as e:
+                    status, error = None, e
+                finally:
+                    self.limiter.release()
+                data = decode_json(body) if status == 200 else None
+            except asyncio.CancelledError:
+                self.breaker.release()
+                raise
+            except Exception:
+                # A body that doesn't decode
+                self.breaker.record_failure()
+                raise
+
+            if status == 200:
+                self.breaker.record_success()
+                self.limiter.on_success()
+                return data, len(body), new_validators
+
+            if status == 304:
+                self.breaker.record_success()
+                self.limiter.on_success()
+                return NOT_MODIFIED, 0, None
+
+            if status == 429:
+                # Upstream is healthy, just busy
+                self.breaker.record_success()
+                self.limiter.on_throttle(retry_after)
+                throttled += 1
+                if throttled > TMDB_THROTTLE_RETRIES:
+                    return None, 0, None
+                continue
+
+            if status is not None and status < 500:
+                self.breaker.record_success()
+                return None, 0, None
+
+            # Timeout, connection error or 5xx
+            self.breaker.record_failure()
+            failures += 1
+            if failures > TMDB_MAX_RETRIES:
+                reason = f"status {status}" if status is not None else repr(error)
+                raise TMDBUnavailable(f"TMDB request failed after {failures} attempts: {reason}")
+            delay = random.uniform(0, min(TMDB_RETRY_MAX_DELAY, TMDB_RETRY_BASE_DELAY * 2 ** failures))
+            # Never back off past the deadline: the next pass raises when it's reached
+            await asyncio.sleep(max(0.0, min(delay, deadline - loop.time())))
+
+    async def _fetch_and_store(self, key, path: str, params: dict, ttl_class: str, project):
+        validators = self.cache.validators(key) if ttl_class is not None else None
+        data, size, new_validators = await self._fetch(path, params, ttl_class, validators)
+
+        if data is NOT_MODIFIED:
+            # Unchanged upstream: keep the decoded value, just restart its TTL
+            self.revalidated += 1
+            value = self.cache.refresh(key, ttl_class)
+            if value is not None:
+                return value
+            # Evicted while the request was in flight
+            data, size, new_validators = await self._fetch(path, params, ttl_class)
+
+        if data and project is not None:
+            data = project(data)
+            size = encoded_size(data)
+        if data and ttl_class is not None:
+            self.cache.set(key, data, size, ttl_class, *new_validators)
+        return data
+
+    async def get_bytes(self, url: str, timeout: float, max_bytes: int):
+        """
+        GET an absolute URL (e.g. an image on TMDB's CDN) over the pooled session.
+        The CDN is not subject to the API rate limit, so the limiter and the
+        breaker are bypassed.
+
+        Returns:
+            Tuple (body, content_type), or None on a non-200 status, a body
+            larger than max_bytes, a timeout or a connection error
+        """
+        session = self._get_session()
+        try:
+            async with session.get(url, timeout=aiohttp.ClientTimeout(total=timeout, connect=TMDB_CONNECT_TIMEOUT)) as resp:
+                if resp.status != 200 or (resp.content_length or 0) > max_bytes:
+                    return None
+                body = await resp.content.read(max_bytes + 1)
+                if len(body) > max_bytes:
+                    return None
+                return body, resp.content_type
+        except (asyncio.TimeoutError, aiohttp.ClientError):
+            return None
+
+    def stats(self) -> dict:
+        """Client counters, for logging/metrics."""
+        return {
+            "upstream_requests": self.upstream_requests,
+            "coalesced": self.coalesced,
+            "revalidated": self.revalidated,
+            "inflight": len(self._inflight),
+            "cache": self.cache.stats(),
+            "rate_limiter": self.limiter.stats(),
+            "circuit_breaker": self.breaker.stats()
+        }
+
+    # ============================================================
+    # Shutdown
+    # ============================================================
+
+    async def _close_session(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    def close(self, timeout: float = 5.0):
+        """Close the session and stop the loop thread."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            loop, thread = self._loop, self._thread
+
+        if loop is None:
+            return
+
+        try:
+            asyncio.run_coroutine_threadsafe(self._close_session(), loop).result(timeout)
+        except Exception:
+            pass
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(timeout)
+        if not loop.is_running():
+            loop.close()
+
+
+# ============================================================
+# Per-worker singleton
+# ============================================================
+
+_client = None
+_client_pid = None
+_client_lock = threading.Lock()
+
+
+def get_tmdb_client() -> TMDBClient:
+    """
+    Return this process' TMDB client.
+    A new client is created after a fork (e.g. Gunicorn workers), since the
+    parent's loop thread does not exist in the child.
+    """
+    global _client, _client_pid
+
+    pid = os.getpid()
+    if _client is None or _client_pid != pid:
+        with _client_lock:
+            if _client is None or _client_pid != pid:
+                _client = TMDBClient()
+                _client_pid = pid
+                atexit.register(_client.close)
+    return _client
+
+
+def run_async(coro, timeout: float = None):
+    """Run a coroutine on the worker's TMDB loop from sync code (Flask views)."""
+    return get_tmdb_client().run(coro, timeout)
@@ -0,0 +1,46 @@
+"""
+Database access from the async service layer.
+
+Coroutines in search_info run on the TMDB client's event loop, which every
+request of the worker shares, so they must not call the (blocking) database
+functions directly. run_db() runs them on a small thread pool instead, each
+call inside its own app context (and so its own session), which lets the
+coroutine gather DB work with TMDB requests: a page waits for the slower of
+the two instead of their sum.
+"""
+import asyncio
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from app.extensions import app
+# Constants
+from app.constants import DB_EXECUTOR_WORKERS
+
+_executor = None
+_executor_pid = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    """Per-process pool (threads don't survive a fork)."""
+    global _executor, _executor_pid
+
+    pid = os.getpid()
+    if _executor is None or _executor_pid != pid:
+        with _executor_lock:
+            if _executor is None or _executor_pid != pid:
+                _executor = ThreadPoolExecutor(max_workers=DB_EXECUTOR_WORKERS, thread_name_prefix="db")
+                _executor_pid = pid
+    return _executor
+
+
+def _call_in_app_context(func, args, kwargs):
+    with app.app_context():
+        return func(*args, **kwargs)
+
+
+async def run_db(func, *args, **kwargs):
+    """Await a blocking database function without blocking the event loop."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_executor(), partial(_call_in_app_context, func, args, kwargs))
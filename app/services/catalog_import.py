@@ -0,0 +1,157 @@
+"""
+Streaming import of TMDB's daily id export files into the title_catalog table.
+
+The exports (e.g. movie_ids_05_15_2025.json.gz, tv_series_ids_05_15_2025.json.gz)
+are gzip-compressed files with one JSON object per line. They are decompressed
+and parsed line by line, so memory stays constant whatever the file size, and
+written with one multi-row upsert per batch.
+
+After every committed batch the number of lines done is saved to a progress
+file next to the export, so an interrupted import resumes where it stopped.
+The progress file is tied to the export's size and mtime and ignored if they
+change.
+"""
+import gzip
+import json
+import os
+import re
+import time
+from app.exceptions import CatalogImportError
+from app.services.api.projection import decode_json
+from app.services.db import upsert_catalog_rows
+# Constants
+from app.constants import CATALOG_BATCH_SIZE, CATALOG_TITLE_MAX_LENGTH
+
+# Media type by export file name prefix
+EXPORT_PREFIXES = {"movie_ids": "movie", "tv_series_ids": "tv"}
+# Title field by media type (the exports only carry original titles)
+TITLE_FIELDS = {"movie": "original_title", "tv": "original_name"}
+EXPORT_NAME_RE = re.compile(r"^(movie_ids|tv_series_ids)_")
+
+
+def media_type_from_filename(path: str):
+    """'movie' or 'tv' from a TMDB export file name, None if it doesn't look like one."""
+    match = EXPORT_NAME_RE.match(os.path.basename(path))
+    return EXPORT_PREFIXES[match.group(1)] if match else None
+
+
+def parse_export_line(line: bytes, media_type: str):
+    """Catalog row for one export line, or None if it's blank or malformed."""
+    if not line.strip():
+        return None
+    try:
+        item = decode_json(line)
+        tmdb_id = int(item["id"])
+    except (ValueError, KeyError, TypeError):
+        return None
+    title = item.get(TITLE_FIELDS[media_type]) or ""
+    return {
+        "media_type": media_type,
+        "tmdb_id": tmdb_id,
+        "title": title[:CATALOG_TITLE_MAX_LENGTH],
+        "popularity": float(item.get("popularity") or 0),
+        "adult": bool(item.get("adult", False))
+    }
+
+
+# ============================================================
+# Progress file
+# ============================================================
+
+def progress_path(path: str) -> str:
+    return f"{path}.progress"
+
+def _file_identity(path: str) -> dict:
+    stat = os.stat(path)
+    return {"size": stat.st_size, "mtime": int(stat.st_mtime)}
+
+def load_progress(path: str) -> dict:
+    """Saved progress for this export, or a fresh one if missing or for another version of the file."""
+    identity = _file_identity(path)
+    try:
+        with open(progress_path(path)) as f:
+            progress = json.load(f)
+        if progress.get("file") == identity:
+            return progress
+    except (OSError, ValueError):
+        pass
+    return {"file": identity, "lines": 0, "rows": 0, "skipped": 0, "done": False}
+
+def save_progress(path: str, progress: dict):
+    tmp = f"{progress_path(path)}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(progress, f)
+    os.replace(tmp, progress_path(path))
+
+
+# ============================================================
+# Import
+# ============================================================
+
+def import_export(path: str, media_type: str = None, batch_size: int = CATALOG_BATCH_SIZE, resume: bool = True, on_progress=None) -> dict:
+    """
+    Import one TMDB export file into title_catalog. Requires an app context.
+
+    Args:
+        path: Path to the .json.gz export (plain .json also works)
+        media_type: 'movie' or 'tv'; detected from the file name when omitted
+        batch_size: Rows per upsert statement
+        resume: Continue from the saved progress instead of starting over
+        on_progress: Optional callable(progress, fraction_read, rows_per_second) called after each batch
+
+    Returns:
+        The final progress dict (lines, rows, skipped, done, seconds)
+
+    Raises:
+        CatalogImportError: If the media type is unknown or a batch can't be written
+    """
+    media_type = media_type or media_type_from_filename(path)
+    if media_type not in TITLE_FIELDS:
+        raise CatalogImportError(f"Can't tell the media type of {path}; pass it explicitly")
+
+    progress = load_progress(path) if resume else {"file": _file_identity(path), "lines": 0, "rows": 0, "skipped": 0, "done": False}
+    if progress["done"]:
+        return progress
+    skip_lines = progress["lines"]
+
+    total_size = progress["file"]["size"]
+    started = time.monotonic()
+    rows_this_run = 0
+    batch = []
+    skipped = 0  # Malformed lines since the last checkpoint
+
+    def flush(line_number: int):
+        nonlocal rows_this_run, skipped
+        if batch and not upsert_catalog_rows(batch):
+            raise CatalogImportError(f"Failed to write the batch ending at line {line_number}")
+        progress["lines"] = line_number
+        progress["rows"] += len(batch)
+        progress["skipped"] += skipped
+        rows_this_run += len(batch)
+        skipped = 0
+        batch.clear()
+        save_progress(path, progress)
+        if on_progress is not None:
+            elapsed = time.monotonic() - started
+            on_progress(progress, raw.tell() / total_size if total_size else 1.0, rows_this_run / elapsed if elapsed else 0.0)
+
+    with open(path, "rb") as raw:
+        stream = gzip.GzipFile(fileobj=raw) if path.endswith(".gz") else raw
+        line_number = 0
+        for line_number, line in enumerate(stream, start=1):
+            if line_number <= skip_lines:
+                continue  # Already imported by a previous run
+            row = parse_export_line(line, media_type)
+            if row is None:
+                skipped += 1
+                continue
+            batch.append(row)
+            if len(batch) >= batch_size:
+                flush(line_number)
+        if batch or line_number > progress["lines"]:
+            flush(max(line_number, skip_lines))
+
+    progress["done"] = True
+    progress["seconds"] = round(time.monotonic() - started, 1)
+    save_progress(path, progress)
+    return progress
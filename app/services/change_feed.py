@@ -0,0 +1,143 @@
+"""
+Cache invalidation driven by TMDB's changes feed.
+
+A background PeriodicTask reads /movie/changes and /tv/changes and, for every
+id edited on TMDB, evicts the worker's cached responses for that title, drops
+it from the host's shared title cache and expires its stored title_metadata
+record, so long TTLs can be used while edits still show up within a poll
+interval.
+
+The feed only has day granularity, so each poll reads from the day of the
+previous one and evicts every id listed for it again: the feed doesn't say
+when in the day a title changed, so a title refetched after an earlier edit
+the same day may have been edited since. The end of the
+last successful poll is kept in sync_state, so a restarted worker resumes from
+there. Markers older than TMDB_CHANGES_MAX_LOOKBACK (or missing) aren't read
+back: the records stored before the lookback window are expired wholesale.
+"""
+import asyncio
+import logging
+import threading
+from datetime import datetime, timedelta, timezone
+from app.extensions import app
+from app.services.scheduler import PeriodicTask
+from app.services.api.api_info import get_changes_page_on_api
+from app.services.api.tmdb_client import get_tmdb_client, run_async
+from app.services.shared_cache import shared_titles
+from app.services.db import get_sync_state, set_sync_state, expire_titles_metadata, expire_titles_metadata_before
+# Constants
+from app.constants import (
+    TMDB_CHANGES_POLL_INTERVAL,
+    TMDB_CHANGES_MAX_LOOKBACK,
+    TMDB_CHANGES_MAX_PAGES,
+    TMDB_CHANGES_EXPIRE_BATCH
+)
+
+logger = logging.getLogger(__name__)
+
+STATE_NAME = "tmdb_changes"
+MEDIA_TYPES = ("movie", "tv")
+
+
+def title_of_path(path: str):
+    """(media_type, id) of a per-title endpoint path like /movie/550 or /tv/1399/external_ids, else None."""
+    parts = path.split("/", 3)
+    if len(parts) >= 3 and parts[1] in MEDIA_TYPES and parts[2].isdigit():
+        return parts[1], int(parts[2])
+    return None
+
+
+async def _changed_ids(media_type: str, start_date: str, end_date: str):
+    """Every id in the feed for a media type, or None if any page couldn't be read."""
+    first = await get_changes_page_on_api(media_type, start_date, end_date)
+    if first is None:
+        return None
+    total_pages = min(first.get("total_pages") or 1, TMDB_CHANGES_MAX_PAGES)
+    pages = [first] + list(await asyncio.gather(
+        *(get_changes_page_on_api(media_type, start_date, end_date, page) for page in range(2, total_pages + 1))
+    ))
+    if any(page is None for page in pages):
+        return None
+    return {item["id"] for page in pages for item in page.get("results") or () if item.get("id") is not None}
+
+
+async def _all_changed_ids(start_date: str, end_date: str) -> list:
+    return await asyncio.gather(*(_changed_ids(m, start_date, end_date) for m in MEDIA_TYPES))
+
+
+class ChangeFeedPoller:
+
+    def __init__(self, interval: float = TMDB_CHANGES_POLL_INTERVAL):
+        self._mark = None       # End (UTC) of this process' last successful poll
+        self._lock = threading.Lock()
+        self._task = PeriodicTask("tmdb-changes", self.poll, interval, app=app)
+        # Counters
+        self.polls = 0
+        self.changed = 0
+        self.evicted = 0
+        self.expired = 0
+
+    def start(self):
+        self._task.start()
+
+    def _resume_mark(self):
+        value = get_sync_state(STATE_NAME)
+        try:
+            return datetime.fromisoformat(value) if value else None
+        except ValueError:
+            return None
+
+    def poll(self) -> bool:
+        """
+        Handle the changes since the last poll. Requires an app context.
+        Returns False (and keeps the marker) if the feed or the store couldn't
+        be read or written; the next poll covers the same window again.
+        """
+        with self._lock:
+            now = datetime.now(timezone.utc)
+            earliest = now - timedelta(seconds=TMDB_CHANGES_MAX_LOOKBACK)
+            mark = self._mark or self._resume_mark()
+            if mark is None or mark < earliest:
+                # Changes from before the window can't be listed: expire what was stored before it
+                expired = expire_titles_metadata_before(earliest.astimezone().replace(tzinfo=None))
+                if expired is None:
+                    return False
+                self.expired += expired
+                shared_titles.invalidate_before(earliest.timestamp())
+                mark = earliest
+
+            start_date, end_date = mark.date().isoformat(), now.date().isoformat()
+            results = run_async(_all_changed_ids(start_date, end_date))
+            if any(ids is None for ids in results):
+                logger.warning("TMDB changes feed unavailable; retrying from %s next poll", start_date)
+                return False
+
+            changed = {(m, i) for m, ids in zip(MEDIA_TYPES, results) for i in ids}
+
+            self.evicted += get_tmdb_client().cache.invalidate_where(lambda key: title_of_path(key[0]) in changed)
+            for media_type in MEDIA_TYPES:
+                ids = sorted(i for m, i in changed if m == media_type)
+                shared_titles.invalidate(media_type, ids)
+                for start in range(0, len(ids), TMDB_CHANGES_EXPIRE_BATCH):
+                    expired = expire_titles_metadata(media_type, ids[start:start + TMDB_CHANGES_EXPIRE_BATCH])
+                    if expired is None:
+                        return False
+                    self.expired += expired
+
+            self._mark = now
+            set_sync_state(STATE_NAME, now.isoformat())
+            self.polls += 1
+            self.changed += len(changed)
+            return True
+
+    def stats(self) -> dict:
+        return {
+            "polls": self.polls,
+            "changed": self.changed,
+            "evicted": self.evicted,
+            "expired": self.expired,
+            "mark": self._mark.isoformat() if self._mark else None
+        }
+
+
+change_feed = ChangeFeedPoller()
@@ -1,6 +1,11 @@
+from app.services.db.membership import *
 from app.services.db.movies import *
 from app.services.db.series import *
 from app.services.db.notifications import *
 from app.services.db.users import *
 from app.services.db.user_stats import *
-from app.services.db.user_titles import *
\ No newline at end of file
+from app.services.db.user_titles import *
+from app.services.db.title_metadata import *
+from app.services.db.title_catalog import *
+from app.services.db.sync_state import *
+from app.services.db.library import *
\ No newline at end of file
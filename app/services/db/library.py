@@ -0,0 +1,164 @@
+from sqlalchemy import text
+from app.extensions import db
+from app.services.db.membership import LIBRARY_LISTS, library_cache
+
+# ============================================================
+# Library Pages - Keyset pages of a user's list in any sort order
+# ============================================================
+
+# Sort order -> column (each one has an index on (user_id, column, id column))
+LIBRARY_SORT_COLUMNS = {
+    "recent": "updated_at",
+    "rating": "user_rating",
+    "title": "title_sort",
+    "year": "release_year",
+}
+
+# Sort columns stored as single-precision FLOAT on MySQL: the cursor's value
+# (a double, e.g. 7.3) has to be narrowed the same way to compare equal
+SINGLE_PRECISION_COLUMNS = ("user_rating",)
+
+# User fields returned with every row of a list
+LIBRARY_LIST_FIELDS = {
+    ("movie", "seen"): "user_rating, updated_at",
+    ("movie", "watchlist"): "updated_at",
+    ("tv", "seen"): "last_season_seen, status, user_rating, updated_at",
+    ("tv", "watchlist"): "updated_at",
+}
+
+
+def _keyset_condition(column: str, id_column: str, descending: bool, after_value, dialect: str = None) -> str:
+    """
+    Rows strictly after (after_value, after_id) in ORDER BY column, id_column.
+    NULL sort values (unrated titles, titles without metadata yet) sort as the
+    smallest value, like they do in the index.
+    """
+    value = ":after_value"
+    if dialect == "mysql" and column in SINGLE_PRECISION_COLUMNS:
+        value = "CAST(:after_value AS FLOAT)"
+    if descending:
+        if after_value is None:
+            return f"{column} IS NULL AND {id_column} < :after_id"
+        return f"({column} < {value} OR {column} IS NULL OR ({column} = {value} AND {id_column} < :after_id))"
+    if after_value is None:
+        return f"(({column} IS NULL AND {id_column} > :after_id) OR {column} IS NOT NULL)"
+    return f"({column} > {value} OR ({column} = {value} AND {id_column} > :after_id))"
+
+
+def get_library_page(user_id: int, media_type: str, list_name: str, sort: str = "recent", descending: bool = True,
+                     after: tuple = None, limit: int = 30):
+    """
+    One page of a user's list ordered by the sort column, then the title id.
+    after is the (sort_value, id) of the last row of the previous page; every
+    page is a range scan of the list's (user_id, column, id) index, however
+    deep it is. Each row also has the sort column as sort_value.
+    """
+    if not user_id or (media_type, list_name) not in LIBRARY_LISTS or sort not in LIBRARY_SORT_COLUMNS:
+        return []
+
+    table, id_column = LIBRARY_LISTS[(media_type, list_name)]
+    column = LIBRARY_SORT_COLUMNS[sort]
+    direction = "DESC" if descending else "ASC"
+    params = {"user_id": user_id, "limit": limit}
+    where = "user_id=:user_id"
+
+    try:
+        if after is not None:
+            params["after_value"], params["after_id"] = after
+            dialect = db.session.get_bind().dialect.name
+            where += " AND " + _keyset_condition(column, id_column, descending, after[0], dialect)
+        query = f"""
+                SELECT {id_column}, {LIBRARY_LIST_FIELDS[(media_type, list_name)]}, {column} AS sort_value
+                FROM {table}
+                WHERE {where}
+                ORDER BY {column} {direction}, {id_column} {direction}
+                LIMIT :limit
+            """
+        res = db.session.execute(text(query), params)
+        return [dict(row._mapping) for row in res]
+    except Exception:
+        db.session.rollback()
+        return []
+
+
+# ============================================================
+# Library Pages - Title sort keys
+# ============================================================
+
+def get_library_ids_missing_sort_keys(user_id: int, media_type: str, list_name: str, limit: int):
+    """Up to limit ids of the user's titles in the list whose title/year sort keys were never filled."""
+    if not user_id or (media_type, list_name) not in LIBRARY_LISTS:
+        return []
+
+    table, id_column = LIBRARY_LISTS[(media_type, list_name)]
+    try:
+        res = db.session.execute(
+            text(f"SELECT {id_column} FROM {table} WHERE user_id=:user_id AND title_sort IS NULL ORDER BY {id_column} LIMIT :limit"),
+            {"user_id": user_id, "limit": limit}
+        )
+        return [row[0] for row in res]
+    except Exception:
+        db.session.rollback()
+        return []
+
+
+def get_rows_missing_sort_keys(media_type: str, list_name: str, after: tuple = None, limit: int = 500):
+    """
+    Rows of every user's list without sort keys, in primary key order after
+    the (user_id, id) of the previous batch. Returns [(user_id, tmdb_id)].
+    """
+    if (media_type, list_name) not in LIBRARY_LISTS:
+        return []
+
+    table, id_column = LIBRARY_LISTS[(media_type, list_name)]
+    params = {"limit": limit}
+    where = "title_sort IS NULL"
+    if after is not None:
+        params["after_user"], params["after_id"] = after
+        where += f" AND (user_id > :after_user OR (user_id = :after_user AND {id_column} > :after_id))"
+    try:
+        res = db.session.execute(
+            text(f"SELECT user_id, {id_column} FROM {table} WHERE {where} ORDER BY user_id, {id_column} LIMIT :limit"),
+            params
+        )
+        return [(row[0], row[1]) for row in res]
+    except Exception:
+        db.session.rollback()
+        return []
+
+
+def set_title_sort_keys(user_id: int, media_type: str, sort_keys: dict):
+    """
+    Copies titles' sort keys into the user's list rows of those titles (watched
+    and watchlist). sort_keys maps tmdb_id to (title_sort, release_year).
+    updated_at is kept as is, so the "recent" order doesn't move; the user's
+    library version is bumped, so pages cached in the old order are dropped.
+    """
+    if not user_id or not media_type or not sort_keys:
+        return False
+
+    rows = [
+        {"user_id": user_id, "tmdb_id": tmdb_id, "title_sort": title_sort, "release_year": release_year}
+        for tmdb_id, (title_sort, release_year) in sort_keys.items()
+    ]
+    tables = {LIBRARY_LISTS[key] for key in LIBRARY_LISTS if key[0] == media_type}
+    try:
+        for table, id_column in sorted(tables):
+            db.session.execute(
+                text(f"""
+                    UPDATE {table}
+                    SET title_sort=:title_sort, release_year=:release_year, updated_at=updated_at
+                    WHERE user_id=:user_id AND {id_column}=:tmdb_id
+                """),
+                rows
+            )
+        version = library_cache.stamp(user_id)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        return False
+
+    for media_type_, list_name in LIBRARY_LISTS:
+        if media_type_ == media_type:
+            library_cache.record_change(user_id, media_type, list_name, version)
+    return True
@@ -0,0 +1,233 @@
+import bisect
+import threading
+import time
+from array import array
+from collections import OrderedDict
+from sqlalchemy import text
+from app.extensions import db
+# Constants
+from app.constants import LIBRARY_CACHE_USERS, LIBRARY_VERSION_CHECK_INTERVAL
+
+# ============================================================
+# Library Membership - Per-user cache of seen/watchlist ids
+# ============================================================
+
+# (media_type, list) -> (table, id column)
+LIBRARY_LISTS = {
+    ("movie", "seen"): ("user_movies_seen", "api_movie_id"),
+    ("movie", "watchlist"): ("user_movies_watchlist", "api_movie_id"),
+    ("tv", "seen"): ("user_series_progress", "api_serie_id"),
+    ("tv", "watchlist"): ("user_series_watchlist", "api_serie_id"),
+}
+
+LIBRARY_QUERY = " UNION ALL ".join(
+    f"SELECT '{media_type}' AS media_type, '{list_name}' AS list_name, {column} AS tmdb_id FROM {table} WHERE user_id=:user_id"
+    for (media_type, list_name), (table, column) in LIBRARY_LISTS.items()
+)
+
+
+# Version row bumped by writes that touch every user's lists
+LIBRARY_VERSION_ALL = 0
+
+
+def _bump_version_query() -> str:
+    """Increments a library_versions row (created at 1)."""
+    if db.session.get_bind().dialect.name == "mysql":
+        return "INSERT INTO library_versions (user_id, version) VALUES (:user_id, 1) ON DUPLICATE KEY UPDATE version=version+1"
+    return "INSERT INTO library_versions (user_id, version) VALUES (:user_id, 1) ON CONFLICT (user_id) DO UPDATE SET version=version+1"
+
+
+class UserLibrary:
+    """One user's list memberships: a sorted array('i') of ids per (media_type, list), as of a library version."""
+    __slots__ = ("lists", "version")
+
+    def __init__(self, lists: dict, version: int):
+        self.lists = lists
+        self.version = version
+
+    def contains(self, media_type: str, list_name: str, tmdb_id: int) -> bool:
+        ids = self.lists[(media_type, list_name)]
+        i = bisect.bisect_left(ids, tmdb_id)
+        return i < len(ids) and ids[i] == tmdb_id
+
+    def add(self, media_type: str, list_name: str, tmdb_id: int):
+        ids = self.lists[(media_type, list_name)]
+        i = bisect.bisect_left(ids, tmdb_id)
+        if i == len(ids) or ids[i] != tmdb_id:
+            ids.insert(i, tmdb_id)
+
+    def remove(self, media_type: str, list_name: str, tmdb_id: int):
+        ids = self.lists[(media_type, list_name)]
+        i = bisect.bisect_left(ids, tmdb_id)
+        if i < len(ids) and ids[i] == tmdb_id:
+            del ids[i]
+
+
+class LibraryCache:
+    """
+    LRU of UserLibrary by user id, loaded with one query on first use.
+
+    Every write to a user's lists bumps the user's row of library_versions in
+    its own transaction (stamp). Reads compare a cached library with that
+    version, which is read again (one primary key lookup) at most every
+    check_interval seconds per user, so checks in between are answered from
+    memory and writes made through other workers show up within that
+    interval. The add/remove functions of movies.py and series.py write
+    through to this worker's copy, so the writing worker sees its own writes
+    at once without reloading. Every recorded write (updates of list rows
+    included) is passed on to the listeners, e.g. caches of list pages.
+    """
+
+    def __init__(self, max_users: int = LIBRARY_CACHE_USERS, check_interval: float = LIBRARY_VERSION_CHECK_INTERVAL):
+        self.max_users = max_users
+        self.check_interval = check_interval
+        self._libraries = OrderedDict()
+        self._versions = OrderedDict()      # user_id -> (read at, (user's version, every user's version))
+        self._lock = threading.Lock()
+        self._listeners = []
+        # Counters
+        self.hits = 0
+        self.loads = 0
+        self.version_reads = 0
+
+    def version(self, user_id: int):
+        """
+        (user's version, every user's version), as read at most check_interval
+        seconds ago, or None if it can't be read. Anything cached from a user's
+        lists is current while this is unchanged.
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._versions.get(user_id)
+            if entry is not None and now - entry[0] < self.check_interval:
+                return entry[1]
+            self.version_reads += 1
+        version = self._read_version(user_id)
+        if version is not None:
+            with self._lock:
+                self._versions[user_id] = (now, version)
+                self._versions.move_to_end(user_id)
+                while len(self._versions) > self.max_users:
+                    self._versions.popitem(last=False)
+        return version
+
+    def _read_version(self, user_id: int):
+        try:
+            rows = db.session.execute(
+                text("SELECT user_id, version FROM library_versions WHERE user_id IN (:user_id, :all_users)"),
+                {"user_id": user_id, "all_users": LIBRARY_VERSION_ALL}
+            ).all()
+        except Exception:
+            db.session.rollback()
+            return None
+        versions = dict(rows)
+        return versions.get(user_id, 0), versions.get(LIBRARY_VERSION_ALL, 0)
+
+    def stamp(self, user_id) -> int:
+        """
+        Bump the version of a user's lists (of every user's with user_id None)
+        in the caller's transaction, before its commit. Returns the new version.
+        """
+        row = LIBRARY_VERSION_ALL if user_id is None else user_id
+        db.session.execute(text(_bump_version_query()), {"user_id": row})
+        return db.session.execute(text("SELECT version FROM library_versions WHERE user_id=:user_id"), {"user_id": row}).scalar()
+
+    def get(self, user_id: int):
+        """Returns the user's current UserLibrary (loading it if needed), or None if it can't be read."""
+        if not user_id:
+            return None
+        version = self.version(user_id)
+        if version is None:
+            return None
+        with self._lock:
+            library = self._libraries.get(user_id)
+            if library is not None and library.version == version[0]:
+                self._libraries.move_to_end(user_id)
+                self.hits += 1
+                return library
+
+        # Read after the version: a write committed meanwhile shows up as a newer version next time
+        library = self._load(user_id, version[0])
+        if library is not None:
+            with self._lock:
+                self._libraries[user_id] = library
+                self._libraries.move_to_end(user_id)
+                while len(self._libraries) > self.max_users:
+                    self._libraries.popitem(last=False)
+        return library
+
+    def _load(self, user_id: int, version: int):
+        with self._lock:
+            self.loads += 1
+        try:
+            rows = db.session.execute(text(LIBRARY_QUERY), {"user_id": user_id}).all()
+        except Exception:
+            db.session.rollback()
+            return None
+        collected = {key: [] for key in LIBRARY_LISTS}
+        for row in rows:
+            collected[(row.media_type, row.list_name)].append(row.tmdb_id)
+        return UserLibrary({key: array("i", sorted(ids)) for key, ids in collected.items()}, version)
+
+    def contains(self, user_id: int, media_type: str, list_name: str, tmdb_id: int):
+        """True/False from memory, or None when the library can't be read (callers fall back to SQL)."""
+        library = self.get(user_id)
+        if library is None:
+            return None
+        return library.contains(media_type, list_name, int(tmdb_id))
+
+    def record_add(self, user_id: int, media_type: str, list_name: str, tmdb_id: int, version: int):
+        """Apply a committed insert (made at the stamped version) to the cached library, if any."""
+        self._record(user_id, media_type, list_name, int(tmdb_id), UserLibrary.add, version)
+
+    def record_remove(self, user_id: int, media_type: str, list_name: str, tmdb_id: int, version: int):
+        """Apply a committed delete (made at the stamped version) to the cached library, if any."""
+        self._record(user_id, media_type, list_name, int(tmdb_id), UserLibrary.remove, version)
+
+    def record_change(self, user_id, media_type: str, list_name: str, version: int):
+        """
+        A committed update of list rows (rating, status...) that keeps their ids;
+        user_id None for any user. Several lists can be recorded at one version.
+        """
+        self._record(user_id, media_type, list_name, None, None, version)
+
+    def _record(self, user_id, media_type, list_name, tmdb_id, apply, version):
+        with self._lock:
+            # This worker's next check reads the new version
+            if user_id is None:
+                self._versions.clear()
+            else:
+                self._versions.pop(user_id, None)
+        if user_id is not None:
+            with self._lock:
+                library = self._libraries.get(user_id)
+                if library is not None:
+                    if library.version == version - 1:
+                        # Nothing else was written in between: the copy stays current
+                        if apply is not None:
+                            apply(library, media_type, list_name, tmdb_id)
+                        library.version = version
+                    elif library.version != version:
+                        del self._libraries[user_id]
+        self._notify(user_id, media_type, list_name)
+
+    def add_listener(self, listener):
+        """Call listener(user_id, media_type, list_name) after every recorded write."""
+        self._listeners.append(listener)
+
+    def _notify(self, user_id, media_type, list_name):
+        for listener in self._listeners:
+            listener(user_id, media_type, list_name)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "users": len(self._libraries),
+                "ids": sum(len(ids) for library in self._libraries.values() for ids in library.lists.values()),
+                "hits": self.hits,
+                "loads": self.loads,
+                "version_reads": self.version_reads
+            }
+
+
+library_cache = LibraryCache()
@@ -1,6 +1,7 @@
 from app.extensions import db
 from sqlalchemy import text
 from datetime import datetime
+from app.services.db.membership import library_cache
 
 # ============================================================
 # Movies - Check Status
@@ -13,6 +14,10 @@ def is_movie_in_seen(user_id: int, api_movie_id: int) -> bool:
     if not user_id or not api_movie_id:
         return False
     
+    cached = library_cache.contains(user_id, "movie", "seen", api_movie_id)
+    if cached is not None:
+        return cached
+    
     try:
         result = db.session.execute(
             text("SELECT 1 FROM user_movies_seen WHERE user_id=:user_id AND api_movie_id=:api_movie_id"),
@@ -30,6 +35,10 @@ def is_movie_in_watchlist(user_id: int, api_movie_id: int) -> bool:
     if not user_id or not api_movie_id:
         return False
     
+    cached = library_cache.contains(user_id, "movie", "watchlist", api_movie_id)
+    if cached is not None:
+        return cached
+    
     try:
         result = db.session.execute(
             text("SELECT 1 FROM user_movies_watchlist WHERE user_id=:user_id AND api_movie_id=:api_movie_id"),
@@ -44,24 +53,27 @@ def is_movie_in_watchlist(user_id: int, api_movie_id: int) -> bool:
 # Movies - Seen
 # ============================================================
 
-def add_movie_to_seen(user_id: int, api_movie_id: int, rating: float = None):
+def add_movie_to_seen(user_id: int, api_movie_id: int, rating: float = None, title_sort: str = None, release_year: int = None):
     """
     Marks a movie as seen by the user.
-    Optionally includes a user rating (0.0-10.0).
+    Optionally includes a user rating (0.0-10.0) and the title's sort keys
+    (see get_title_sort_keys in app/services/library_pages.py).
     """
     if not user_id or not api_movie_id:
         return False
     
     try:
         db.session.execute(
-            text("INSERT INTO user_movies_seen (user_id, api_movie_id, user_rating) VALUES (:user_id, :api_movie_id, :user_rating)"),
-            {"user_id": user_id, "api_movie_id": api_movie_id, "user_rating": rating}
+            text("INSERT INTO user_movies_seen (user_id, api_movie_id, user_rating, title_sort, release_year) VALUES (:user_id, :api_movie_id, :user_rating, :title_sort, :release_year)"),
+            {"user_id": user_id, "api_movie_id": api_movie_id, "user_rating": rating, "title_sort": title_sort, "release_year": release_year}
         )
+        version = library_cache.stamp(user_id)
         db.session.commit()
     except Exception:
         db.session.rollback()
         return False
     
+    library_cache.record_add(user_id, "movie", "seen", api_movie_id, version)
     return True
 
 def remove_movie_from_seen(user_id: int, api_movie_id: int):
@@ -76,11 +88,13 @@ def remove_movie_from_seen(user_id: int, api_movie_id: int):
             text("DELETE FROM user_movies_seen WHERE user_id=:user_id AND api_movie_id=:api_movie_id"),
             {"user_id": user_id, "api_movie_id": api_movie_id}
         )
+        version = library_cache.stamp(user_id)
         db.session.commit()
     except Exception:
         db.session.rollback()
         return False
     
+    library_cache.record_remove(user_id, "movie", "seen", api_movie_id, version)
     return True
 
 def update_movie_rating(user_id: int, api_movie_id: int, new_rating: float):
@@ -96,11 +110,13 @@ def update_movie_rating(user_id: int, api_movie_id: int, new_rating: float):
             text("UPDATE user_movies_seen SET user_rating=:user_rating WHERE user_id=:user_id AND api_movie_id=:api_movie_id"),
             {"user_rating": new_rating, "user_id": user_id, "api_movie_id": api_movie_id}
         )
+        version = library_cache.stamp(user_id)
         db.session.commit()
     except Exception:
         db.session.rollback()
         return False
     
+    library_cache.record_change(user_id, "movie", "seen", version)
     return True
 
 def get_movies_watched(user_id: int, last_movie_id: int = None, last_date: datetime = None, limit: int = 30):
@@ -108,7 +124,7 @@ def get_movies_watched(user_id: int, last_movie_id: int = None, last_date: datet
         return []
     
     try:
-        if not (last_movie_id is not None or last_date is not None):
+        if not (last_movie_id is not None and last_date is not None):
             query = """
                     SELECT api_movie_id, user_rating, updated_at
                     FROM user_movies_seen
@@ -140,23 +156,25 @@ def get_movies_watched(user_id: int, last_movie_id: int = None, last_date: datet
 # Movies - Watchlist
 # ============================================================
 
-def add_movie_to_watchlist(user_id: int, api_movie_id: int):
+def add_movie_to_watchlist(user_id: int, api_movie_id: int, title_sort: str = None, release_year: int = None):
     """
-    Adds a movie to the user's watchlist.
+    Adds a movie to the user's watchlist, optionally with the title's sort keys.
     """
     if not user_id or not api_movie_id:
         return False
     
     try:
         db.session.execute(
-            text("INSERT INTO user_movies_watchlist (user_id, api_movie_id) VALUES (:user_id, :api_movie_id)"),
-            {"user_id": user_id, "api_movie_id": api_movie_id}
+            text("INSERT INTO user_movies_watchlist (user_id, api_movie_id, title_sort, release_year) VALUES (:user_id, :api_movie_id, :title_sort, :release_year)"),
+            {"user_id": user_id, "api_movie_id": api_movie_id, "title_sort": title_sort, "release_year": release_year}
         )
+        version = library_cache.stamp(user_id)
         db.session.commit()
     except Exception:
         db.session.rollback()
         return False
     
+    library_cache.record_add(user_id, "movie", "watchlist", api_movie_id, version)
     return True
 
 def remove_movie_from_watchlist(user_id: int, api_movie_id: int):
@@ -171,11 +189,13 @@ def remove_movie_from_watchlist(user_id: int, api_movie_id: int):
             text("DELETE FROM user_movies_watchlist WHERE user_id=:user_id AND api_movie_id=:api_movie_id"),
             {"user_id": user_id, "api_movie_id": api_movie_id}
         )
+        version = library_cache.stamp(user_id)
         db.session.commit()
     except Exception:
         db.session.rollback()
         return False
     
+    library_cache.record_remove(user_id, "movie", "watchlist", api_movie_id, version)
     return True
 
 def get_movies_watchlist(user_id: int, last_movie_id: int = None, last_date: datetime = None, limit: int = 30):
@@ -1,6 +1,7 @@
 from app.extensions import db
 from sqlalchemy import text
 from datetime import datetime
+from app.services.db.membership import library_cache
 
 # ============================================================
 # Series - Check Status
@@ -13,6 +14,10 @@ def is_series_in_progress(user_id: int, api_serie_id: int) -> bool:
     if not user_id or not api_serie_id:
         return False
     
+    cached = library_cache.contains(user_id, "tv", "seen", api_serie_id)
+    if cached is not None:
+        return cached
+    
     try:
         result = db.session.execute(
             text("SELECT 1 FROM user_series_progress WHERE user_id=:user_id AND api_serie_id=:api_serie_id"),
@@ -30,6 +35,10 @@ def is_series_in_watchlist(user_id: int, api_serie_id: int) -> bool:
     if not user_id or not api_serie_id:
         return False
     
+    cached = library_cache.contains(user_id, "tv", "watchlist", api_serie_id)
+    if cached is not None:
+        return cached
+    
     try:
         result = db.session.execute(
             text("SELECT 1 FROM user_series_watchlist WHERE user_id=:user_id AND api_serie_id=:api_serie_id"),
@@ -44,10 +53,15 @@ def is_series_in_watchlist(user_id: int, api_serie_id: int) -> bool:
 # Series - Progress (Seen)
 # ============================================================
 
-def add_series_to_progress(user_id: int, api_serie_id: int, last_season_seen: int = 1, status: str = "Watching", rating: float = None):
+# Once the user moves on, the series can be flagged again for its next season
+CLEAR_NEW_SEASON = "status=CASE WHEN status='New Season Available' THEN 'Watching' ELSE status END"
+
+def add_series_to_progress(user_id: int, api_serie_id: int, last_season_seen: int = 1, status: str = "Watching", rating: float = None,
+                           title_sort: str = None, release_year: int = None):
     """
     Adds a series to the user's progress tracking.
-    Tracks which season they're on, their watching status, and optional rating.
+    Tracks which season they're on, their watching status, and optional rating
+    and sort keys (see get_title_sort_keys in app/services/library_pages.py).
     Status options: "New Season Available", "Seen", "Watching"
     """
     if not user_id or not api_serie_id:
@@ -55,14 +69,20 @@ def add_series_to_progress(user_id: int, api_serie_id: int, last_season_seen: in
     
     try:
         db.session.execute(
-            text("INSERT INTO user_series_progress (user_id, api_serie_id, last_season_seen, status, user_rating) VALUES (:user_id, :api_serie_id, :last_season_seen, :status, :user_rating)"),
-            {"user_id": user_id, "api_serie_id": api_serie_id, "last_season_seen": last_season_seen, "status": status, "user_rating": rating}
+            text("""
+                INSERT INTO user_series_progress (user_id, api_serie_id, last_season_seen, status, user_rating, title_sort, release_year)
+                VALUES (:user_id, :api_serie_id, :last_season_seen, :status, :user_rating, :title_sort, :release_year)
+            """),
+            {"user_id": user_id, "api_serie_id": api_serie_id, "last_season_seen": last_season_seen, "status": status, "user_rating": rating,
+             "title_sort": title_sort, "release_year": release_year}
         )
+        version = library_cache.stamp(user_id)
         db.session.commit()
     except Exception:
         db.session.rollback()
         return False
     
+    library_cache.record_add(user_id, "tv", "seen", api_serie_id, version)
     return True
 
 def remove_series_from_progress(user_id: int, api_serie_id: int):
@@ -77,11 +97,13 @@ def remove_series_from_progress(user_id: int, api_serie_id: int):
             text("DELETE FROM user_series_progress WHERE user_id=:user_id AND api_serie_id=:api_serie_id"),
             {"user_id": user_id, "api_serie_id": api_serie_id}
         )
+        version = library_cache.stamp(user_id)
         db.session.commit()
     except Exception:
         db.session.rollback()
         return False
     
+    library_cache.record_remove(user_id, "tv", "seen", api_serie_id, version)
     return True
 
 def update_series_progress(user_id: int, api_serie_id: int, last_season_seen: int = None, status: str = None, rating: float = None):
@@ -103,6 +125,8 @@ def update_series_progress(user_id: int, api_serie_id: int, last_season_seen: in
     if status is not None:
         updates.append("status=:status")
         params["status"] = status
+    elif last_season_seen is not None:
+        updates.append(CLEAR_NEW_SEASON)
     
     if rating is not None:
         updates.append("user_rating=:user_rating")
@@ -115,11 +139,13 @@ def update_series_progress(user_id: int, api_serie_id: int, last_season_seen: in
     
     try:
         db.session.execute(text(query), params)
+        version = library_cache.stamp(user_id)
         db.session.commit()
     except Exception:
         db.session.rollback()
         return False
     
+    library_cache.record_change(user_id, "tv", "seen", version)
     return True
 
 def update_series_status(user_id: int, api_serie_id: int, status: str):
@@ -135,30 +161,35 @@ def update_series_status(user_id: int, api_serie_id: int, status: str):
             text("UPDATE user_series_progress SET status=:status WHERE user_id=:user_id AND api_serie_id=:api_serie_id"),
             {"status": status, "user_id": user_id, "api_serie_id": api_serie_id}
         )
+        version = library_cache.stamp(user_id)
         db.session.commit()
     except Exception:
         db.session.rollback()
         return False
     
+    library_cache.record_change(user_id, "tv", "seen", version)
     return True
 
 def update_series_season(user_id: int, api_serie_id: int, last_season_seen: int):
     """
     Updates the last season seen for a series.
+    A "New Season Available" status goes back to "Watching".
     """
     if not user_id or not api_serie_id or last_season_seen is None:
         return False
     
     try:
         db.session.execute(
-            text("UPDATE user_series_progress SET last_season_seen=:last_season_seen WHERE user_id=:user_id AND api_serie_id=:api_serie_id"),
+            text(f"UPDATE user_series_progress SET last_season_seen=:last_season_seen, {CLEAR_NEW_SEASON} WHERE user_id=:user_id AND api_serie_id=:api_serie_id"),
             {"last_season_seen": last_season_seen, "user_id": user_id, "api_serie_id": api_serie_id}
         )
+        version = library_cache.stamp(user_id)
         db.session.commit()
     except Exception:
         db.session.rollback()
         return False
     
+    library_cache.record_change(user_id, "tv", "seen", version)
     return True
 
 def update_series_rating(user_id: int, api_serie_id: int, new_rating: float):
@@ -174,11 +205,13 @@ def update_series_rating(user_id: int, api_serie_id: int, new_rating: float):
             text("UPDATE user_series_progress SET user_rating=:user_rating WHERE user_id=:user_id AND api_serie_id=:api_serie_id"),
             {"user_rating": new_rating, "user_id": user_id, "api_serie_id": api_serie_id}
         )
+        version = library_cache.stamp(user_id)
         db.session.commit()
     except Exception:
         db.session.rollback()
         return False
     
+    library_cache.record_change(user_id, "tv", "seen", version)
     return True
 
 def get_series_watched(user_id: int, last_serie_id: int = None, last_date: datetime = None, limit: int = 30):
@@ -217,23 +250,25 @@ def get_series_watched(user_id: int, last_serie_id: int = None, last_date: datet
 # Series - Watchlist
 # ============================================================
 
-def add_series_to_watchlist(user_id: int, api_serie_id: int):
+def add_series_to_watchlist(user_id: int, api_serie_id: int, title_sort: str = None, release_year: int = None):
     """
-    Adds a series to the user's watchlist.
+    Adds a series to the user's watchlist, optionally with the title's sort keys.
     """
     if not user_id or not api_serie_id:
         return False
     
     try:
         db.session.execute(
-            text("INSERT INTO user_series_watchlist (user_id, api_serie_id) VALUES (:user_id, :api_serie_id)"),
-            {"user_id": user_id, "api_serie_id": api_serie_id}
+            text("INSERT INTO user_series_watchlist (user_id, api_serie_id, title_sort, release_year) VALUES (:user_id, :api_serie_id, :title_sort, :release_year)"),
+            {"user_id": user_id, "api_serie_id": api_serie_id, "title_sort": title_sort, "release_year": release_year}
         )
+        version = library_cache.stamp(user_id)
         db.session.commit()
     except Exception:
         db.session.rollback()
         return False
     
+    library_cache.record_add(user_id, "tv", "watchlist", api_serie_id, version)
     return True
 
 def remove_series_from_watchlist(user_id: int, api_serie_id: int):
@@ -248,11 +283,13 @@ def remove_series_from_watchlist(user_id: int, api_serie_id: int):
             text("DELETE FROM user_series_watchlist WHERE user_id=:user_id AND api_serie_id=:api_serie_id"),
             {"user_id": user_id, "api_serie_id": api_serie_id}
         )
+        version = library_cache.stamp(user_id)
         db.session.commit()
     except Exception:
         db.session.rollback()
         return False
     
+    library_cache.record_remove(user_id, "tv", "watchlist", api_serie_id, version)
     return True
 
 def get_series_watchlist(user_id: int, last_serie_id: int = None, last_date: datetime = None, limit: int = 30):
@@ -284,4 +321,96 @@ def get_series_watchlist(user_id: int, last_serie_id: int = None, last_date: dat
         return results
     
     except Exception:
-        return []
\ No newline at end of file
+        return []
+
+
+# ============================================================
+# Series - New season scan
+# ============================================================
+
+# A progress row is due a "new season" notification when the latest aired season
+# is past the last one the user saw and aired after the user last updated the row
+# (so series added after the season came out aren't flagged)
+NEW_SEASON_DUE = """
+    COALESCE({p}.last_season_seen, 0) < s.season_number
+    AND {p}.updated_at < s.aired_at
+    AND ({p}.status IS NULL OR {p}.status <> 'New Season Available')
+"""
+
+def get_series_to_scan():
+    """
+    Returns one row per series in anyone's progress list that could be due a
+    "new season" notification: api_serie_id, the lowest last_season_seen and
+    the oldest updated_at among its not yet flagged rows.
+    Returns empty list on error.
+    """
+    try:
+        res = db.session.execute(text("""
+            SELECT api_serie_id, MIN(COALESCE(last_season_seen, 0)) AS min_season, MIN(updated_at) AS oldest_update
+            FROM user_series_progress
+            WHERE status IS NULL OR status <> 'New Season Available'
+            GROUP BY api_serie_id
+        """))
+        return [dict(row._mapping) for row in res]
+    except Exception:
+        db.session.rollback()
+        return []
+
+def flag_new_seasons(seasons: list[dict]):
+    """
+    Marks as "New Season Available" every progress row behind the latest aired
+    season of its series, and notifies the row's user, in one transaction.
+    Each entry has api_serie_id, season_number, aired_at (datetime), message and target_url.
+
+    The seasons go to a temporary table, so the whole batch takes one
+    INSERT ... SELECT for the notifications and one UPDATE for the statuses,
+    whatever the number of users. updated_at is kept, so flagged series don't
+    move in the users' lists.
+    Returns the number of users notified, or None on error.
+    """
+    if not seasons:
+        return 0
+    
+    temporary = "TEMPORARY " if db.session.get_bind().dialect.name == "mysql" else ""
+    try:
+        db.session.execute(text(f"DROP {temporary}TABLE IF EXISTS new_season_scan"))
+        db.session.execute(text("""
+            CREATE TEMPORARY TABLE new_season_scan (
+                api_serie_id INTEGER PRIMARY KEY,
+                season_number INTEGER NOT NULL,
+                aired_at DATETIME NOT NULL,
+                message TEXT NOT NULL,
+                target_url VARCHAR(255)
+            )
+        """))
+        db.session.execute(
+            text("INSERT INTO new_season_scan (api_serie_id, season_number, aired_at, message, target_url) VALUES (:api_serie_id, :season_number, :aired_at, :message, :target_url)"),
+            seasons
+        )
+        # Notifications first: the UPDATE below is what makes the rows no longer due
+        res = db.session.execute(text(f"""
+            INSERT INTO notifications (user_id, type, message, target_url, is_read)
+            SELECT p.user_id, 'New Season Available', s.message, s.target_url, FALSE
+            FROM user_series_progress p
+            JOIN new_season_scan s ON s.api_serie_id = p.api_serie_id
+            WHERE {NEW_SEASON_DUE.format(p="p")}
+        """))
+        notified = res.rowcount
+        db.session.execute(text(f"""
+            UPDATE user_series_progress
+            SET status='New Season Available', updated_at=updated_at
+            WHERE EXISTS (
+                SELECT 1 FROM new_season_scan s
+                WHERE s.api_serie_id = user_series_progress.api_serie_id
+                AND {NEW_SEASON_DUE.format(p="user_series_progress")}
+            )
+        """))
+        db.session.execute(text(f"DROP {temporary}TABLE new_season_scan"))
+        version = library_cache.stamp(None)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        return None
+    
+    library_cache.record_change(None, "tv", "seen", version)
+    return notified
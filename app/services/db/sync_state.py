@@ -0,0 +1,73 @@
+from datetime import datetime
+from sqlalchemy import text
+from app.extensions import db
+from app.services.db.upsert import build_upsert_query
+
+# ============================================================
+# Sync State - Background job markers
+# ============================================================
+
+def get_sync_state(name: str):
+    """Returns the stored value of a marker, or None if it was never set (or on error)."""
+    if not name:
+        return None
+    
+    try:
+        result = db.session.execute(
+            text("SELECT value FROM sync_state WHERE name=:name"),
+            {"name": name}
+        )
+        return result.scalar()
+    except Exception:
+        db.session.rollback()
+        return None
+
+def set_sync_state(name: str, value: str):
+    """
+    Stores the value of a marker, replacing the previous one.
+    """
+    if not name or value is None:
+        return False
+    
+    try:
+        query = build_upsert_query("sync_state", ["name", "value", "updated_at"], ["name"])
+        db.session.execute(text(query), {"name": name, "value": value, "updated_at": datetime.now()})
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        return False
+    
+    return True
+
+def claim_sync_slot(name: str, now: datetime, next_due: datetime) -> bool:
+    """
+    Claims a job's run when its marker (the time the next run is due) has
+    passed, moving it to next_due. A single conditional UPDATE (or the first
+    INSERT) decides, so exactly one process across workers and hosts gets
+    each run. Returns False when the run isn't due or was claimed elsewhere.
+    """
+    if not name:
+        return False
+    
+    due = next_due.strftime("%Y-%m-%d %H:%M:%S")
+    try:
+        result = db.session.execute(
+            text("UPDATE sync_state SET value=:due, updated_at=:updated_at WHERE name=:name AND value <= :now"),
+            {"name": name, "due": due, "now": now.strftime("%Y-%m-%d %H:%M:%S"), "updated_at": datetime.now()}
+        )
+        if result.rowcount == 1:
+            db.session.commit()
+            return True
+        if get_sync_state(name) is not None:
+            db.session.rollback()
+            return False
+        # First run ever: whoever inserts the marker gets it (the others hit the primary key)
+        db.session.execute(
+            text("INSERT INTO sync_state (name, value, updated_at) VALUES (:name, :due, :updated_at)"),
+            {"name": name, "due": due, "updated_at": datetime.now()}
+        )
+        db.session.commit()
+        return True
+    except Exception:
+        db.session.rollback()
+        return False
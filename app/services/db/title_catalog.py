@@ -0,0 +1,44 @@
+from datetime import datetime
+from sqlalchemy import text
+from app.extensions import db
+from app.services.db.upsert import build_upsert_query
+
+# ============================================================
+# Title Catalog - TMDB daily export ids
+# ============================================================
+
+CATALOG_COLUMNS = ["media_type", "tmdb_id", "title", "popularity", "adult", "updated_at"]
+
+def upsert_catalog_rows(rows: list[dict]):
+    """
+    Inserts or refreshes a batch of catalog rows in one statement.
+    Each row has media_type, tmdb_id, title, popularity and adult.
+    """
+    if not rows:
+        return True
+    
+    updated_at = datetime.now()
+    for row in rows:
+        row["updated_at"] = updated_at
+    
+    try:
+        query = build_upsert_query("title_catalog", CATALOG_COLUMNS, ["media_type", "tmdb_id"])
+        db.session.execute(text(query), rows)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        return False
+    
+    return True
+
+def count_catalog_titles(media_type: str):
+    """Number of catalog rows for a media type (None on error)."""
+    try:
+        result = db.session.execute(
+            text("SELECT COUNT(*) FROM title_catalog WHERE media_type=:media_type"),
+            {"media_type": media_type}
+        )
+        return result.scalar()
+    except Exception:
+        db.session.rollback()
+        return None
@@ -0,0 +1,173 @@
+import json
+import zlib
+from datetime import datetime, timedelta
+from sqlalchemy import text, bindparam
+from app.extensions import db
+from app.services.db.upsert import build_upsert_query
+
+# ============================================================
+# Title Metadata - Persistent cache of projected TMDB records
+# ============================================================
+
+# fetched_at of expired rows: older than any max_age
+EXPIRED_AT = datetime(2000, 1, 1)
+
+def _compress_record(record: dict) -> bytes:
+    return zlib.compress(json.dumps(record, separators=(",", ":")).encode("utf-8"))
+
+def _decompress_record(payload: bytes) -> dict:
+    return json.loads(zlib.decompress(payload))
+
+def get_titles_metadata(media_type: str, tmdb_ids: list[int], max_age: int):
+    """
+    Fetches the stored records for several titles in a single query.
+    Rows older than max_age seconds are treated as missing.
+    Returns a dict mapping tmdb_id to the projected record (empty on error).
+    """
+    if not media_type or not tmdb_ids:
+        return {}
+    
+    try:
+        query = text("""
+                SELECT tmdb_id, payload
+                FROM title_metadata
+                WHERE media_type=:media_type AND tmdb_id IN :tmdb_ids AND fetched_at >= :min_fetched_at
+            """).bindparams(bindparam("tmdb_ids", expanding=True))
+        result = db.session.execute(query, {
+            "media_type": media_type,
+            "tmdb_ids": list(tmdb_ids),
+            "min_fetched_at": datetime.now() - timedelta(seconds=max_age)
+        })
+        return {row.tmdb_id: _decompress_record(row.payload) for row in result}
+    except Exception:
+        db.session.rollback()
+        return {}
+
+def save_titles_metadata(media_type: str, records: dict):
+    """
+    Inserts or refreshes the stored records for several titles.
+    records maps tmdb_id to the projected record.
+    """
+    if not media_type or not records:
+        return False
+    
+    fetched_at = datetime.now()
+    rows = [
+        {"media_type": media_type, "tmdb_id": tmdb_id, "payload": _compress_record(record), "fetched_at": fetched_at}
+        for tmdb_id, record in records.items()
+    ]
+    
+    try:
+        query = build_upsert_query("title_metadata", ["media_type", "tmdb_id", "payload", "fetched_at"], ["media_type", "tmdb_id"])
+        db.session.execute(text(query), rows)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        return False
+    
+    return True
+
+def expire_titles_metadata(media_type: str, tmdb_ids: list[int]):
+    """
+    Marks the stored records of several titles as outdated, so the next
+    lookup fetches them again. The rows are kept (the local title index still
+    reads them until they are refreshed).
+    Returns the number of rows expired, or None on error.
+    """
+    if not media_type or not tmdb_ids:
+        return 0
+    
+    try:
+        query = text("""
+                UPDATE title_metadata SET fetched_at=:expired
+                WHERE media_type=:media_type AND tmdb_id IN :tmdb_ids
+            """).bindparams(bindparam("tmdb_ids", expanding=True))
+        result = db.session.execute(query, {"expired": EXPIRED_AT, "media_type": media_type, "tmdb_ids": list(tmdb_ids)})
+        db.session.commit()
+        return result.rowcount
+    except Exception:
+        db.session.rollback()
+        return None
+
+def expire_titles_metadata_before(fetched_before: datetime):
+    """
+    Marks as outdated every stored record fetched before a given time
+    (used when changes since then can't be listed anymore).
+    Returns the number of rows expired, or None on error.
+    """
+    try:
+        result = db.session.execute(
+            text("UPDATE title_metadata SET fetched_at=:expired WHERE fetched_at < :fetched_before AND fetched_at > :expired"),
+            {"expired": EXPIRED_AT, "fetched_before": fetched_before}
+        )
+        db.session.commit()
+        return result.rowcount
+    except Exception:
+        db.session.rollback()
+        return None
+
+def get_titles_metadata_page(after: tuple = None, limit: int = 1000, since: datetime = None):
+    """
+    Fetches one page of stored records in primary key order (keyset pagination),
+    for walking the table without holding it in memory.
+    after is the (media_type, tmdb_id) of the last row of the previous page;
+    with since, only rows stored at or after that time are returned.
+    Returns a list of (media_type, tmdb_id, record) tuples (empty at the end or on error).
+    """
+    conditions = []
+    params = {"limit": limit}
+    if after is not None:
+        conditions.append("(media_type > :media_type OR (media_type = :media_type AND tmdb_id > :tmdb_id))")
+        params.update({"media_type": after[0], "tmdb_id": after[1]})
+    if since is not None:
+        conditions.append("fetched_at >= :since")
+        params["since"] = since
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    
+    try:
+        query = text(f"""
+                SELECT media_type, tmdb_id, payload FROM title_metadata
+                {where}
+                ORDER BY media_type, tmdb_id
+                LIMIT :limit
+            """)
+        result = db.session.execute(query, params)
+        return [(row.media_type, row.tmdb_id, _decompress_record(row.payload)) for row in result]
+    except Exception:
+        db.session.rollback()
+        return []
+
+def get_user_titles_missing_metadata():
+    """
+    Fetches the ids referenced by any user's lists (seen, progress, watchlists)
+    that have no stored record yet.
+    Returns a dict {"movie": [ids], "tv": [ids]} (empty lists on error).
+    """
+    missing = {"movie": [], "tv": []}
+    try:
+        result = db.session.execute(text("""
+                SELECT ids.tmdb_id FROM (
+                    SELECT api_movie_id AS tmdb_id FROM user_movies_seen
+                    UNION
+                    SELECT api_movie_id FROM user_movies_watchlist
+                ) AS ids
+                LEFT JOIN title_metadata tm ON tm.media_type = 'movie' AND tm.tmdb_id = ids.tmdb_id
+                WHERE tm.tmdb_id IS NULL
+            """))
+        missing["movie"] = [row.tmdb_id for row in result]
+
+        result = db.session.execute(text("""
+                SELECT ids.tmdb_id FROM (
+                    SELECT api_serie_id AS tmdb_id FROM user_series_progress
+                    UNION
+                    SELECT api_serie_id FROM user_series_watchlist
+                ) AS ids
+                LEFT JOIN title_metadata tm ON tm.media_type = 'tv' AND tm.tmdb_id = ids.tmdb_id
+                WHERE tm.tmdb_id IS NULL
+            """))
+        missing["tv"] = [row.tmdb_id for row in result]
+    except Exception:
+        db.session.rollback()
+        return {"movie": [], "tv": []}
+    
+    return missing
@@ -0,0 +1,22 @@
+from app.extensions import db
+
+# ============================================================
+# Upsert helper
+# ============================================================
+
+def build_upsert_query(table: str, columns: list[str], key_columns: list[str]) -> str:
+    """
+    Builds an INSERT that overwrites the non-key columns when the key already exists.
+    Uses ON DUPLICATE KEY UPDATE on MySQL and ON CONFLICT elsewhere (SQLite/PostgreSQL).
+    Parameters are named after the columns, so it can be executed with a list of dicts.
+    """
+    column_list = ", ".join(columns)
+    values = ", ".join(f":{c}" for c in columns)
+    update_columns = [c for c in columns if c not in key_columns]
+
+    if db.session.get_bind().dialect.name == "mysql":
+        updates = ", ".join(f"{c}=VALUES({c})" for c in update_columns)
+        return f"INSERT INTO {table} ({column_list}) VALUES ({values}) ON DUPLICATE KEY UPDATE {updates}"
+
+    updates = ", ".join(f"{c}=excluded.{c}" for c in update_columns)
+    return f"INSERT INTO {table} ({column_list}) VALUES ({values}) ON CONFLICT ({', '.join(key_columns)}) DO UPDATE SET {updates}"
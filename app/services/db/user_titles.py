@@ -1,69 +1,78 @@
 from app.extensions import db
-from sqlalchemy import text
+from sqlalchemy import text, bindparam
+from app.services.db.membership import library_cache
 
 # ============================================================
 # User - Titles Relationship Queries
 # ============================================================
 
-def fetch_user_marks_id(user_id: int, tmdb_ids: list[int]):
+# (table, id column) holding the seen and watchlist marks, by media type
+MARK_TABLES = {
+    "movie": (("user_movies_seen", "api_movie_id"), ("user_movies_watchlist", "api_movie_id")),
+    "tv": (("user_series_progress", "api_serie_id"), ("user_series_watchlist", "api_serie_id")),
+}
+
+def fetch_user_marks_id(user_id: int, tmdb_ids: dict):
     """
-    Fetches all title IDs that the user has marked as seen or added to watchlist.
+    Fetches which of the given titles the user has marked as seen or added to watchlist.
     Used for displaying status indicators on title cards in lists/grids.
-    Returns sets of movie/series IDs for seen and watchlist categories.
+    tmdb_ids maps media type ("movie"/"tv") to a list of ids. Only those ids are
+    looked up: in memory from the user's cached library (see membership.py),
+    or with a single query (one primary key IN lookup per table) if it can't be loaded.
+    Returns {media_type: {id: {"seen": bool, "in_watchlist": bool}}}, listing
+    only the marked titles (empty dicts on error).
     """
-    movies_seen = set()
-    movies_watchlist = set()
-    series_seen = set()
-    series_watchlist = set()
-
+    marks = {media_type: {} for media_type in MARK_TABLES}
     if not user_id or not tmdb_ids:
-        return {
-            "movies_seen": movies_seen,
-            "movies_watchlist": movies_watchlist,
-            "series_seen": series_seen,
-            "series_watchlist": series_watchlist
-        }
-
-    # Movies seen
-    result = db.session.execute(
-        text("SELECT api_movie_id FROM user_movies_seen WHERE user_id=:user_id"),
-        {"user_id": user_id}
-    )
-    movies_seen = {row.api_movie_id for row in result}
-
-    # Movies watchlist
-    result = db.session.execute(
-        text("SELECT api_movie_id FROM user_movies_watchlist WHERE user_id=:user_id"),
-        {"user_id": user_id}
-    )
-    movies_watchlist = {row.api_movie_id for row in result}
-
-    # Series seen (from user_series_progress)
-    result = db.session.execute(
-        text("SELECT api_serie_id FROM user_series_progress WHERE user_id=:user_id"),
-        {"user_id": user_id}
-    )
-    series_seen = {row.api_serie_id for row in result}
-
-    # Series watchlist
-    result = db.session.execute(
-        text("SELECT api_serie_id FROM user_series_watchlist WHERE user_id=:user_id"),
-        {"user_id": user_id}
-    )
-    series_watchlist = {row.api_serie_id for row in result}
-
-    return {
-        "movies_seen": movies_seen,
-        "movies_watchlist": movies_watchlist,
-        "series_seen": series_seen,
-        "series_watchlist": series_watchlist
-    }
+        return marks
+
+    library = library_cache.get(user_id)
+    if library is not None:
+        # Answer from the in-memory membership sets
+        for media_type, ids in tmdb_ids.items():
+            if media_type not in marks:
+                continue
+            for tmdb_id in ids or ():
+                seen = library.contains(media_type, "seen", tmdb_id)
+                in_watchlist = library.contains(media_type, "watchlist", tmdb_id)
+                if seen or in_watchlist:
+                    marks[media_type][tmdb_id] = {"seen": seen, "in_watchlist": in_watchlist}
+        return marks
+
+    selects = []
+    params = {"user_id": user_id}
+    bind_names = []
+    for media_type, ((seen_table, column), (watchlist_table, _)) in MARK_TABLES.items():
+        ids = tmdb_ids.get(media_type)
+        if not ids:
+            continue
+        params[f"{media_type}_ids"] = list(set(ids))
+        bind_names.append(f"{media_type}_ids")
+        selects.append(f"SELECT '{media_type}' AS media_type, {column} AS tmdb_id, 1 AS seen, 0 AS in_watchlist FROM {seen_table} WHERE user_id=:user_id AND {column} IN :{media_type}_ids")
+        selects.append(f"SELECT '{media_type}', {column}, 0, 1 FROM {watchlist_table} WHERE user_id=:user_id AND {column} IN :{media_type}_ids")
+    if not selects:
+        return marks
+
+    try:
+        query = text(" UNION ALL ".join(selects)).bindparams(*(bindparam(name, expanding=True) for name in bind_names))
+        for row in db.session.execute(query, params):
+            flags = marks[row.media_type].setdefault(row.tmdb_id, {"seen": False, "in_watchlist": False})
+            if row.seen:
+                flags["seen"] = True
+            if row.in_watchlist:
+                flags["in_watchlist"] = True
+    except Exception:
+        db.session.rollback()
+        return {media_type: {} for media_type in MARK_TABLES}
+
+    return marks
 
 def fetch_user_marks(user_id: int, id: int, type: str):
     """
     Fetches detailed user data for a specific title (movie or series).
     Returns seen status with rating/progress info and watchlist status.
-    Used on individual title detail pages.
+    Used on individual title detail pages: always read from the database (two
+    primary key lookups), so a title just added through any worker shows up.
     """
     if not id or not user_id:
         return {"seen": [], "watchlist": False}
@@ -98,4 +107,3 @@ def fetch_user_marks(user_id: int, id: int, type: str):
         watchlist = bool(result.first())
 
     return {"seen": seen, "watchlist": watchlist}
-
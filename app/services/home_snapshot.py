@@ -0,0 +1,111 @@
+"""
+Precomputed home page data.
+
+A background PeriodicTask rebuilds the processed home sections (trending,
+popular and top rated) and publishes them as one immutable snapshot, swapped
+in atomically, together with each section's HTML-safe JSON (what the
+template's `tojson` filter used to compute on every hit). main.home only reads
+the current snapshot, so serving "/" makes no upstream calls. A failed refresh
+keeps the last good snapshot.
+
+Until a worker has its first snapshot, one request at a time builds it and
+the others are served empty sections right away. After a failed first build
+the next one waits HOME_SNAPSHOT_RETRY_DELAY seconds, doubling per failure.
+"""
+import logging
+import threading
+import time
+from types import MappingProxyType
+from jinja2.utils import htmlsafe_json_dumps
+from app.services.scheduler import PeriodicTask
+from app.services.search_info import get_home_page_data
+from app.services.api.tmdb_client import run_async
+# Constants
+from app.constants import HOME_SNAPSHOT_REFRESH_INTERVAL, HOME_SNAPSHOT_RETRY_DELAY, HOME_SNAPSHOT_RETRY_MAX_DELAY
+
+logger = logging.getLogger(__name__)
+
+HOME_SECTIONS = ("trending", "popular_movies", "popular_tv", "top_rated_movies", "top_rated_tv")
+EMPTY_SNAPSHOT = MappingProxyType(
+    {name: () for name in HOME_SECTIONS} | {f"{name}_json": htmlsafe_json_dumps([]) for name in HOME_SECTIONS}
+)
+
+
+class HomeSnapshot:
+
+    def __init__(self, interval: float = HOME_SNAPSHOT_REFRESH_INTERVAL):
+        self._snapshot = None  # Read-only mapping: section -> tuple of entries, section_json -> Markup
+        self.built_at = None
+        self._build_lock = threading.Lock()
+        # Failed first builds in a row, and when a request may try again
+        self._failures = 0
+        self._retry_at = 0.0
+        # The first build happens on the first request (see get)
+        self._task = PeriodicTask("home-snapshot", self.refresh, interval, run_immediately=False)
+
+    def refresh(self) -> bool:
+        """
+        Rebuild and publish a new snapshot.
+        Sections that came back empty keep their previous content; if every
+        section is empty the refresh counts as failed and nothing changes.
+        """
+        with self._build_lock:
+            return self._build()
+
+    def _build(self) -> bool:
+        """refresh with _build_lock held."""
+        data = run_async(get_home_page_data())
+        previous = self._snapshot or {}
+
+        if not any(data.get(name) for name in HOME_SECTIONS):
+            return False
+
+        sections = {}
+        for name in HOME_SECTIONS:
+            entries = data.get(name)
+            if entries:
+                sections[name] = tuple(entries)
+                sections[f"{name}_json"] = htmlsafe_json_dumps(entries)
+            else:
+                sections[name] = previous.get(name, ())
+                sections[f"{name}_json"] = previous.get(f"{name}_json", htmlsafe_json_dumps([]))
+
+        # Single reference assignment: readers see the old or the new snapshot, never a mix
+        self._snapshot = MappingProxyType(sections)
+        self.built_at = time.time()
+        return True
+
+    def get(self):
+        """
+        Return the current snapshot, ready to be passed to home.html.
+        Starts the background refresher in this process on first use. Without
+        a snapshot yet, the first request builds it (waiting for it) unless a
+        build is running or a failed one is backing off: then the sections are empty.
+        """
+        self._task.start()
+        snapshot = self._snapshot
+        if snapshot is not None:
+            return snapshot
+
+        if time.monotonic() < self._retry_at or not self._build_lock.acquire(blocking=False):
+            return EMPTY_SNAPSHOT
+        try:
+            if self._snapshot is None:
+                try:
+                    built = self._build()
+                except Exception:
+                    logger.exception("Home snapshot build failed")
+                    built = False
+                if built:
+                    self._failures = 0
+                else:
+                    # Served empty; the next request after the backoff (or the background task) retries
+                    self._failures += 1
+                    delay = min(HOME_SNAPSHOT_RETRY_DELAY * 2 ** (self._failures - 1), HOME_SNAPSHOT_RETRY_MAX_DELAY)
+                    self._retry_at = time.monotonic() + delay
+        finally:
+            self._build_lock.release()
+        return self._snapshot or EMPTY_SNAPSHOT
+
+
+home_snapshot = HomeSnapshot()
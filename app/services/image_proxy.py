@@ -0,0 +1,372 @@
+"""
+Local proxy for TMDB posters and backdrops.
+
+Each TMDB image is downloaded once, in TMDB's rendition of the requested width
+(the original only when TMDB has none), and kept in a content-addressed disk
+cache; WebP/JPEG variants are encoded from it on first request and stored next
+to it, so card grids get images sized for the card instead of full renditions.
+
+Layout under Config.IMAGE_CACHE_DIR:
+    refs/<sha1 of size/file>        -> sha256 of the source image
+    objects/<ab>/<sha256>           -> source image bytes
+    variants/<ab>/<sha256>.<w>.<fmt> -> resized variant
+    variants/<ab>/<sha256>.failed   -> marker: the source can't be decoded
+
+The cache is capped at Config.IMAGE_CACHE_MAX_MB: files are aged by mtime,
+refreshed when served (at most once per IMAGE_TOUCH_INTERVAL), and a
+background PeriodicTask deletes the least recently used files (prune) once a
+worker's count of the cache's bytes passes the cap; requests only add to the
+count. A deleted ref, source or variant is fetched or encoded again on its
+next request, and a path returned by get() may be gone by the time it's
+opened (callers treat that as a miss).
+
+Without Pillow, variants are TMDB's own renditions of the requested size
+(fetched and cached the same way) served as they are.
+
+Upstream fetching is pluggable: a fetcher is any callable
+(size, filename) -> bytes or None, see set_image_fetcher().
+"""
+import hashlib
+import io
+import logging
+import os
+import tempfile
+import threading
+import time
+from config import Config
+from app.services.api.tmdb_client import get_tmdb_client, run_async
+from app.services.scheduler import PeriodicTask
+# Constants
+from app.constants import (
+    IMAGE_VARIANT_WIDTHS,
+    IMAGE_SOURCE_SIZE,
+    IMAGE_JPEG_QUALITY,
+    IMAGE_WEBP_QUALITY,
+    IMAGE_FETCH_TIMEOUT,
+    IMAGE_MAX_BYTES,
+    IMAGE_CACHE_PRUNE_TARGET,
+    IMAGE_TOUCH_INTERVAL,
+    IMAGE_CACHE_PRUNE_INTERVAL,
+    IMAGE_CACHE_MEASURE_INTERVAL
+)
+
+try:
+    from PIL import Image, features
+except ImportError:  # Optional: without it TMDB's own renditions are served
+    Image = None
+
+WEBP_SUPPORTED = Image is not None and features.check("webp")
+
+logger = logging.getLogger(__name__)
+
+MIMETYPES = {"webp": "image/webp", "jpeg": "image/jpeg", "png": "image/png"}
+LOCK_STRIPES = 64
+CACHE_DIRS = ("refs", "objects", "variants")
+
+
+def _mimetype(filename: str) -> str:
+    """Mimetype of a TMDB image by its extension (TMDB serves them as they are named)."""
+    ext = filename.rsplit(".", 1)[-1].lower()
+    return MIMETYPES.get("jpeg" if ext == "jpg" else ext, "image/jpeg")
+
+
+# ============================================================
+# Fetchers
+# ============================================================
+
+class HTTPImageFetcher:
+    """Download images from TMDB's CDN (or a stand-in) over the pooled TMDB session."""
+
+    def __init__(self, base_url: str = None):
+        self.base_url = (base_url or Config.TMDB_IMAGE_BASE_URL).rstrip("/")
+
+    def __call__(self, size: str, filename: str):
+        result = run_async(
+            get_tmdb_client().get_bytes(f"{self.base_url}/{size}/{filename}", IMAGE_FETCH_TIMEOUT, IMAGE_MAX_BYTES),
+            IMAGE_FETCH_TIMEOUT + 1
+        )
+        if result is None:
+            return None
+        body, content_type = result
+        return body if content_type.startswith("image/") else None
+
+
+class DirectoryImageFetcher:
+    """Serve images from a local directory (<root>/<size>/<file>, falling back to <root>/<file>)."""
+
+    def __init__(self, root: str):
+        self.root = root
+
+    def __call__(self, size: str, filename: str):
+        for path in (os.path.join(self.root, size, filename), os.path.join(self.root, filename)):
+            if os.path.isfile(path):
+                with open(path, "rb") as f:
+                    return f.read()
+        return None
+
+
+# ============================================================
+# Disk cache
+# ============================================================
+
+class ImageProxy:
+
+    def __init__(self, root: str, fetcher=None, max_bytes: int = None):
+        self.root = root
+        self.fetcher = fetcher or HTTPImageFetcher()
+        self.max_bytes = Config.IMAGE_CACHE_MAX_MB * 1024 * 1024 if max_bytes is None else max_bytes
+        # Striped locks: concurrent requests for the same image do one download/resize
+        self._locks = [threading.Lock() for _ in range(LOCK_STRIPES)]
+        # Bytes in the cache as of the last prune plus this worker's writes since (None: not measured yet)
+        self._usage = None
+        self._measured_at = None
+        self._usage_lock = threading.Lock()
+        self._prune_lock = threading.Lock()
+        # Measuring and pruning walk the whole cache: never on a request thread
+        self._task = PeriodicTask("image-cache-prune", self.maintain, IMAGE_CACHE_PRUNE_INTERVAL)
+        # Counters
+        self.fetches = 0
+        self.fetch_failures = 0
+        self.resizes = 0
+        self.resize_failures = 0
+        self.evictions = 0
+
+    def _lock(self, key: str) -> threading.Lock:
+        return self._locks[int(key[:8], 16) % LOCK_STRIPES]
+
+    def _path(self, *parts) -> str:
+        return os.path.join(self.root, *parts)
+
+    def _write_atomic(self, path: str, data: bytes):
+        """Write through a temporary file so readers never see a partial image."""
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path))
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+        self._account(len(data))
+
+    def _use(self, path: str) -> bool:
+        """Whether a cached file exists; if so, refresh its mtime (its LRU age) when it's older than IMAGE_TOUCH_INTERVAL."""
+        try:
+            if time.time() - os.stat(path).st_mtime > IMAGE_TOUCH_INTERVAL:
+                os.utime(path)
+            return True
+        except OSError:
+            return False
+
+    # ============================================================
+    # Size cap
+    # ============================================================
+
+    def _account(self, nbytes: int):
+        """Count a write; the next maintain() prunes if it puts the cache over the cap."""
+        with self._usage_lock:
+            if self._usage is not None:
+                self._usage += nbytes
+
+    def maintain(self) -> int:
+        """
+        Background task: prune when the cache hasn't been measured yet (or not
+        for IMAGE_CACHE_MEASURE_INTERVAL) or this worker's count is over the cap.
+        Returns the number of files deleted.
+        """
+        if not self.max_bytes:
+            return 0
+        with self._usage_lock:
+            due = (
+                self._usage is None
+                or self._usage > self.max_bytes
+                or time.monotonic() - self._measured_at > IMAGE_CACHE_MEASURE_INTERVAL
+            )
+        return self.prune() if due else 0
+
+    def prune(self) -> int:
+        """
+        Measure the cache and, if it's over the cap, delete the least recently
+        used files (oldest mtime first) down to IMAGE_CACHE_PRUNE_TARGET of it.
+        Returns the number of files deleted (0 if another thread is pruning).
+        """
+        if not self._prune_lock.acquire(blocking=False):
+            return 0
+        try:
+            files = []
+            total = 0
+            for top in CACHE_DIRS:
+                for dirpath, _, names in os.walk(self._path(top)):
+                    for name in names:
+                        path = os.path.join(dirpath, name)
+                        try:
+                            st = os.stat(path)
+                        except OSError:
+                            continue
+                        files.append((st.st_mtime, st.st_size, path))
+                        total += st.st_size
+
+            deleted = 0
+            if self.max_bytes and total > self.max_bytes:
+                target = self.max_bytes * IMAGE_CACHE_PRUNE_TARGET
+                files.sort()
+                for _, size, path in files:
+                    if total <= target:
+                        break
+                    try:
+                        os.unlink(path)
+                    except OSError:
+                        continue
+                    total -= size
+                    deleted += 1
+                logger.info("Image cache pruned: %d files deleted, %d bytes left", deleted, total)
+
+            with self._usage_lock:
+                self._usage = total
+                self._measured_at = time.monotonic()
+            self.evictions += deleted
+            return deleted
+        finally:
+            self._prune_lock.release()
+
+    # ============================================================
+    # Source images
+    # ============================================================
+
+    def _cached_source(self, ref_path: str):
+        """The sha256 a ref points to, if both are still cached."""
+        if not self._use(ref_path):
+            return None
+        try:
+            with open(ref_path) as f:
+                digest = f.read().strip()
+        except OSError:
+            return None
+        return digest if len(digest) == 64 and self._use(self._path("objects", digest[:2], digest)) else None
+
+    def _source(self, size: str, filename: str):
+        """Return the sha256 of the source image for size/filename, downloading it if needed."""
+        ref_key = hashlib.sha1(f"{size}/{filename}".encode()).hexdigest()
+        ref_path = self._path("refs", ref_key)
+        digest = self._cached_source(ref_path)
+        if digest is not None:
+            return digest
+
+        with self._lock(ref_key):
+            digest = self._cached_source(ref_path)
+            if digest is not None:
+                return digest
+
+            self.fetches += 1
+            try:
+                body = self.fetcher(size, filename)
+            except Exception:
+                logger.exception("Image fetch failed for %s/%s", size, filename)
+                body = None
+            if not body:
+                self.fetch_failures += 1
+                return None
+
+            digest = hashlib.sha256(body).hexdigest()
+            object_path = self._path("objects", digest[:2], digest)
+            if not os.path.exists(object_path):
+                self._write_atomic(object_path, body)
+            self._write_atomic(ref_path, digest.encode())
+            return digest
+
+    # ============================================================
+    # Variants
+    # ============================================================
+
+    def get(self, size: str, filename: str, accept_webp: bool = False):
+        """
+        Return the variant of a TMDB image for a size name from IMAGE_VARIANT_WIDTHS
+        (or IMAGE_SOURCE_SIZE for the untouched source).
+
+        Returns:
+            Tuple (path, mimetype, etag), or None if the image can't be fetched
+        """
+        self._task.start()
+        resize = Image is not None and size != IMAGE_SOURCE_SIZE
+        # TMDB's rendition of the width (size names are TMDB's), the original when it has none
+        # (e.g. w1280 of a poster). Without Pillow, TMDB resizes and we only cache
+        digest = self._source(size, filename)
+        if digest is None and resize:
+            digest = self._source(IMAGE_SOURCE_SIZE, filename)
+        if digest is None:
+            return None
+
+        object_path = self._path("objects", digest[:2], digest)
+        if not resize:
+            return object_path, _mimetype(filename), f"{digest[:24]}-{size}"
+
+        fmt = "webp" if accept_webp and WEBP_SUPPORTED else "jpeg"
+        width = IMAGE_VARIANT_WIDTHS[size]
+        variant_path = self._path("variants", digest[:2], f"{digest}.{width}.{fmt}")
+        if not self._use(variant_path):
+            failed_path = self._path("variants", digest[:2], f"{digest}.failed")
+            with self._lock(digest):
+                if not self._use(variant_path):
+                    # Undecodable source: serve it untouched, without decoding it again on every request
+                    if self._use(failed_path):
+                        return object_path, _mimetype(filename), f"{digest[:24]}-{IMAGE_SOURCE_SIZE}"
+                    try:
+                        variant = self._resize(object_path, width, fmt)
+                    except (OSError, ValueError, Image.DecompressionBombError):
+                        logger.warning("Could not resize %s (%s)", filename, digest)
+                        self.resize_failures += 1
+                        self._write_atomic(failed_path, b"")
+                        return object_path, _mimetype(filename), f"{digest[:24]}-{IMAGE_SOURCE_SIZE}"
+                    self._write_atomic(variant_path, variant)
+        return variant_path, MIMETYPES[fmt], f"{digest[:24]}-{width}-{fmt}"
+
+    def _resize(self, source_path: str, width: int, fmt: str) -> bytes:
+        self.resizes += 1
+        with Image.open(source_path) as img:
+            img.draft("RGB", (width, width * 4))  # Let the JPEG decoder downscale while decoding
+            img = img.convert("RGB")
+            if img.width > width:
+                img = img.resize((width, round(img.height * width / img.width)), Image.LANCZOS)
+            out = io.BytesIO()
+            if fmt == "webp":
+                img.save(out, "WEBP", quality=IMAGE_WEBP_QUALITY, method=4)
+            else:
+                img.save(out, "JPEG", quality=IMAGE_JPEG_QUALITY, optimize=True, progressive=True)
+            return out.getvalue()
+
+    def stats(self) -> dict:
+        return {
+            "fetches": self.fetches,
+            "fetch_failures": self.fetch_failures,
+            "resizes": self.resizes,
+            "resize_failures": self.resize_failures,
+            "evictions": self.evictions,
+            "bytes": self._usage,
+            "max_bytes": self.max_bytes,
+            "pillow": Image is not None,
+            "webp": WEBP_SUPPORTED
+        }
+
+
+# ============================================================
+# Per-process instance
+# ============================================================
+
+_proxy = None
+_proxy_lock = threading.Lock()
+
+
+def get_image_proxy() -> ImageProxy:
+    global _proxy
+
+    if _proxy is None:
+        with _proxy_lock:
+            if _proxy is None:
+                _proxy = ImageProxy(Config.IMAGE_CACHE_DIR)
+    return _proxy
+
+
+def set_image_fetcher(fetcher):
+    """Replace the upstream fetcher (e.g. DirectoryImageFetcher in tests)."""
+    get_image_proxy().fetcher = fetcher
@@ -0,0 +1,257 @@
+"""
+Pagination engine of the library lists (watched and watchlist, movies and series).
+
+Every list runs the same pipeline: a keyset page of the user's rows in the
+requested order (get_library_page: recent, rating, title or release year)
+read with limit + 1 rows, so has_more is exact; the metadata of the page's
+titles in one batch (fetch_titles_info_batch: shared cache, then
+title_metadata, then TMDB); the user's fields merged into each card. The next
+page starts after the signed cursor of the last row (app/utils/cursors.py), so
+deep pages cost the same as the first one.
+
+The title and year orders read sort keys copied into the list rows when a
+title is added, from its stored record only (get_title_sort_key). Rows added
+without them (no stored record yet, or from before those keys existed) are
+filled by "flask library backfill-sort-keys", and at most a page's worth of
+them by each first page of those orders (get_title_sort_keys).
+
+Assembled pages are cached per worker by (user, list, sort, cursor, limit),
+with the user's library version read before they were assembled
+(library_cache.version): a page is only served again while that version is
+unchanged, so writes made through any worker show up once the version is
+next read (within LIBRARY_VERSION_CHECK_INTERVAL seconds).
+Writes recorded by this worker's library_cache also drop the user's pages of
+that list right away, and pages expire after LIBRARY_PAGE_CACHE_TTL seconds.
+"""
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from app.services.api.tmdb_client import run_async
+from app.services.db import (
+    LIBRARY_LISTS,
+    get_library_page,
+    get_library_ids_missing_sort_keys,
+    get_rows_missing_sort_keys,
+    set_title_sort_keys,
+    get_titles_metadata,
+    library_cache
+)
+from app.services.search_index import fold
+from app.services.search_info import fetch_titles_info_batch
+from app.services.shared_cache import shared_titles
+from app.utils.cursors import encode_cursor
+# Constants
+from app.constants import LIBRARY_PAGE_CACHE_SIZE, LIBRARY_PAGE_CACHE_TTL, LIBRARY_SORT_BACKFILL_BATCH, TITLE_METADATA_TTL
+
+# Orders read from sort keys copied out of the titles' metadata
+TITLE_SORTS = ("title", "year")
+
+
+def get_title_sort_keys(media_type: str, tmdb_ids: list) -> dict:
+    """
+    Sort keys of titles for the list rows: {tmdb_id: (folded title, release year)}.
+    Read like the cards (shared cache, title_metadata, then TMDB). When some of
+    the titles came back, the ones that didn't get an empty key, so a title TMDB
+    doesn't know isn't looked up again on every page; when none did (TMDB down),
+    none get one.
+    """
+    if not tmdb_ids:
+        return {}
+    title_info = run_async(fetch_titles_info_batch(list(tmdb_ids), media_type))
+    if not title_info:
+        return {}
+    sort_keys = {tmdb_id: ("", None) for tmdb_id in tmdb_ids}
+    for tmdb_id, title_data in title_info.items():
+        sort_keys[tmdb_id] = _sort_key(title_data)
+    return sort_keys
+
+
+def get_title_sort_key(media_type: str, tmdb_id: int) -> tuple:
+    """
+    Sort keys of one title being added to a list, from its stored record
+    (shared cache, then title_metadata) without calling TMDB. (None, None)
+    when there's none yet: the row is filled later like the older ones.
+    """
+    tmdb_id = int(tmdb_id)
+    title_data = shared_titles.get(media_type, tmdb_id) or get_titles_metadata(media_type, [tmdb_id], TITLE_METADATA_TTL).get(tmdb_id)
+    return _sort_key(title_data) if title_data else (None, None)
+
+
+def _sort_key(title_data) -> tuple:
+    """(folded title, release year) of a card record."""
+    year = str(title_data.get("release_date") or "")[:4]
+    return fold(title_data.get("title") or "")[:255], int(year) if year.isdigit() else None
+
+
+def backfill_sort_keys(batch_size: int = LIBRARY_SORT_BACKFILL_BATCH) -> dict:
+    """
+    Fill the sort keys of every list row added before they existed, batch_size
+    rows at a time. Returns {"rows": rows read, "filled": rows given keys}.
+    """
+    stats = {"rows": 0, "filled": 0}
+    for media_type, list_name in LIBRARY_LISTS:
+        after = None
+        while True:
+            rows = get_rows_missing_sort_keys(media_type, list_name, after, batch_size)
+            if not rows:
+                break
+            after = rows[-1]
+            stats["rows"] += len(rows)
+            sort_keys = get_title_sort_keys(media_type, sorted({tmdb_id for _, tmdb_id in rows}))
+            by_user = {}
+            for user_id, tmdb_id in rows:
+                if tmdb_id in sort_keys:
+                    by_user.setdefault(user_id, {})[tmdb_id] = sort_keys[tmdb_id]
+            for user_id, user_keys in by_user.items():
+                if set_title_sort_keys(user_id, media_type, user_keys):
+                    stats["filled"] += len(user_keys)
+    return stats
+
+
+def _merge_user_data(title_entry: dict, user_data: dict) -> dict:
+    """Merge user-specific data (rating, status, etc.) into title entry."""
+    if not user_data:
+        return title_entry
+
+    result = title_entry.copy()
+
+    if "user_rating" in user_data:
+        result["user_rating"] = user_data["user_rating"]
+    if "updated_at" in user_data:
+        result["updated_at"] = user_data["updated_at"].isoformat() if isinstance(user_data["updated_at"], datetime) else user_data["updated_at"]
+    if "last_season_seen" in user_data:
+        result["last_season_seen"] = user_data["last_season_seen"]
+    if "status" in user_data:
+        result["status"] = user_data["status"]
+
+    return result
+
+
+class LibraryPages:
+
+    def __init__(self, max_pages: int = LIBRARY_PAGE_CACHE_SIZE, ttl: float = LIBRARY_PAGE_CACHE_TTL, library=library_cache):
+        self.max_pages = max_pages
+        self.ttl = ttl
+        self.library = library          # LibraryCache giving the versions and recorded writes
+        self._pages = OrderedDict()     # (user_id, media_type, list, sort, descending, after, limit) -> (expires_at, version, page)
+        self._by_list = {}              # (user_id, media_type, list) -> keys of its cached pages
+        self._assembling = {}           # (user_id, media_type, list) -> [pages being assembled, writes seen meanwhile]
+        self._lock = threading.Lock()
+        # Counters
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        library.add_listener(self.invalidate)
+
+    def get_page(self, user_id: int, media_type: str, list_name: str, sort: str = "recent", descending: bool = True,
+                 after: tuple = None, limit: int = 30) -> dict:
+        """
+        One page of a user's list in the sort order, after the (sort value, id)
+        of the previous page's last row.
+
+        Returns:
+            Dict {"results": cards with the user's fields, "has_more": bool,
+            "next_cursor": cursor of the next page or None}
+        """
+        list_key = (user_id, media_type, list_name)
+        key = list_key + (sort, descending, after, limit)
+        now = time.monotonic()
+        version = self.library.version(user_id)
+        with self._lock:
+            entry = self._pages.get(key)
+            if entry is not None and entry[0] > now and version is not None and entry[1] == version:
+                self._pages.move_to_end(key)
+                self.hits += 1
+                return entry[2]
+            self.misses += 1
+            state = self._assembling.setdefault(list_key, [0, 0])
+            state[0] += 1
+            writes_before = state[1]
+
+        try:
+            page, complete = self._assemble(user_id, media_type, list_name, sort, descending, after, limit)
+        finally:
+            with self._lock:
+                state[0] -= 1
+                if state[0] == 0:
+                    del self._assembling[list_key]
+
+        # Pages with missing titles, read across a write or at an unknown version are served once, not kept
+        if complete and page["results"] and version is not None:
+            with self._lock:
+                if state[1] == writes_before:
+                    self._store(list_key, key, (now + self.ttl, version, page))
+        return page
+
+    def _assemble(self, user_id, media_type, list_name, sort, descending, after, limit):
+        """(page, whether every row got its title metadata)"""
+        id_field = LIBRARY_LISTS[(media_type, list_name)][1]
+        if sort in TITLE_SORTS and after is None:
+            self._fill_sort_keys(user_id, media_type, list_name, limit)
+
+        rows = get_library_page(user_id, media_type, list_name, sort, descending, after, limit + 1)
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        if not rows:
+            return {"results": [], "has_more": False, "next_cursor": None}, True
+
+        title_info = run_async(fetch_titles_info_batch([row[id_field] for row in rows], media_type))
+        results = []
+        for row in rows:
+            title_data = title_info.get(row[id_field])
+            if title_data:
+                results.append(_merge_user_data(title_data, row))
+
+        last = rows[-1]
+        next_cursor = encode_cursor([
+            media_type, list_name, sort, "desc" if descending else "asc", last["sort_value"], last[id_field]
+        ]) if has_more else None
+        return {"results": results, "has_more": has_more, "next_cursor": next_cursor}, len(results) == len(rows)
+
+    def _fill_sort_keys(self, user_id, media_type, list_name, limit):
+        """Copy the sort keys of up to limit of the list's titles that don't have them yet."""
+        missing = get_library_ids_missing_sort_keys(user_id, media_type, list_name, limit)
+        if missing:
+            set_title_sort_keys(user_id, media_type, get_title_sort_keys(media_type, missing))
+
+    def _store(self, list_key, key, entry):
+        """Cache a page (lock held)."""
+        self._pages[key] = entry
+        self._pages.move_to_end(key)
+        self._by_list.setdefault(list_key, set()).add(key)
+        while len(self._pages) > self.max_pages:
+            old_key, _ = self._pages.popitem(last=False)
+            self._forget(old_key)
+
+    def _forget(self, key):
+        """Drop a page from the per-list index (lock held)."""
+        keys = self._by_list.get(key[:3])
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._by_list[key[:3]]
+
+    def invalidate(self, user_id, media_type: str, list_name: str):
+        """Drop the cached pages of a user's list (of every user's with user_id None)."""
+        with self._lock:
+            if user_id is None:
+                list_keys = [k for k in self._by_list if k[1:] == (media_type, list_name)]
+                assembling = [s for k, s in self._assembling.items() if k[1:] == (media_type, list_name)]
+            else:
+                list_keys = [(user_id, media_type, list_name)]
+                assembling = [self._assembling.get((user_id, media_type, list_name))]
+            for state in assembling:
+                if state is not None:
+                    state[1] += 1
+            for list_key in list_keys:
+                for key in self._by_list.pop(list_key, ()):
+                    self._pages.pop(key, None)
+                    self.invalidations += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"pages": len(self._pages), "hits": self.hits, "misses": self.misses, "invalidations": self.invalidations}
+
+
+library_pages = LibraryPages()
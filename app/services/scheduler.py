@@ -0,0 +1,76 @@
+"""
+Minimal in-process scheduler for background jobs.
+
+Each PeriodicTask runs its function on a daemon thread every `interval`
+seconds. Tasks are started lazily and are fork-aware: a task started in a
+Gunicorn master is started again in each worker the first time it's needed.
+"""
+import logging
+import os
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+class PeriodicTask:
+
+    def __init__(self, name: str, func, interval: float, app=None, run_immediately: bool = True):
+        """
+        Args:
+            name: Thread name, used in logs
+            func: Callable with no arguments
+            interval: Seconds between the end of one run and the start of the next
+            app: Optional Flask app; when given, each run happens inside its app context
+            run_immediately: Run once as soon as the task starts
+        """
+        self.name = name
+        self.func = func
+        self.interval = interval
+        self.app = app
+        self.run_immediately = run_immediately
+        self._thread = None
+        self._pid = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        # Counters
+        self.runs = 0
+        self.failures = 0
+
+    def start(self):
+        """Start the task in this process (idempotent)."""
+        pid = os.getpid()
+        if self._thread is not None and self._pid == pid and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is not None and self._pid == pid and self._thread.is_alive():
+                return
+            self._stop = threading.Event()
+            self._pid = pid
+            self._thread = threading.Thread(target=self._loop, name=self.name, daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: float = None):
+        self._stop.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout)
+
+    def run_once(self) -> bool:
+        """Run the function now, on the calling thread. Returns False if it raised."""
+        self.runs += 1
+        try:
+            if self.app is not None:
+                with self.app.app_context():
+                    self.func()
+            else:
+                self.func()
+            return True
+        except Exception:
+            self.failures += 1
+            logger.exception("Periodic task %s failed", self.name)
+            return False
+
+    def _loop(self):
+        if self.run_immediately:
+            self.run_once()
+        while not self._stop.wait(self.interval):
+            self.run_once()
@@ -0,0 +1,250 @@
+"""
+In-process full-text index over the titles this app already knows.
+
+Titles are tokenized after accent folding ("Amélie" -> "amelie") into an
+inverted index of token -> title keys. A second index maps each token's
+trigrams to the token, so misspelled query words are matched against similar
+vocabulary tokens. The last query word also matches as a prefix, for
+as-you-type queries.
+
+The index is fed incrementally: from the title_metadata store on a schedule
+(see search_info) and directly whenever new title metadata is fetched. Cards
+are kept as compact TitleRecords (see title_record.py).
+"""
+import bisect
+import heapq
+import re
+import threading
+import unicodedata
+from datetime import datetime, timedelta
+from app.services.db import get_titles_metadata_page
+from app.services.title_record import TitleRecord
+# Constants
+from app.constants import (
+    SEARCH_LOCAL_LIMIT,
+    SEARCH_INDEX_MIN_SIMILARITY,
+    SEARCH_INDEX_MAX_FUZZY,
+    SEARCH_INDEX_BUILD_BATCH
+)
+
+NON_WORD_RE = re.compile(r"[^0-9a-z]+")
+# Fields whose text is indexed
+TITLE_FIELDS = ("title", "name", "original_title", "original_name")
+# Match weights
+EXACT_WEIGHT = 1.0
+PREFIX_WEIGHT = 0.8
+FUZZY_WEIGHT = 0.7
+MAX_PREFIX_EXPANSIONS = 200
+MIN_PREFIX_LENGTH = 2
+
+
+def fold(text: str) -> str:
+    """Lowercase, strip accents and turn punctuation into spaces."""
+    decomposed = unicodedata.normalize("NFKD", text)
+    stripped = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return NON_WORD_RE.sub(" ", stripped.casefold()).strip()
+
+def tokenize(text: str) -> list[str]:
+    return fold(text).split() if text else []
+
+def trigrams(token: str) -> set[str]:
+    padded = f"  {token} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class TitleIndex:
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._records = {}      # (media_type, id) -> TitleRecord
+        self._doc_tokens = {}   # (media_type, id) -> indexed tokens
+        self._rank_info = {}    # (media_type, id) -> (folded title, popularity)
+        self._postings = {}     # token -> set of (media_type, id)
+        self._trigrams = {}     # trigram -> set of tokens
+        self._vocab = []        # sorted tokens, for prefix matching
+        self._synced_at = None  # Start time of the last sync from title_metadata
+
+    def __len__(self):
+        return len(self._records)
+
+    # ============================================================
+    # Indexing
+    # ============================================================
+
+    def add(self, record):
+        """Index (or re-index) a card record (dict or TitleRecord) with at least id, media_type and a title."""
+        compact = record if isinstance(record, TitleRecord) else TitleRecord.from_dict(record)
+        if compact is None:
+            return
+        tokens = set()
+        for field in TITLE_FIELDS:
+            tokens.update(tokenize(record.get(field)))
+        if not tokens:
+            return
+
+        key = (compact.media_type, compact.id)
+        with self._lock:
+            self._remove(key)
+            self._records[key] = compact
+            self._doc_tokens[key] = tokens
+            self._rank_info[key] = (fold(compact.title), compact.popularity)
+            for token in tokens:
+                docs = self._postings.get(token)
+                if docs is None:
+                    docs = self._postings[token] = set()
+                    bisect.insort(self._vocab, token)
+                    for trigram in trigrams(token):
+                        self._trigrams.setdefault(trigram, set()).add(token)
+                docs.add(key)
+
+    def add_many(self, records):
+        for record in records:
+            self.add(record)
+
+    def _remove(self, key):
+        """Drop a title from the postings (lock held)."""
+        tokens = self._doc_tokens.pop(key, None)
+        self._records.pop(key, None)
+        self._rank_info.pop(key, None)
+        if not tokens:
+            return
+        for token in tokens:
+            docs = self._postings.get(token)
+            if docs is None:
+                continue
+            docs.discard(key)
+            if not docs:
+                # Last title with this token: remove it from the vocabulary too
+                del self._postings[token]
+                i = bisect.bisect_left(self._vocab, token)
+                if i < len(self._vocab) and self._vocab[i] == token:
+                    del self._vocab[i]
+                for trigram in trigrams(token):
+                    holders = self._trigrams.get(trigram)
+                    if holders is not None:
+                        holders.discard(token)
+                        if not holders:
+                            del self._trigrams[trigram]
+
+    def remove(self, media_type: str, title_id: int):
+        with self._lock:
+            self._remove((media_type, int(title_id)))
+
+    def sync_from_store(self) -> int:
+        """
+        Index the title_metadata rows stored since the previous sync (all rows
+        the first time), including those written by other workers.
+        Requires an app context. Returns the number of rows read.
+        """
+        started = datetime.now()
+        # Overlap with the previous sync so rows committed while it ran aren't missed
+        since = self._synced_at - timedelta(minutes=1) if self._synced_at else None
+        count = 0
+        after = None
+        while True:
+            rows = get_titles_metadata_page(after, SEARCH_INDEX_BUILD_BATCH, since)
+            if not rows:
+                break
+            for media_type, title_id, record in rows:
+                self.add({**record, "media_type": media_type, "id": title_id})
+            count += len(rows)
+            after = rows[-1][:2]
+        self._synced_at = started
+        return count
+
+    # ============================================================
+    # Search
+    # ============================================================
+
+    def search(self, query: str, media_type: str = None, limit: int = SEARCH_LOCAL_LIMIT) -> list[dict]:
+        """
+        Return up to `limit` records matching every word of the query (exactly,
+        by prefix for the last word, or fuzzily), best matches first.
+        media_type 'movie' or 'tv' restricts the results. Records are card dicts.
+        """
+        query_tokens = tokenize(query)
+        if not query_tokens:
+            return []
+
+        with self._lock:
+            # Candidate vocabulary tokens per query word, best weight first
+            expansions = [list(self._expand(token, prefix=i == len(query_tokens) - 1)) for i, token in enumerate(query_tokens)]
+            # Start from the most selective word, then only check surviving titles
+            expansions.sort(key=lambda candidates: sum(len(self._postings[c]) for c, _ in candidates))
+
+            scores = {}
+            for candidate, weight in expansions[0]:
+                for key in self._postings[candidate]:
+                    if weight > scores.get(key, 0):
+                        scores[key] = weight
+            for candidates in expansions[1:]:
+                if not scores:
+                    return []
+                matched = {}
+                for key, score in scores.items():
+                    for candidate, weight in candidates:
+                        if key in self._postings[candidate]:
+                            matched[key] = score + weight
+                            break
+                scores = matched
+
+            folded_query = " ".join(query_tokens)
+            ranked = []
+            for key, score in scores.items():
+                if media_type in ("movie", "tv") and key[0] != media_type:
+                    continue
+                title, popularity = self._rank_info[key]
+                if title == folded_query:
+                    score += 1.0
+                elif title.startswith(folded_query):
+                    score += 0.5
+                ranked.append((score, popularity, key))
+
+            best = heapq.nlargest(limit, ranked)
+            return [self._records[key].to_dict() for _, _, key in best]
+
+    def _expand(self, token: str, prefix: bool):
+        """Vocabulary tokens matching a query token, with their weights (lock held)."""
+        if token in self._postings:
+            yield token, EXACT_WEIGHT
+
+        if prefix and len(token) >= MIN_PREFIX_LENGTH:
+            i = bisect.bisect_right(self._vocab, token)
+            for candidate in self._vocab[i:i + MAX_PREFIX_EXPANSIONS]:
+                if not candidate.startswith(token):
+                    break
+                yield candidate, PREFIX_WEIGHT
+
+        if len(token) < 3:
+            return
+        query_trigrams = trigrams(token)
+        shared = {}
+        for trigram in query_trigrams:
+            for candidate in self._trigrams.get(trigram, ()):
+                shared[candidate] = shared.get(candidate, 0) + 1
+        fuzzy = []
+        for candidate, count in shared.items():
+            if candidate == token:
+                continue
+            similarity = count / (len(query_trigrams) + len(trigrams(candidate)) - count)
+            if similarity >= SEARCH_INDEX_MIN_SIMILARITY:
+                fuzzy.append((similarity, candidate))
+        fuzzy.sort(reverse=True)
+        for similarity, candidate in fuzzy[:SEARCH_INDEX_MAX_FUZZY]:
+            yield candidate, FUZZY_WEIGHT * similarity
+
+    def records(self) -> list[TitleRecord]:
+        """Snapshot of every indexed record."""
+        with self._lock:
+            return list(self._records.values())
+
+    def stats(self) -> dict:
+        return {
+            "titles": len(self._records),
+            "tokens": len(self._postings),
+            "trigrams": len(self._trigrams),
+            "synced_at": self._synced_at.isoformat() if self._synced_at else None
+        }
+
+
+title_index = TitleIndex()
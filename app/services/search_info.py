@@ -1,110 +1,213 @@
 import asyncio
-import aiohttp
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
 from app.services.api.api_info import (
     search_title_on_api, 
     get_title_info_on_api, 
-    get_title_tconst_on_api,
+    get_title_details_on_api,
     get_trending_titles,
     get_popular_titles,
-    get_top_rated_titles,
-    get_series_seasons_on_api
+    get_top_rated_titles
 )
-from app.services.db import fetch_user_marks_id, fetch_user_marks
+from app.extensions import app
+from app.services.api.tmdb_client import run_async
+from app.services.async_db import run_db
+from app.services.db import (
+    fetch_user_marks_id,
+    fetch_user_marks,
+    get_titles_metadata,
+    save_titles_metadata,
+    get_user_titles_missing_metadata,
+    claim_sync_slot,
+    library_cache
+)
+from app.services.scheduler import PeriodicTask
+from app.services.search_index import title_index
+from app.services.shared_cache import shared_titles
+from app.services.title_record import TitleRecord
 # Constants
-from app.constants import ALLOWED_FIELDS_SEARCH, ALLOWED_FIELDS_TITLE_SEARCH
+from app.constants import (
+    ALLOWED_FIELDS_SEARCH,
+    ALLOWED_FIELDS_TITLE_SEARCH,
+    TITLE_METADATA_TTL,
+    SEARCH_INITIAL_PAGES,
+    SEARCH_MAX_PAGES,
+    SEARCH_PREFETCH_PAGES,
+    SEARCH_INDEX_SYNC_INTERVAL,
+    SEARCH_INDEX_BACKFILL_BATCH
+)
 
 
 async def get_home_page_data():
     """Get data for the home page including trending, popular movies/TV and top rated."""
-    async with aiohttp.ClientSession() as session:
-        # Fetch all data
-        trending = await get_trending_titles(session, "all", "week")
-        popular_movies = await get_popular_titles(session, "movie")
-        popular_tv = await get_popular_titles(session, "tv")
-        top_rated_movies = await get_top_rated_titles(session, "movie")
-        top_rated_tv = await get_top_rated_titles(session, "tv")
-        
-        # Process and filter the data
-        def process_results(data, media_type=None):
-            if not data:
-                return []
-            processed = []
-            for item in data[:20]:  # Limit to 20 items per section
-                entry = _filter_fields(item, ALLOWED_FIELDS_SEARCH)
-                # Get the title (movies use 'title', TV uses 'name')
-                title = item.get("title") or item.get("name")
-                if not title:
-                    continue
-                entry["title"] = title
-                # Get release date
-                date_val = item.get("release_date") or item.get("first_air_date")
-                entry["release_date"] = _format_date(date_val)
-                # Set media type
-                entry["media_type"] = media_type or item.get("media_type", "movie")
-                processed.append(entry)
-            return processed
-        
-        return {
-            "trending": process_results(trending),
-            "popular_movies": process_results(popular_movies, "movie"),
-            "popular_tv": process_results(popular_tv, "tv"),
-            "top_rated_movies": process_results(top_rated_movies, "movie"),
-            "top_rated_tv": process_results(top_rated_tv, "tv")
-        }
-
-
-async def search_title(query: str, search_type: str, user_id):
-    """Search title from TMDB API"""
-    async with aiohttp.ClientSession() as session:
-        data = await search_title_on_api(session, query, search_type)
-        # Handle None or empty response
+    # Fetch all data concurrently
+    trending, popular_movies, popular_tv, top_rated_movies, top_rated_tv = await asyncio.gather(
+        get_trending_titles("all", "week"),
+        get_popular_titles("movie"),
+        get_popular_titles("tv"),
+        get_top_rated_titles("movie"),
+        get_top_rated_titles("tv")
+    )
+    
+    # Process and filter the data
+    def process_results(data, media_type=None):
         if not data:
             return []
-        # Filter data - only include movie and tv media types
-        filtered_data = []
-        for i in data:
-            # Skip if no title/name
-            if not (i.get("title") or i.get("name")):
+        processed = []
+        for item in data[:20]:  # Limit to 20 items per section
+            entry = _filter_fields(item, ALLOWED_FIELDS_SEARCH)
+            # Get the title (movies use 'title', TV uses 'name')
+            title = item.get("title") or item.get("name")
+            if not title:
                 continue
-            # Only include movie and tv media types
-            media_type = i.get("media_type")
-            if search_type in ("movie", "tv"):
-                # If searching by specific type, use that type
-                media_type = search_type
-            elif media_type not in ("movie", "tv"):
-                # Skip person and other types in multi search
+            entry["title"] = title
+            # Get release date
+            date_val = item.get("release_date") or item.get("first_air_date")
+            entry["release_date"] = _format_date(date_val)
+            # Set media type
+            entry["media_type"] = media_type or item.get("media_type", "movie")
+            processed.append(entry)
+        return processed
+    
+    return {
+        "trending": process_results(trending),
+        "popular_movies": process_results(popular_movies, "movie"),
+        "popular_tv": process_results(popular_tv, "tv"),
+        "top_rated_movies": process_results(top_rated_movies, "movie"),
+        "top_rated_tv": process_results(top_rated_tv, "tv")
+    }
+
+
+async def search_title(query: str, search_type: str, user_id, cursor: int = 1, pages: int = SEARCH_INITIAL_PAGES) -> dict:
+    """
+    Search title from TMDB API.
+    Fetches `pages` result pages starting at page `cursor` concurrently (each
+    one still goes through the client's rate limiter), merges them in page
+    order and drops repeated (media_type, id) pairs. The first batch starts
+    with the matching titles from the local index (see search_index.py). The pages after the batch
+    are then prefetched in the background, so the next "more results" request
+    is served from the response cache.
+
+    Returns:
+        Dict {"results": [...], "next_cursor": page to continue from, or None at the end}
+    """
+    if cursor < 1 or cursor > SEARCH_MAX_PAGES:
+        return {"results": [], "next_cursor": None}
+    last_page = min(cursor + pages - 1, SEARCH_MAX_PAGES)
+
+    # The user's library loads while the pages are fetched, so the marks are then read from memory
+    page_data, _ = await asyncio.gather(
+        asyncio.gather(
+            *(search_title_on_api(query, search_type, page) for page in range(cursor, last_page + 1)),
+            return_exceptions=True
+        ),
+        _load_user_library(user_id)
+    )
+
+    merged = []
+    seen_keys = set()
+    total_pages = 0
+    if cursor == 1:
+        # Titles we already know come first, TMDB duplicates of them are dropped below
+        _title_index_task.start()
+        for entry in title_index.search(query, search_type if search_type in ("movie", "tv") else None):
+            seen_keys.add((entry["media_type"], entry["id"]))
+            merged.append(_filter_fields(entry, ALLOWED_FIELDS_SEARCH))
+    for data in page_data:
+        # Handle None, empty or failed pages
+        if not data or isinstance(data, BaseException):
+            continue
+        total_pages = max(total_pages, data.get("total_pages") or 0)
+        for entry in _filter_search_results(data["results"], search_type):
+            key = (entry["media_type"], entry.get("id"))
+            if key in seen_keys:
                 continue
-            
-            entry = _filter_fields(i, ALLOWED_FIELDS_SEARCH)
-            entry["media_type"] = media_type
-            filtered_data.append(entry)
+            seen_keys.add(key)
+            merged.append(entry)
+
+    last_available = min(total_pages, SEARCH_MAX_PAGES)
+    next_cursor = last_page + 1 if last_page < last_available else None
+    if next_cursor is not None:
+        _prefetch_search_pages(query, search_type, next_cursor, min(next_cursor + SEARCH_PREFETCH_PAGES - 1, last_available))
+
+    await _add_user_marks(merged, user_id)
+    return {"results": merged, "next_cursor": next_cursor}
+
+
+def _filter_search_results(data: list, search_type: str) -> list:
+    """Keep movie and tv results with a title, projected to ALLOWED_FIELDS_SEARCH."""
+    filtered_data = []
+    for i in data:
+        # Skip if no title/name
+        if not (i.get("title") or i.get("name")):
+            continue
+        # Only include movie and tv media types
+        media_type = i.get("media_type")
+        if search_type in ("movie", "tv"):
+            # If searching by specific type, use that type
+            media_type = search_type
+        elif media_type not in ("movie", "tv"):
+            # Skip person and other types in multi search
+            continue
         
-        # Get IDs
-        tmdb_ids = [int(r["id"]) for r in filtered_data if "id" in r]
-        # Get titles-user information
-        user_marks = fetch_user_marks_id(user_id, tmdb_ids)
-        titles_seen = user_marks["movies_seen"] | user_marks["series_seen"]
-        titles_watchlist = user_marks["movies_watchlist"] | user_marks["series_watchlist"]
-        # Group information
-        for entry in filtered_data:
-            entry_id = entry.get("id")
-            entry["seen"] = entry_id in titles_seen if entry_id is not None else False
-            entry["in_watchlist"] = entry_id in titles_watchlist if entry_id is not None else False
-            # TMDB uses release_date for movies and first_air_date for TV shows
-            date_val = entry.get("release_date") or entry.get("first_air_date")
-            entry["release_date"] = _format_date(date_val)  # Format date
-            # Change series name to title 
-            title = entry.get("name")
-            if title:
-                entry["title"] = entry.pop("name")
-
-        return filtered_data
+        entry = _filter_fields(i, ALLOWED_FIELDS_SEARCH)
+        entry["media_type"] = media_type
+        filtered_data.append(entry)
+    return filtered_data
+
+
+async def _load_user_library(user_id):
+    """Warm the membership cache for a user (no-op for anonymous users)."""
+    if user_id:
+        await run_db(library_cache.get, user_id)
+
+
+async def _add_user_marks(filtered_data: list, user_id):
+    """Add seen/in_watchlist flags and normalize titles and dates (in place)."""
+    # Get IDs by media type
+    tmdb_ids = {"movie": [], "tv": []}
+    for entry in filtered_data:
+        if entry.get("id") is not None and entry.get("media_type") in tmdb_ids:
+            tmdb_ids[entry["media_type"]].append(int(entry["id"]))
+    # Get titles-user information
+    user_marks = await run_db(fetch_user_marks_id, user_id, tmdb_ids) if user_id else {}
+    # Group information
+    no_marks = {"seen": False, "in_watchlist": False}
+    for entry in filtered_data:
+        marks = user_marks.get(entry.get("media_type"), {}).get(entry.get("id"), no_marks)
+        entry["seen"] = marks["seen"]
+        entry["in_watchlist"] = marks["in_watchlist"]
+        # TMDB uses release_date for movies and first_air_date for TV shows
+        date_val = entry.get("release_date") or entry.get("first_air_date")
+        entry["release_date"] = _format_date(date_val)  # Format date
+        # Change series name to title 
+        title = entry.get("name")
+        if title:
+            entry["title"] = entry.pop("name")
+
+
+# Background prefetch tasks, referenced until done so they aren't garbage collected
+_prefetch_tasks = set()
+
+def _prefetch_search_pages(query: str, search_type: str, first_page: int, last_page: int):
+    """Warm the response cache with the given search pages without waiting for them."""
+    loop = asyncio.get_running_loop()
+    for page in range(first_page, last_page + 1):
+        task = loop.create_task(search_title_on_api(query, search_type, page))
+        _prefetch_tasks.add(task)
+        task.add_done_callback(_prefetch_done)
+
+def _prefetch_done(task):
+    _prefetch_tasks.discard(task)
+    if not task.cancelled():
+        task.exception()  # Mark as retrieved; nobody awaits a prefetch
     
 
 async def fetch_titles_info_batch(title_ids: list, media_type: str) -> dict:
     """
-    Fetch title information from TMDB API for multiple titles concurrently.
+    Fetch title information for multiple titles.
+    Records are read from the cache shared by this host's workers, then from
+    the title_metadata store in one query; only missing or expired titles are
+    fetched from TMDB (concurrently) and written back to both.
     Filters results using ALLOWED_FIELDS_SEARCH.
     
     Args:
@@ -114,72 +217,128 @@ async def fetch_titles_info_batch(title_ids: list, media_type: str) -> dict:
     Returns:
         Dict mapping title_id to processed title info
     """
-    async def fetch_single(session, title_id):
+    title_info = {tid: record.to_dict() for tid, record in shared_titles.get_many(media_type, title_ids).items()}
+    missing_ids = [tid for tid in title_ids if tid not in title_info]
+    if not missing_ids:
+        return title_info
+
+    stored = await run_db(get_titles_metadata, media_type, missing_ids, TITLE_METADATA_TTL)
+    _share_titles(stored, media_type)
+    title_info.update(stored)
+    missing_ids = [tid for tid in missing_ids if tid not in stored]
+    if not missing_ids:
+        return title_info
+
+    async def fetch_single(title_id):
         try:
-            data = await get_title_info_on_api(session, title_id, media_type)
+            data = await get_title_info_on_api(title_id, media_type)
             return title_id, data
         except Exception:
             return title_id, None
     
-    async with aiohttp.ClientSession() as session:
-        tasks = [fetch_single(session, tid) for tid in title_ids]
-        results = await asyncio.gather(*tasks, return_exceptions=True)
+    tasks = [fetch_single(tid) for tid in missing_ids]
+    results = await asyncio.gather(*tasks, return_exceptions=True)
     
-    title_info = {}
+    fetched = {}
     for result in results:
         if isinstance(result, tuple) and len(result) == 2:
             title_id, data = result
             if data:
-                # Filter and process the data
-                entry = _filter_fields(data, ALLOWED_FIELDS_SEARCH)
-                # Normalize title field (TV shows use 'name' instead of 'title')
-                if "name" in data and "title" not in entry:
-                    entry["title"] = data["name"]
-                # Format release date
-                date_val = data.get("release_date") or data.get("first_air_date")
-                entry["release_date"] = _format_date(date_val)
-                # Set media type
-                entry["media_type"] = media_type
-                entry["id"] = title_id
-                title_info[title_id] = entry
+                fetched[title_id] = _project_title(data, title_id, media_type)
+    
+    # Store new records for every worker (and future restarts)
+    await run_db(save_titles_metadata, media_type, fetched)
+    _share_titles(fetched, media_type)
+    title_index.add_many(fetched.values())
+    title_info.update(fetched)
     
     return title_info
 
 
+def _share_titles(records: dict, media_type: str):
+    """Make title records visible to the other workers of this host."""
+    compact = (TitleRecord.from_dict({**record, "id": tid, "media_type": media_type}) for tid, record in records.items())
+    shared_titles.put_many(record for record in compact if record is not None)
+
+
 async def get_title_info(id: int, search_type: str, user_id = None) -> dict:
     """Get a title's information from the database"""
-    async with aiohttp.ClientSession() as session:
-        data = await get_title_info_on_api(session, id, search_type)
-        # Get tconst
-        tconst = await get_title_tconst_on_api(session, id, search_type)
-        # Get seasons info for TV shows
-        seasons_data = None
-        if search_type == "tv":
-            seasons_data = await get_series_seasons_on_api(session, id)
-        # Get user info
-        user_marks = fetch_user_marks(user_id, id, search_type)
-        # Filter information
-        data = _filter_fields(data, ALLOWED_FIELDS_TITLE_SEARCH)
-        # Group all info
-        if data:
-            data["tconst"] = tconst if tconst else None
-            data["seen"] = user_marks["seen"] # List of dicts
-            data["watchlist"] = user_marks["watchlist"] # bool
-            data["media_type"] = search_type
-            # Normalize TV series name to title (TMDB uses 'name' for TV, 'title' for movies)
-            if "name" in data and "title" not in data:
-                data["title"] = data.pop("name")
-            # Handle first_air_date for TV shows
-            if "first_air_date" in data and "release_date" not in data:
-                data["release_date"] = data.get("first_air_date")
-            # Add seasons data for TV shows
-            if seasons_data:
-                data["number_of_seasons"] = seasons_data.get("number_of_seasons", 0)
-                data["seasons"] = seasons_data.get("seasons", [])
+    # Details, tconst and seasons come from a single request, made while the user's marks are read
+    details, user_marks = await asyncio.gather(
+        get_title_details_on_api(id, search_type),
+        run_db(fetch_user_marks, user_id, id, search_type) if user_id else _no_user_marks()
+    )
+    if not details:
+        return {}
+    data = details["info"]
+    title_index.add(_project_title(data, id, search_type))
+    tconst = details["tconst"]
+    seasons_data = details["seasons"]
+    # Filter information
+    data = _filter_fields(data, ALLOWED_FIELDS_TITLE_SEARCH)
+    # Group all info
+    if data:
+        data["tconst"] = tconst if tconst else None
+        data["seen"] = user_marks["seen"] # List of dicts
+        data["watchlist"] = user_marks["watchlist"] # bool
+        data["media_type"] = search_type
+        # Normalize TV series name to title (TMDB uses 'name' for TV, 'title' for movies)
+        if "name" in data and "title" not in data:
+            data["title"] = data.pop("name")
+        # Handle first_air_date for TV shows
+        if "first_air_date" in data and "release_date" not in data:
+            data["release_date"] = data.get("first_air_date")
+        # Add seasons data for TV shows
+        if seasons_data:
+            data["number_of_seasons"] = seasons_data.get("number_of_seasons", 0)
+            data["seasons"] = seasons_data.get("seasons", [])
 
     return data if data else {}
 
 
+async def _no_user_marks():
+    return {"seen": [], "watchlist": False}
+
+
+def _sync_title_index():
+    """
+    Bring the local title index up to date with title_metadata, then, if no
+    other process claimed this run (sync_state marker BACKFILL_STATE_NAME),
+    fetch the titles referenced by user lists that have no stored record yet
+    (each batch is stored and indexed by fetch_titles_info_batch; the other
+    workers pick them up on their next sync_from_store).
+    """
+    title_index.sync_from_store()
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    if not claim_sync_slot(BACKFILL_STATE_NAME, now, now + timedelta(seconds=SEARCH_INDEX_SYNC_INTERVAL)):
+        return
+    missing = get_user_titles_missing_metadata()
+    for media_type, title_ids in missing.items():
+        for i in range(0, len(title_ids), SEARCH_INDEX_BACKFILL_BATCH):
+            run_async(fetch_titles_info_batch(title_ids[i:i + SEARCH_INDEX_BACKFILL_BATCH], media_type))
+
+BACKFILL_STATE_NAME = "title_index_backfill"
+# Started by the first search in each worker
+_title_index_task = PeriodicTask("title-index", _sync_title_index, SEARCH_INDEX_SYNC_INTERVAL, app=app)
+
+
+def _project_title(data: dict, title_id: int, media_type: str) -> dict:
+    """Project a TMDB details payload into the card record used by the lists."""
+    entry = _filter_fields(data, ALLOWED_FIELDS_SEARCH)
+    # Normalize title field (TV shows use 'name' instead of 'title')
+    if "name" in data and "title" not in entry:
+        entry["title"] = data["name"]
+    # Format release date
+    date_val = data.get("release_date") or data.get("first_air_date")
+    entry["release_date"] = _format_date(date_val)
+    # Details list genres as objects, cards as ids
+    if "genre_ids" not in entry and data.get("genres"):
+        entry["genre_ids"] = [g["id"] for g in data["genres"] if "id" in g]
+    # Set media type
+    entry["media_type"] = media_type
+    entry["id"] = title_id
+    return entry
+
 def _filter_fields(item: dict, allowed_fields):
     return {k: v for k, v in item.items() if k in allowed_fields}
 
@@ -0,0 +1,110 @@
+"""
+Periodic scan that flags series with a new season and notifies their users.
+
+One query lists the series in anyone's progress list that could be due (with
+the lowest season seen and the oldest update among their users). Their latest
+aired seasons are fetched concurrently, a batch at a time, through the cached
+and rate-limited TMDB client. Each batch is then written with two set-based
+statements (see flag_new_seasons), so the cost grows with the number of
+series, not of users.
+
+Every worker runs the periodic task, but each run is claimed first through a
+sync_state marker holding the time the next scan is due (claim_sync_slot):
+one process scans per SEASON_SCAN_INTERVAL, however many workers, hosts or
+restarts there are.
+"""
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from app.extensions import app
+from app.services.scheduler import PeriodicTask
+from app.services.api.api_info import get_series_latest_season_on_api
+from app.services.api.tmdb_client import run_async
+from app.services.db import get_series_to_scan, flag_new_seasons, claim_sync_slot
+# Constants
+from app.constants import SEASON_SCAN_INTERVAL, SEASON_SCAN_BATCH
+
+logger = logging.getLogger(__name__)
+
+STATE_NAME = "new_season_scan"
+
+
+async def _latest_seasons(series_ids: list[int]) -> list:
+    return await asyncio.gather(*(get_series_latest_season_on_api(i) for i in series_ids), return_exceptions=True)
+
+
+def _series_url_builder():
+    """
+    Builds the paths of series pages from the URL map (under APPLICATION_ROOT).
+    The scan runs outside any request, where url_for has no adapter to use.
+    """
+    adapter = app.url_map.bind("localhost", script_name=app.config["APPLICATION_ROOT"])
+    return lambda series_id: adapter.build("titles.title", {"media_type": "tv", "id": series_id})
+
+
+def _due_seasons(candidates: list[dict], latest: list) -> list[dict]:
+    """Rows for flag_new_seasons: series whose latest aired season some user hasn't been told about."""
+    series_url = _series_url_builder()
+    seasons = []
+    for candidate, season in zip(candidates, latest):
+        if not isinstance(season, dict):
+            continue  # Unknown to TMDB, nothing aired yet, or the fetch failed: retried next scan
+        try:
+            aired_at = datetime.fromisoformat(season["air_date"])
+        except ValueError:
+            continue
+        if season["season_number"] <= candidate["min_season"] or aired_at <= candidate["oldest_update"]:
+            continue  # Nobody is due
+        name = season["name"] or "a series you watch"
+        seasons.append({
+            "api_serie_id": candidate["api_serie_id"],
+            "season_number": season["season_number"],
+            "aired_at": aired_at,
+            "message": f"Season {season['season_number']} of {name} is out.",
+            "target_url": series_url(candidate["api_serie_id"])
+        })
+    return seasons
+
+
+def scan_new_seasons(batch_size: int = SEASON_SCAN_BATCH) -> dict:
+    """
+    Flag every progress row behind its series' latest aired season as
+    "New Season Available" and notify its user. Requires an app context.
+
+    Returns:
+        Counts: series (candidates), flagged (series with notified users),
+        notified (users) and failed (batches that couldn't be written)
+    """
+    candidates = get_series_to_scan()
+    for candidate in candidates:
+        # SQLite returns MIN() of a DATETIME column as text
+        if isinstance(candidate["oldest_update"], str):
+            candidate["oldest_update"] = datetime.fromisoformat(candidate["oldest_update"])
+
+    stats = {"series": len(candidates), "flagged": 0, "notified": 0, "failed": 0}
+    for start in range(0, len(candidates), batch_size):
+        batch = candidates[start:start + batch_size]
+        latest = run_async(_latest_seasons([c["api_serie_id"] for c in batch]))
+        seasons = _due_seasons(batch, latest)
+        if not seasons:
+            continue
+        notified = flag_new_seasons(seasons)
+        if notified is None:
+            stats["failed"] += 1
+            continue
+        stats["flagged"] += len(seasons)
+        stats["notified"] += notified
+
+    logger.info("New season scan: %s", stats)
+    return stats
+
+
+def scheduled_scan():
+    """Run the scan if it's due and no other process claimed it (the periodic task's function)."""
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    if not claim_sync_slot(STATE_NAME, now, now + timedelta(seconds=SEASON_SCAN_INTERVAL)):
+        return None
+    return scan_new_seasons()
+
+
+new_season_task = PeriodicTask("new-season-scan", scheduled_scan, SEASON_SCAN_INTERVAL, app=app)
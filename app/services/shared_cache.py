@@ -0,0 +1,367 @@
+"""
+Title cache shared by the worker processes of a host.
+
+Title records (see title_record.py) are kept in a memory-mapped file of fixed
+slots, so a title fetched by one worker is served from memory by all of them,
+and the cache survives worker restarts.
+
+Layout: a 64-byte file header, then SHARED_CACHE_SLOTS slots of
+SHARED_CACHE_SLOT_SIZE bytes. The slots are split into sets of
+SHARED_CACHE_WAYS; a (media_type, id) key hashes to one set and can live in
+any of its slots. Each slot holds a header (sequence number, key, reference
+bit, length, store time, CRC) followed by the serialized record.
+
+- Reads take no lock. A writer makes the slot's sequence number odd before
+  touching it and even again after; a reader that finds the number odd or
+  changed while it read rereads the slot (up to SHARED_CACHE_READ_RETRIES
+  times, yielding in between) and then treats it as a miss. A slot whose CRC
+  doesn't match under a stable number is corrupt: a miss right away.
+- Writes are serialized with flock() on the file (plus a thread lock, as
+  flock doesn't exclude threads sharing a descriptor). A full set evicts with
+  CLOCK: reads set a slot's reference bit and the writer's sweep clears set
+  bits until it finds a slot without one.
+- A writer killed mid-write leaves an odd sequence number behind. Opening the
+  file (once per process) checks it under the lock and clears every torn or
+  corrupt slot; a file with another geometry or version is recreated.
+"""
+import logging
+import mmap
+import os
+import struct
+import threading
+import time
+import zlib
+from app.extensions import app
+from app.services.title_record import TitleRecord
+# Constants
+from app.constants import SHARED_CACHE_SLOTS, SHARED_CACHE_SLOT_SIZE, SHARED_CACHE_WAYS, SHARED_CACHE_READ_RETRIES, TITLE_METADATA_TTL
+
+try:
+    import fcntl
+except ImportError:  # Not available on Windows: the cache is disabled there
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"TTLC"
+VERSION = 1
+FILE_HEADER = struct.Struct("<4sHII")     # magic, version, slot size, slots
+FILE_HEADER_SIZE = 64
+HAND = struct.Struct("<I")                 # CLOCK hand, right after the file header fields
+HAND_OFFSET = FILE_HEADER.size
+SLOT_HEADER = struct.Struct("<IBBHIII")   # seq, media, ref, length, tmdb_id, stored_at, crc
+SEQ = struct.Struct("<I")
+REF_OFFSET = 5
+KEY = struct.Struct("<BII")               # media, tmdb_id, stored_at (covered by the CRC)
+MEDIA_CODES = {"movie": 1, "tv": 2}
+EMPTY = 0
+TORN = object()                            # _read result: the slot changed under the reader
+
+
+def _crc(media: int, tmdb_id: int, stored_at: int, payload: bytes) -> int:
+    return zlib.crc32(payload, zlib.crc32(KEY.pack(media, tmdb_id, stored_at)))
+
+
+def _pause():
+    """Between rereads of a slot being written: let the writer (another thread or process) run."""
+    time.sleep(0)
+
+
+class SharedTitleCache:
+
+    def __init__(self, path: str, slots: int = SHARED_CACHE_SLOTS, slot_size: int = SHARED_CACHE_SLOT_SIZE,
+                 ways: int = SHARED_CACHE_WAYS, max_age: int = TITLE_METADATA_TTL):
+        self.path = path
+        self.ways = ways
+        self.sets = max(1, slots // ways)
+        self.slots = self.sets * ways
+        self.slot_size = slot_size
+        self.max_payload = slot_size - SLOT_HEADER.size
+        self.max_age = max_age
+        self.size = FILE_HEADER_SIZE + self.slots * slot_size
+        self._mm = None
+        self._fd = None
+        self._pid = None                    # Process the mapping belongs to
+        self._open_lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        # Counters (this process)
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evictions = 0
+        self.rejected = 0   # Torn, corrupt or oversized entries
+        self.retries = 0    # Rereads of slots caught mid-write
+        self.repaired = 0   # Slots cleared when the file was opened
+
+    # ============================================================
+    # File
+    # ============================================================
+
+    def _map(self):
+        """This process' mapping, opened on first use (and again after a fork); None if unavailable."""
+        pid = os.getpid()
+        if self._pid != pid:
+            with self._open_lock:
+                if self._pid != pid:
+                    self._mm, self._fd = None, None
+                    if self.path and fcntl is not None:
+                        try:
+                            self._mm, self._fd = self._open()
+                        except (OSError, ValueError) as e:
+                            logger.warning("Shared title cache %s unavailable: %s", self.path, e)
+                    self._pid = pid
+        return self._mm
+
+    def _open(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            try:
+                expected = FILE_HEADER.pack(MAGIC, VERSION, self.slot_size, self.slots)
+                fresh = os.fstat(fd).st_size != self.size or os.pread(fd, FILE_HEADER.size, 0) != expected
+                if fresh:
+                    # New file, other geometry or version: start empty
+                    os.ftruncate(fd, 0)
+                    os.ftruncate(fd, self.size)
+                    os.pwrite(fd, expected, 0)
+                mm = mmap.mmap(fd, self.size)
+                if not fresh:
+                    self.repaired += self._repair(mm)
+            finally:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+        except BaseException:
+            os.close(fd)
+            raise
+        return mm, fd
+
+    def _repair(self, mm) -> int:
+        """Clear the slots a crashed writer left torn, or that fail their CRC (write lock held)."""
+        repaired = 0
+        for index in range(self.slots):
+            offset = FILE_HEADER_SIZE + index * self.slot_size
+            seq, media, _, length, tmdb_id, stored_at, crc = SLOT_HEADER.unpack_from(mm, offset)
+            if media == EMPTY and not seq & 1:
+                continue
+            payload_start = offset + SLOT_HEADER.size
+            if seq & 1 or length > self.max_payload or _crc(media, tmdb_id, stored_at, mm[payload_start:payload_start + length]) != crc:
+                self._clear(mm, offset, seq)
+                repaired += 1
+        if repaired:
+            logger.warning("Shared title cache: cleared %d torn or corrupt slots", repaired)
+        return repaired
+
+    def _locked(self):
+        return _FileLock(self._write_lock, self._fd)
+
+    def _set_offsets(self, media: int, tmdb_id: int) -> list[int]:
+        # Fixed multiplicative hash (the same in every process, unlike hash())
+        h = ((tmdb_id * 2654435761) ^ (media * 0x9E3779B9)) & 0xFFFFFFFF
+        first = (h % self.sets) * self.ways
+        return [FILE_HEADER_SIZE + (first + way) * self.slot_size for way in range(self.ways)]
+
+    # ============================================================
+    # Reads
+    # ============================================================
+
+    def get(self, media_type: str, tmdb_id: int):
+        """The shared record of a title, or None (missing, expired or being written)."""
+        mm = self._map()
+        media = MEDIA_CODES.get(media_type)
+        if mm is None or media is None:
+            return None
+        tmdb_id = int(tmdb_id)
+        for attempt in range(SHARED_CACHE_READ_RETRIES + 1):
+            if attempt:
+                self.retries += 1
+                _pause()
+            record = self._read(mm, media, tmdb_id)
+            if record is not TORN:
+                break
+        else:
+            self.rejected += 1
+            record = None
+        if record is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return record
+
+    def _read(self, mm, media: int, tmdb_id: int):
+        """The title's record from its set, None if it has none (or it's expired or corrupt), or TORN."""
+        for offset in self._set_offsets(media, tmdb_id):
+            seq, slot_media, ref, length, slot_id, stored_at, crc = SLOT_HEADER.unpack_from(mm, offset)
+            if seq & 1:
+                # Mid-write: the key in the header may not be the slot's yet (or anymore)
+                if slot_media == media and slot_id == tmdb_id:
+                    return TORN
+                continue
+            if slot_media != media or slot_id != tmdb_id:
+                continue
+            if length > self.max_payload:
+                return None
+            payload_start = offset + SLOT_HEADER.size
+            payload = mm[payload_start:payload_start + length]
+            if SEQ.unpack_from(mm, offset)[0] != seq:
+                return TORN
+            if _crc(media, tmdb_id, stored_at, payload) != crc:
+                self.rejected += 1
+                return None
+            if stored_at < time.time() - self.max_age:
+                return None
+            try:
+                record = TitleRecord.from_bytes(payload)
+            except ValueError:
+                self.rejected += 1
+                return None
+            if not ref:
+                mm[offset + REF_OFFSET] = 1
+            return record
+        return None
+
+    def get_many(self, media_type: str, tmdb_ids) -> dict:
+        """Shared records of several titles, by id (missing ones left out)."""
+        found = {}
+        for tmdb_id in tmdb_ids:
+            record = self.get(media_type, tmdb_id)
+            if record is not None:
+                found[tmdb_id] = record
+        return found
+
+    # ============================================================
+    # Writes
+    # ============================================================
+
+    def put(self, record: TitleRecord) -> bool:
+        return self.put_many([record]) > 0
+
+    def put_many(self, records) -> int:
+        """Store (or refresh) records for every worker. Returns the number stored."""
+        mm = self._map()
+        if mm is None:
+            return 0
+        entries = []
+        for record in records:
+            payload = record.to_bytes()
+            if len(payload) > self.max_payload:
+                self.rejected += 1
+                continue
+            entries.append((MEDIA_CODES[record.media_type], record.id, payload))
+        if not entries:
+            return 0
+
+        stored_at = int(time.time())
+        with self._locked():
+            for media, tmdb_id, payload in entries:
+                self._write(mm, self._choose_slot(mm, media, tmdb_id), media, tmdb_id, stored_at, payload)
+        self.writes += len(entries)
+        return len(entries)
+
+    def _choose_slot(self, mm, media: int, tmdb_id: int) -> int:
+        """The title's slot in its set, else a free one, else the CLOCK victim (write lock held)."""
+        offsets = self._set_offsets(media, tmdb_id)
+        free = None
+        for offset in offsets:
+            _, slot_media, _, _, slot_id, _, _ = SLOT_HEADER.unpack_from(mm, offset)
+            if slot_media == media and slot_id == tmdb_id:
+                return offset
+            if slot_media == EMPTY and free is None:
+                free = offset
+        if free is not None:
+            return free
+
+        # Sweep from the shared hand, giving referenced slots a second chance
+        hand = HAND.unpack_from(mm, HAND_OFFSET)[0]
+        for step in range(2 * self.ways):
+            offset = offsets[(hand + step) % self.ways]
+            if mm[offset + REF_OFFSET]:
+                mm[offset + REF_OFFSET] = 0
+                continue
+            HAND.pack_into(mm, HAND_OFFSET, (hand + step + 1) % self.ways)
+            self.evictions += 1
+            return offset
+        return offsets[hand % self.ways]  # Unreachable: the first pass cleared every bit
+
+    def _write(self, mm, offset: int, media: int, tmdb_id: int, stored_at: int, payload: bytes):
+        seq = SEQ.unpack_from(mm, offset)[0]
+        writing = (seq + 1 if not seq & 1 else seq + 2) & 0xFFFFFFFF
+        SEQ.pack_into(mm, offset, writing)
+        payload_start = offset + SLOT_HEADER.size
+        mm[payload_start:payload_start + len(payload)] = payload
+        SLOT_HEADER.pack_into(mm, offset, writing, media, 1, len(payload), tmdb_id, stored_at, _crc(media, tmdb_id, stored_at, payload))
+        SEQ.pack_into(mm, offset, (writing + 1) & 0xFFFFFFFF)
+
+    def invalidate(self, media_type: str, tmdb_ids) -> int:
+        """Drop the shared records of several titles. Returns the number dropped."""
+        mm = self._map()
+        media = MEDIA_CODES.get(media_type)
+        if mm is None or media is None:
+            return 0
+        dropped = 0
+        with self._locked():
+            for tmdb_id in map(int, tmdb_ids):
+                for offset in self._set_offsets(media, tmdb_id):
+                    seq, slot_media, _, _, slot_id, _, _ = SLOT_HEADER.unpack_from(mm, offset)
+                    if slot_media == media and slot_id == tmdb_id:
+                        self._clear(mm, offset, seq)
+                        dropped += 1
+                        break
+        return dropped
+
+    def invalidate_before(self, timestamp: float) -> int:
+        """Drop every record stored before a time (epoch seconds). Returns the number dropped."""
+        mm = self._map()
+        if mm is None:
+            return 0
+        dropped = 0
+        with self._locked():
+            for index in range(self.slots):
+                offset = FILE_HEADER_SIZE + index * self.slot_size
+                seq, media, _, _, _, stored_at, _ = SLOT_HEADER.unpack_from(mm, offset)
+                if media != EMPTY and stored_at < timestamp:
+                    self._clear(mm, offset, seq)
+                    dropped += 1
+        return dropped
+
+    def _clear(self, mm, offset: int, seq: int):
+        SLOT_HEADER.pack_into(mm, offset, (seq + 2 if not seq & 1 else seq + 1) & 0xFFFFFFFF, EMPTY, 0, 0, 0, 0, 0)
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self._map() is not None,
+            "path": self.path,
+            "slots": self.slots,
+            "slot_size": self.slot_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "writes": self.writes,
+            "evictions": self.evictions,
+            "rejected": self.rejected,
+            "retries": self.retries,
+            "repaired": self.repaired
+        }
+
+
+class _FileLock:
+    """Thread lock + exclusive flock on the cache file."""
+
+    def __init__(self, thread_lock, fd):
+        self._thread_lock = thread_lock
+        self._fd = fd
+
+    def __enter__(self):
+        self._thread_lock.acquire()
+        try:
+            fcntl.flock(self._fd, fcntl.LOCK_EX)
+        except BaseException:
+            self._thread_lock.release()
+            raise
+
+    def __exit__(self, *exc):
+        try:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+        finally:
+            self._thread_lock.release()
+
+
+shared_titles = SharedTitleCache(app.config["SHARED_CACHE_PATH"])
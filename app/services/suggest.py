@@ -0,0 +1,246 @@
+"""
+Search suggestions for the search box.
+
+Title names live in a compressed (radix) trie keyed by their accent-folded
+form; every node keeps the SUGGEST_LIMIT most popular titles below it, so a
+prefix lookup is one walk down the trie with no scan. Each title is inserted
+once per word start, so "knight" suggests "The Dark Knight".
+
+The trie is fed from the home page lists (TMDB trending, popular and top
+rated) and from the local title index. Prefixes the trie can't fill fall back
+to a TMDB search; those results are cached per prefix and added to the trie.
+"""
+import threading
+import time
+from collections import OrderedDict
+from app.services.scheduler import PeriodicTask
+from app.services.home_snapshot import home_snapshot, HOME_SECTIONS
+from app.services.search_index import title_index, fold
+from app.services.api.api_info import search_title_on_api
+from app.services.api.tmdb_client import get_tmdb_client
+# Constants
+from app.constants import (
+    SUGGEST_LIMIT,
+    SUGGEST_MAX_WORD_STARTS,
+    SUGGEST_MIN_REMOTE_PREFIX,
+    SUGGEST_REMOTE_TIMEOUT,
+    SUGGEST_CACHE_SIZE,
+    SUGGEST_CACHE_TTL,
+    SUGGEST_REFRESH_INTERVAL
+)
+
+
+def _suggestion(item: dict, media_type: str = None):
+    """Reduce a card record or a raw TMDB result to what the dropdown shows."""
+    title = item.get("title") or item.get("name")
+    media_type = media_type or item.get("media_type")
+    if not title or media_type not in ("movie", "tv") or item.get("id") is None:
+        return None
+    date_val = item.get("release_date") or item.get("first_air_date")
+    return {
+        "id": int(item["id"]),
+        "media_type": media_type,
+        "title": title,
+        "year": str(date_val)[:4] if date_val else None,
+        "poster_path": item.get("poster_path"),
+        "popularity": item.get("popularity") or 0
+    }
+
+
+# ============================================================
+# Radix trie
+# ============================================================
+
+class _Node:
+    __slots__ = ("children", "top")
+
+    def __init__(self, top=None):
+        self.children = {}      # first char of edge label -> (label, child node)
+        self.top = top or []    # [(weight, key)] best first, at most SUGGEST_LIMIT
+
+    def offer(self, weight: float, key):
+        top = self.top
+        for i, (w, k) in enumerate(top):
+            if k == key:
+                if weight <= w:
+                    return
+                del top[i]
+                break
+        if len(top) >= SUGGEST_LIMIT and weight <= top[-1][0]:
+            return
+        i = 0
+        while i < len(top) and top[i][0] >= weight:
+            i += 1
+        top.insert(i, (weight, key))
+        del top[SUGGEST_LIMIT:]
+
+
+class PrefixTrie:
+
+    def __init__(self):
+        self._root = _Node()
+        self._lock = threading.Lock()
+        self._items = {}    # (media_type, id) -> suggestion
+        self.nodes = 1
+
+    def __len__(self):
+        return len(self._items)
+
+    def __contains__(self, key):
+        return key in self._items
+
+    def add(self, suggestion: dict):
+        key = (suggestion["media_type"], suggestion["id"])
+        folded = fold(suggestion["title"])
+        if not folded:
+            return
+        weight = suggestion["popularity"]
+        # Insert the title from each of its first word starts
+        starts = [0] + [i + 1 for i, c in enumerate(folded) if c == " "]
+        with self._lock:
+            self._items[key] = suggestion
+            for start in starts[:SUGGEST_MAX_WORD_STARTS]:
+                self._insert(folded[start:], weight, key)
+
+    def _insert(self, text: str, weight: float, key):
+        node = self._root
+        i = 0
+        while i < len(text):
+            edge = node.children.get(text[i])
+            if edge is None:
+                leaf = _Node()
+                leaf.offer(weight, key)
+                node.children[text[i]] = (text[i:], leaf)
+                self.nodes += 1
+                return
+
+            label, child = edge
+            rest = text[i:]
+            j = 0
+            limit = min(len(label), len(rest))
+            while j < limit and label[j] == rest[j]:
+                j += 1
+            if j < len(label):
+                # Split the edge; the new middle node covers the same titles as the old child
+                middle = _Node(list(child.top))
+                middle.children[label[j]] = (label[j:], child)
+                node.children[text[i]] = (label[:j], middle)
+                self.nodes += 1
+                child = middle
+            child.offer(weight, key)
+            node = child
+            i += j
+
+    def lookup(self, prefix: str) -> list[dict]:
+        """Most popular titles with a word starting with the (folded) prefix."""
+        with self._lock:
+            node = self._root
+            i = 0
+            while i < len(prefix):
+                edge = node.children.get(prefix[i])
+                if edge is None:
+                    return []
+                label, child = edge
+                rest = prefix[i:]
+                if label.startswith(rest):
+                    node = child
+                    break
+                if not rest.startswith(label):
+                    return []
+                node = child
+                i += len(label)
+            return [self._items[key] for _, key in node.top]
+
+
+# ============================================================
+# Suggestions
+# ============================================================
+
+class Suggester:
+
+    def __init__(self):
+        self.trie = PrefixTrie()
+        self._remote_cache = OrderedDict()  # folded prefix -> (expires_at, suggestions)
+        self._cache_lock = threading.Lock()
+        self._task = PeriodicTask("search-suggest", self.refresh, SUGGEST_REFRESH_INTERVAL)
+        # Counters
+        self.remote_lookups = 0
+        self.remote_cache_hits = 0
+
+    def refresh(self):
+        """Add titles from the home lists and the title index that the trie doesn't have yet."""
+        snapshot = home_snapshot.get()
+        for name in HOME_SECTIONS:
+            self._add_many(snapshot.get(name, ()))
+        self._add_many(title_index.records())
+
+    def _add_many(self, items, media_type: str = None):
+        for item in items:
+            suggestion = _suggestion(item, media_type)
+            if suggestion is not None and (suggestion["media_type"], suggestion["id"]) not in self.trie:
+                self.trie.add(suggestion)
+
+    def suggest(self, query: str, media_type: str = None) -> list[dict]:
+        """
+        Suggestions for a partial query, from the trie; long-tail prefixes
+        the trie can't fill are completed with a (cached) TMDB search.
+        """
+        self._task.start()
+        prefix = fold(query)
+        if not prefix:
+            return []
+
+        results = self._filter(self.trie.lookup(prefix), media_type)
+        if len(results) < SUGGEST_LIMIT and len(prefix) >= SUGGEST_MIN_REMOTE_PREFIX:
+            seen = {(s["media_type"], s["id"]) for s in results}
+            for suggestion in self._filter(self._remote(prefix), media_type):
+                if (suggestion["media_type"], suggestion["id"]) not in seen:
+                    results.append(suggestion)
+        return results[:SUGGEST_LIMIT]
+
+    def _filter(self, suggestions: list[dict], media_type: str) -> list[dict]:
+        if media_type in ("movie", "tv"):
+            return [s for s in suggestions if s["media_type"] == media_type]
+        return list(suggestions)
+
+    def _remote(self, prefix: str) -> list[dict]:
+        now = time.monotonic()
+        with self._cache_lock:
+            cached = self._remote_cache.get(prefix)
+            if cached is not None and cached[0] > now:
+                self._remote_cache.move_to_end(prefix)
+                self.remote_cache_hits += 1
+                return cached[1]
+
+        self.remote_lookups += 1
+        try:
+            data = get_tmdb_client().run(search_title_on_api(prefix), SUGGEST_REMOTE_TIMEOUT)
+        except Exception:
+            # Slow or failing upstream: answer from the trie only (and don't cache)
+            return []
+
+        suggestions = [s for s in (_suggestion(item) for item in (data or {}).get("results", ())) if s is not None]
+        suggestions.sort(key=lambda s: s["popularity"], reverse=True)
+        suggestions = suggestions[:SUGGEST_LIMIT]
+        for suggestion in suggestions:
+            if (suggestion["media_type"], suggestion["id"]) not in self.trie:
+                self.trie.add(suggestion)
+
+        with self._cache_lock:
+            self._remote_cache[prefix] = (now + SUGGEST_CACHE_TTL, suggestions)
+            self._remote_cache.move_to_end(prefix)
+            while len(self._remote_cache) > SUGGEST_CACHE_SIZE:
+                self._remote_cache.popitem(last=False)
+        return suggestions
+
+    def stats(self) -> dict:
+        return {
+            "titles": len(self.trie),
+            "nodes": self.trie.nodes,
+            "cached_prefixes": len(self._remote_cache),
+            "remote_lookups": self.remote_lookups,
+            "remote_cache_hits": self.remote_cache_hits
+        }
+
+
+suggester = Suggester()
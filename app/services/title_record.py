@@ -0,0 +1,161 @@
+"""
+Compact, immutable card record for the title metadata kept in memory.
+
+The local title index holds one card per known title for the life of the
+worker, often a few hundred thousand of them. As dicts each costs a hash table
+plus a key per field; TitleRecord keeps the same information in fixed slots:
+
+- the year as an int (not a "YYYY" string) and the rating in tenths, both
+  shared through small intern tables,
+- genre ids as a tuple shared by every title with the same genres,
+- media type as the "movie"/"tv" literals.
+
+to_dict() gives back the card shape the templates and the JS expect, and
+get()/[] read the same keys, so code written for card dicts works unchanged.
+to_bytes()/from_bytes() give a compact JSON array form for sharing records
+between processes (see shared_cache.py).
+"""
+import json
+from app.services.api.projection import decode_json
+
+# Shared values, so equal years/ratings/genre lists are stored once
+_YEARS = {}
+_VOTES = {}
+_GENRES = {}
+MEDIA_TYPES = {"movie": "movie", "tv": "tv"}
+
+
+def _intern(table: dict, value):
+    return table.setdefault(value, value)
+
+
+def _year(date_val):
+    """Year of a "YYYY" or "YYYY-MM-DD" value, None if missing or malformed."""
+    if not date_val:
+        return None
+    year = str(date_val)[:4]
+    return _intern(_YEARS, int(year)) if year.isdigit() else None
+
+
+def _genre_ids(record: dict) -> tuple:
+    """Genre ids from a list item (genre_ids) or a details payload (genres objects)."""
+    ids = record.get("genre_ids")
+    if ids is None:
+        ids = [g["id"] for g in record.get("genres") or () if isinstance(g, dict) and "id" in g]
+    return _intern(_GENRES, tuple(int(i) for i in ids))
+
+
+class TitleRecord:
+    __slots__ = ("id", "media_type", "title", "year", "vote_tenths", "popularity", "poster_path", "backdrop_path", "genre_ids")
+
+    def __init__(self, id: int, media_type: str, title: str, year: int = None, vote_tenths: int = None,
+                 popularity: float = 0.0, poster_path: str = None, backdrop_path: str = None, genre_ids: tuple = ()):
+        setattr_ = object.__setattr__
+        setattr_(self, "id", id)
+        setattr_(self, "media_type", media_type)
+        setattr_(self, "title", title)
+        setattr_(self, "year", year)
+        setattr_(self, "vote_tenths", vote_tenths)
+        setattr_(self, "popularity", popularity)
+        setattr_(self, "poster_path", poster_path)
+        setattr_(self, "backdrop_path", backdrop_path)
+        setattr_(self, "genre_ids", genre_ids)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("TitleRecord is immutable")
+
+    __delattr__ = __setattr__
+
+    def __repr__(self):
+        return f"TitleRecord({self.media_type}/{self.id} {self.title!r} {self.year})"
+
+    @classmethod
+    def from_dict(cls, record: dict):
+        """
+        Build from a card record or a raw TMDB item (movie or tv naming).
+        Returns None without a known media type, an id and a title.
+        """
+        media_type = MEDIA_TYPES.get(record.get("media_type"))
+        title = record.get("title") or record.get("name")
+        if media_type is None or record.get("id") is None or not title:
+            return None
+        vote = record.get("vote_average")
+        return cls(
+            id=int(record["id"]),
+            media_type=media_type,
+            title=title,
+            year=_year(record.get("release_date") or record.get("first_air_date")),
+            vote_tenths=_intern(_VOTES, round(float(vote) * 10)) if vote is not None else None,
+            popularity=float(record.get("popularity") or 0),
+            poster_path=record.get("poster_path"),
+            backdrop_path=record.get("backdrop_path"),
+            genre_ids=_genre_ids(record)
+        )
+
+    # ============================================================
+    # Card dict view
+    # ============================================================
+
+    @property
+    def release_date(self):
+        return str(self.year) if self.year is not None else None
+
+    @property
+    def vote_average(self):
+        return self.vote_tenths / 10 if self.vote_tenths is not None else None
+
+    def to_dict(self) -> dict:
+        """The card shape (a new dict each call)."""
+        return {
+            "id": self.id,
+            "media_type": self.media_type,
+            "title": self.title,
+            "release_date": self.release_date,
+            "vote_average": self.vote_average,
+            "popularity": self.popularity,
+            "poster_path": self.poster_path,
+            "backdrop_path": self.backdrop_path,
+            "genre_ids": list(self.genre_ids)
+        }
+
+    # ============================================================
+    # Serialized form
+    # ============================================================
+
+    def to_bytes(self) -> bytes:
+        return json.dumps([
+            self.id, self.media_type, self.title, self.year, self.vote_tenths,
+            self.popularity, self.poster_path, self.backdrop_path, self.genre_ids
+        ], ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+    @classmethod
+    def from_bytes(cls, data: bytes):
+        """Inverse of to_bytes (raises ValueError on a malformed payload)."""
+        try:
+            id, media_type, title, year, vote_tenths, popularity, poster_path, backdrop_path, genre_ids = decode_json(data)
+            media_type = MEDIA_TYPES[media_type]
+        except (TypeError, ValueError, KeyError) as e:
+            raise ValueError(f"Malformed title record: {e}") from e
+        return cls(
+            id=id,
+            media_type=media_type,
+            title=title,
+            year=_intern(_YEARS, year) if year is not None else None,
+            vote_tenths=_intern(_VOTES, vote_tenths) if vote_tenths is not None else None,
+            popularity=popularity,
+            poster_path=poster_path,
+            backdrop_path=backdrop_path,
+            genre_ids=_intern(_GENRES, tuple(genre_ids))
+        )
+
+    def __getitem__(self, key):
+        if key not in CARD_KEYS:
+            raise KeyError(key)
+        value = getattr(self, key)
+        return list(value) if key == "genre_ids" else value
+
+    def get(self, key, default=None):
+        return self[key] if key in CARD_KEYS else default
+
+
+CARD_KEYS = frozenset(("id", "media_type", "title", "release_date", "vote_average", "popularity", "poster_path", "backdrop_path", "genre_ids"))
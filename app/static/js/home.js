@@ -51,14 +51,13 @@ function initializeHeroBackdrop() {
         try {
             const results = JSON.parse(trendingSlider.dataset.results || '[]');
             if (results.length > 0) {
-                const baseImageUrl = 'https://image.tmdb.org/t/p/original';
                 let currentIndex = 0;
                 
                 // Set initial backdrop
                 const setBackdrop = (index) => {
                     const item = results[index];
                     if (item && item.backdrop_path) {
-                        heroBackdrop.style.backgroundImage = `url(${baseImageUrl}${item.backdrop_path})`;
+                        heroBackdrop.style.backgroundImage = `url(${tmdbImage(item.backdrop_path, 'w1280')})`;
                     }
                 };
                 
@@ -5,8 +5,14 @@ document.addEventListener("DOMContentLoaded", function () {
     initNotificationDropdown();
     initNavbarFilterDropdown();
     initSearchValidation();
+    initSearchSuggestions();
 });
 
+// URL of a TMDB poster/backdrop served by the local image proxy (sizes: w185, w342, w500, w780, w1280)
+function tmdbImage(path, size) {
+    return `/images/${size}${path}`;
+}
+
 function leftButtonsDrop() {
     const dropdowns = document.querySelectorAll(".dropdown-watch");
     
@@ -416,4 +422,105 @@ function initSearchValidation() {
             form.classList.remove('show-error');
         });
     }
-}
\ No newline at end of file
+}
+
+/**
+ * Search suggestions dropdown
+ * Queries /search/suggest on every keystroke (stale requests are aborted)
+ */
+function initSearchSuggestions() {
+    if (typeof searchSuggestUrl === 'undefined') return;
+
+    [['.search-form', '.search-input'], ['.search-overlay-form', '.search-overlay-input']].forEach(([formSelector, inputSelector]) => {
+        const form = document.querySelector(formSelector);
+        const input = document.querySelector(inputSelector);
+        if (form && input) {
+            setupSuggestions(form, input);
+        }
+    });
+
+    function setupSuggestions(form, input) {
+        const list = document.createElement('ul');
+        list.className = 'search-suggestions';
+        list.setAttribute('role', 'listbox');
+        form.appendChild(list);
+
+        let controller = null;
+        let activeIndex = -1;
+
+        input.addEventListener('input', async function() {
+            const query = this.value.trim();
+            if (controller) controller.abort();
+            if (!query) {
+                close();
+                return;
+            }
+
+            controller = new AbortController();
+            try {
+                const response = await fetch(`${searchSuggestUrl}?q=${encodeURIComponent(query)}`, { signal: controller.signal });
+                if (!response.ok) return;
+                const data = await response.json();
+                render(data.suggestions || []);
+            } catch (e) {
+                if (e.name !== 'AbortError') {
+                    console.error('Error loading suggestions:', e);
+                }
+            }
+        });
+
+        // Capture phase on the form, so Enter on a highlighted suggestion doesn't submit the search
+        form.addEventListener('keydown', function(e) {
+            const items = list.querySelectorAll('.search-suggestion');
+            if (!list.classList.contains('open') || items.length === 0) return;
+
+            if (e.key === 'ArrowDown' || e.key === 'ArrowUp') {
+                e.preventDefault();
+                activeIndex = e.key === 'ArrowDown'
+                    ? (activeIndex + 1) % items.length
+                    : (activeIndex - 1 + items.length) % items.length;
+                items.forEach((item, i) => item.classList.toggle('active', i === activeIndex));
+            } else if (e.key === 'Enter' && activeIndex >= 0) {
+                e.preventDefault();
+                e.stopPropagation();
+                window.location.href = items[activeIndex].href;
+            } else if (e.key === 'Escape') {
+                close();
+            }
+        }, true);
+
+        input.addEventListener('blur', function() {
+            // Let a click on a suggestion land first
+            setTimeout(close, 150);
+        });
+
+        function render(suggestions) {
+            activeIndex = -1;
+            if (suggestions.length === 0) {
+                close();
+                return;
+            }
+            list.innerHTML = suggestions.map(s => `
+                <li role="option">
+                    <a class="search-suggestion" href="${s.url}">
+                        <img src="${s.poster_path ? tmdbImage(s.poster_path, 'w185') : '/static/img/defaultPoster.svg'}" alt="" loading="lazy">
+                        <span class="suggestion-title">${escapeSuggestion(s.title)}</span>
+                        <span class="suggestion-meta">${s.media_type === 'movie' ? 'Movie' : 'Serie'}${s.year ? ' · ' + s.year : ''}</span>
+                    </a>
+                </li>`).join('');
+            list.classList.add('open');
+        }
+
+        function close() {
+            activeIndex = -1;
+            list.classList.remove('open');
+            list.innerHTML = '';
+        }
+    }
+
+    function escapeSuggestion(text) {
+        const div = document.createElement('div');
+        div.textContent = text || '';
+        return div.innerHTML;
+    }
+}
@@ -1,10 +1,12 @@
 /**
  * Search Page Filter Logic
- * Handles filtering, sorting, and display of search results
+ * Handles filtering, sorting, and display of search results,
+ * and loads further result pages on scroll
  */
 
 document.addEventListener("DOMContentLoaded", function () {
-    initSearchFilters();
+    const addCards = initSearchFilters();
+    initInfiniteScroll(addCards);
 });
 
 function initSearchFilters() {
@@ -310,4 +312,142 @@ function initSearchFilters() {
 
     // Apply initial filters (relevant by default)
     applyFilters();
+
+    // Add cards loaded by infinite scroll and re-apply the current filters
+    return function addCards(cards) {
+        cards.forEach(card => {
+            allCards.push(card);
+            resultsGrid.appendChild(card);
+        });
+        applyFilters();
+    };
+}
+
+function initInfiniteScroll(addCards) {
+    const resultsGrid = document.getElementById('resultsGrid');
+    const loadMoreTrigger = document.getElementById('loadMoreTrigger');
+
+    if (!addCards || !resultsGrid || !loadMoreTrigger) return;
+
+    const params = new URLSearchParams(window.location.search);
+    const state = {
+        nextCursor: loadMoreTrigger.dataset.nextCursor || null,
+        isLoading: false
+    };
+    // Keys of the cards on the page, so repeated titles across pages are skipped
+    const shownKeys = new Set(
+        Array.from(resultsGrid.querySelectorAll('.result-card')).map(card => card.dataset.key)
+    );
+
+    const observer = new IntersectionObserver((entries) => {
+        entries.forEach(entry => {
+            if (entry.isIntersecting) {
+                loadMoreResults();
+            }
+        });
+    }, {
+        rootMargin: '400px' // Start loading before reaching the trigger
+    });
+
+    if (state.nextCursor) {
+        observer.observe(loadMoreTrigger);
+    }
+
+    async function loadMoreResults() {
+        if (state.isLoading || !state.nextCursor) return;
+        state.isLoading = true;
+        loadMoreTrigger.innerHTML = '<div class="loading-spinner"></div>';
+
+        try {
+            const query = new URLSearchParams({ title: params.get('title') || '', cursor: state.nextCursor });
+            params.getAll('titleTypes').forEach(type => query.append('titleTypes', type));
+
+            const response = await fetch(`${searchMoreUrl}?${query}`);
+            if (!response.ok) {
+                throw new Error('Failed to fetch more results');
+            }
+            const data = await response.json();
+
+            const cards = [];
+            data.results.forEach(result => {
+                const key = `${result.media_type}-${result.id}`;
+                if (shownKeys.has(key)) return;
+                shownKeys.add(key);
+                cards.push(createResultCard(result));
+            });
+            addCards(cards);
+            state.nextCursor = data.next_cursor;
+        } catch (e) {
+            console.error('Error loading more results:', e);
+            state.nextCursor = null;
+        } finally {
+            state.isLoading = false;
+            loadMoreTrigger.innerHTML = '';
+        }
+
+        if (!state.nextCursor) {
+            observer.disconnect();
+        } else if (loadMoreTrigger.getBoundingClientRect().top < window.innerHeight + 400) {
+            // Still in view (e.g. the filters hid the new cards): keep going
+            loadMoreResults();
+        }
+    }
+
+    function createResultCard(result) {
+        const posterUrl = result.poster_path ? tmdbImage(result.poster_path, 'w185') : defaultPosterUrl;
+        const vote = result.vote_average ? result.vote_average.toFixed(1) : 'N/A';
+        let statusBadge = '';
+        if (result.seen) {
+            statusBadge = `
+                <span class="status-badge watched">
+                    <i class="bi bi-check-circle-fill"></i>
+                    <span class="badge-wrapper"></span>
+                </span>`;
+        } else if (result.in_watchlist) {
+            statusBadge = '<span class="status-badge watchlist"><i class="bi bi-bookmark-fill"></i></span>';
+        }
+
+        const template = document.createElement('template');
+        template.innerHTML = `
+            <a class="result-card" id="title-${result.id}" href="${titleBaseUrl}/${result.media_type}/${result.id}"
+            data-key="${result.media_type}-${result.id}"
+            data-popularity="${result.popularity || 0}"
+            data-vote="${result.vote_average || 0}"
+            data-release="${result.release_date || ''}"
+            data-title="${escapeHtml(result.title)}"
+            data-backdrop="${escapeHtml(result.backdrop_path)}"
+            data-genres="${escapeHtml(JSON.stringify(result.genre_ids || []))}"
+            data-type="${result.media_type}">
+                <div class="card-poster-container">
+                    <div class="card-poster">
+                        <img src="${posterUrl}" alt="${escapeHtml(result.title)}" loading="lazy" class="poster-img${!result.poster_path ? ' default-poster' : ''}">
+                    </div>
+                    <div class="card-badges">
+                        <span class="media-type-badge">${result.media_type === 'movie' ? 'Movie' : 'Serie'}</span>
+                        ${statusBadge}
+                    </div>
+                </div>
+                <div class="card-content">
+                    <h4 class="card-title">${escapeHtml(result.title)}</h4>
+                    <div class="card-meta">
+                        <span class="release-date">
+                            <i class="bi bi-calendar3"></i>
+                            ${result.release_date || 'N/A'}
+                        </span>
+                        <span class="rating">
+                            <i class="bi bi-star-fill"></i>
+                            ${vote}
+                        </span>
+                    </div>
+                </div>
+            </a>`;
+        return template.content.firstElementChild;
+    }
+
+    function escapeHtml(text) {
+        if (!text) return '';
+        const div = document.createElement('div');
+        div.textContent = text;
+        return div.innerHTML.replace(/"/g, '&quot;');
+    }
 }
@@ -20,7 +20,7 @@ function displayTitleInfo() {
     const poster = document.getElementById("title-poster");
     if (poster) {
         if (result.poster_path) {
-            poster.style.backgroundImage = `url(https://image.tmdb.org/t/p/w500${result.poster_path})`;
+            poster.style.backgroundImage = `url(${tmdbImage(result.poster_path, 'w500')})`;
         } else if (typeof defaultPoster !== 'undefined') {
             poster.style.backgroundImage = `url(${defaultPoster})`;
         }
@@ -30,7 +30,7 @@ function displayTitleInfo() {
     const backdrop = document.getElementById("title-backdrop");
     if (backdrop) {
         if (result.backdrop_path) {
-            backdrop.style.backgroundImage = `url(https://image.tmdb.org/t/p/original${result.backdrop_path})`;
+            backdrop.style.backgroundImage = `url(${tmdbImage(result.backdrop_path, 'w1280')})`;
         } else if (typeof defaultBackground !== 'undefined') {
             backdrop.style.backgroundImage = `url(${defaultBackground})`;
         }
@@ -24,12 +24,19 @@ function initWatchedPage() {
         sortOrder: 'desc',
         isLoading: false,
         hasMore: true,
-        lastId: null,
-        lastDate: null,
+        loadId: 0, // Bumped on every reload, so responses of an older order are dropped
         totalLoaded: 0,
         allTitles: [] // Store all loaded titles for client-side filtering/sorting
     };
 
+    // Client sort options the server can page by (the others sort the loaded titles)
+    const SERVER_SORTS = {
+        updated_at: 'recent',
+        title: 'title',
+        user_rating: 'rating',
+        release_date: 'year'
+    };
+
     // Sticky filter bar shadow on scroll
     if (filterBar) {
         window.addEventListener('scroll', () => {
@@ -86,7 +93,12 @@ function initWatchedPage() {
                 sortDropdown.classList.remove('open');
                 sortBtn.classList.remove('active');
                 
-                applyFiltersAndSort();
+                // Reload from the first page in the new order, so every title can show up
+                if (SERVER_SORTS[state.sortBy]) {
+                    loadInitialData();
+                } else {
+                    applyFiltersAndSort();
+                }
             });
         });
     }
@@ -110,6 +122,7 @@ function initWatchedPage() {
     loadInitialData();
 
     async function loadInitialData() {
+        const loadId = ++state.loadId;
         state.isLoading = true;
         showLoadingState();
 
@@ -119,6 +132,7 @@ function initWatchedPage() {
                 fetchTitles('movie'),
                 fetchTitles('tv')
             ]);
+            if (loadId !== state.loadId) return;
 
             // Combine and store all titles
             const movies = moviesResponse.results || [];
@@ -128,8 +142,8 @@ function initWatchedPage() {
             state.hasMore = moviesResponse.has_more || seriesResponse.has_more;
             
             // Track pagination cursors separately
-            state.moviesCursor = getLastCursor(movies);
-            state.seriesCursor = getLastCursor(series);
+            state.moviesCursor = moviesResponse.next_cursor;
+            state.seriesCursor = seriesResponse.next_cursor;
             state.moviesHasMore = moviesResponse.has_more;
             state.seriesHasMore = seriesResponse.has_more;
             
@@ -139,15 +153,16 @@ function initWatchedPage() {
             
         } catch (error) {
             console.error('Error loading initial data:', error);
-            showError();
+            if (loadId === state.loadId) showError();
         } finally {
-            state.isLoading = false;
+            if (loadId === state.loadId) state.isLoading = false;
         }
     }
 
     async function loadMoreTitles() {
         if (state.isLoading || !state.hasMore) return;
         
+        const loadId = state.loadId;
         state.isLoading = true;
         showLoadingMore();
 
@@ -171,6 +186,7 @@ function initWatchedPage() {
             }
 
             const responses = await Promise.all(requests);
+            if (loadId !== state.loadId) return;
             
             let newTitles = [];
             let responseIndex = 0;
@@ -179,7 +195,7 @@ function initWatchedPage() {
                 const moviesResponse = responses[responseIndex++];
                 const movies = moviesResponse.results || [];
                 newTitles = [...newTitles, ...movies];
-                state.moviesCursor = getLastCursor(movies);
+                state.moviesCursor = moviesResponse.next_cursor;
                 state.moviesHasMore = moviesResponse.has_more;
             }
             
@@ -187,7 +203,7 @@ function initWatchedPage() {
                 const seriesResponse = responses[responseIndex++];
                 const series = seriesResponse.results || [];
                 newTitles = [...newTitles, ...series];
-                state.seriesCursor = getLastCursor(series);
+                state.seriesCursor = seriesResponse.next_cursor;
                 state.seriesHasMore = seriesResponse.has_more;
             }
             
@@ -201,18 +217,23 @@ function initWatchedPage() {
         } catch (error) {
             console.error('Error loading more titles:', error);
         } finally {
-            state.isLoading = false;
-            hideLoadingMore();
+            if (loadId === state.loadId) {
+                state.isLoading = false;
+                hideLoadingMore();
+            }
         }
     }
 
     async function fetchTitles(mediaType, cursor = null) {
         const endpoint = mediaType === 'movie' ? watchedMoviesUrl : watchedSeriesUrl;
         
+        // A cursor continues the order of the page it came from
         const body = { limit: 30 };
         if (cursor) {
-            body.last_id = cursor.id;
-            body.last_date = cursor.date;
+            body.cursor = cursor;
+        } else {
+            body.sort = SERVER_SORTS[state.sortBy] || 'recent';
+            body.order = SERVER_SORTS[state.sortBy] ? state.sortOrder : 'desc';
         }
 
         const response = await fetch(endpoint, {
@@ -228,15 +249,6 @@ function initWatchedPage() {
         return response.json();
     }
 
-    function getLastCursor(titles) {
-        if (!titles || titles.length === 0) return null;
-        const last = titles[titles.length - 1];
-        return {
-            id: last.id,
-            date: last.updated_at
-        };
-    }
-
     function applyFiltersAndSort() {
         let filtered = [...state.allTitles];
         
@@ -309,7 +321,7 @@ function initWatchedPage() {
 
     function createTitleCard(title) {
         const posterUrl = title.poster_path 
-            ? `https://image.tmdb.org/t/p/w500${title.poster_path}` 
+            ? tmdbImage(title.poster_path, 'w342') 
             : defaultPosterUrl;
         
         const mediaTypeLabel = title.media_type === 'tv' ? 'TV' : 'Movie';
@@ -494,7 +506,7 @@ function initWatchedPage() {
     function renderCarouselCards(track, titles) {
         const html = titles.map(title => {
             const posterUrl = title.poster_path 
-                ? `https://image.tmdb.org/t/p/w500${title.poster_path}` 
+                ? tmdbImage(title.poster_path, 'w342') 
                 : defaultPosterUrl;
             
             const year = title.release_date ? title.release_date.substring(0, 4) : 'N/A';
@@ -0,0 +1,51 @@
+import base64
+import hashlib
+import hmac
+import json
+from datetime import datetime
+from flask import current_app
+
+# Opaque pagination cursors: a base64url JSON payload and its HMAC-SHA256
+# signature (truncated), keyed with the app's SECRET_KEY. Clients hand them
+# back unchanged, so a cursor can carry the full sort key of the last row.
+
+CURSOR_VERSION = 1
+SIGNATURE_BYTES = 16
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+
+def _b64decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+
+def _sign(payload: bytes) -> bytes:
+    key = (current_app.secret_key or "").encode("utf-8")
+    return hmac.new(key, payload, hashlib.sha256).digest()[:SIGNATURE_BYTES]
+
+
+def encode_cursor(values: list) -> str:
+    """Signed, opaque token for a list of JSON values (datetimes are sent as "YYYY-MM-DD HH:MM:SS")."""
+    values = [v.isoformat(sep=" ") if isinstance(v, datetime) else v for v in values]
+    payload = json.dumps([CURSOR_VERSION] + values, separators=(",", ":")).encode("utf-8")
+    return f"{_b64encode(payload)}.{_b64encode(_sign(payload))}"
+
+
+def decode_cursor(token: str) -> list:
+    """The values of a token made by encode_cursor (raises ValueError if malformed or tampered with)."""
+    try:
+        payload_part, signature_part = token.split(".")
+        payload, signature = _b64decode(payload_part), _b64decode(signature_part)
+    except (AttributeError, TypeError, ValueError) as e:
+        raise ValueError("Malformed cursor") from e
+    if not hmac.compare_digest(signature, _sign(payload)):
+        raise ValueError("Invalid cursor signature")
+    try:
+        values = json.loads(payload)
+    except ValueError as e:
+        raise ValueError("Malformed cursor") from e
+    if not isinstance(values, list) or not values or values[0] != CURSOR_VERSION:
+        raise ValueError("Unsupported cursor version")
+    return values[1:]
@@ -5,6 +5,8 @@ Handles validation for infinite scroll / cursor-based pagination.
 from datetime import datetime
 from typing import Optional, Tuple
 from app.exceptions import StatusError
+from app.utils.cursors import decode_cursor
+from app.constants import LIBRARY_SORT_ORDERS, LIBRARY_SEEN_ONLY_SORTS
 
 # Constants for pagination
 MIN_LIMIT = 1
@@ -12,6 +14,17 @@ MAX_LIMIT = 50
 DEFAULT_LIMIT = 30
 
 
+def _validate_limit(limit) -> int:
+    """Limit clamped to [MIN_LIMIT, MAX_LIMIT], DEFAULT_LIMIT if missing."""
+    if limit is None:
+        return DEFAULT_LIMIT
+    try:
+        validated_limit = int(limit)
+    except (ValueError, TypeError):
+        raise StatusError("Invalid limit value")
+    return min(max(validated_limit, MIN_LIMIT), MAX_LIMIT)
+
+
 def validate_pagination_params(
     last_id: Optional[int], 
     last_date: Optional[str], 
@@ -31,21 +44,10 @@ def validate_pagination_params(
     Raises:
         StatusError: If validation fails
     """
-    validated_limit = DEFAULT_LIMIT
+    validated_limit = _validate_limit(limit)
     validated_last_id = None
     validated_last_date = None
     
-    # Validate limit
-    if limit is not None:
-        try:
-            validated_limit = int(limit)
-            if validated_limit < MIN_LIMIT:
-                validated_limit = MIN_LIMIT
-            elif validated_limit > MAX_LIMIT:
-                validated_limit = MAX_LIMIT
-        except (ValueError, TypeError):
-            raise StatusError("Invalid limit value")
-    
     # Validate last_id
     if last_id is not None:
         try:
@@ -73,3 +75,58 @@ def validate_pagination_params(
         raise StatusError("Both last_id and last_date must be provided for pagination")
     
     return validated_last_id, validated_last_date, validated_limit
+
+
+
+def validate_library_page_params(
+    media_type: str,
+    list_name: str,
+    cursor: Optional[str],
+    sort: Optional[str],
+    order: Optional[str],
+    limit: Optional[int]
+) -> Tuple[str, bool, Optional[tuple], int]:
+    """
+    Validate the parameters of a library list page (see app/services/library_pages.py).
+    
+    Args:
+        media_type, list_name: The list the page is read from
+        cursor: Opaque cursor of the previous page (next_cursor), None for the first page;
+            sort and order may be left out with it
+        sort: Sort order, one of LIBRARY_SORT_ORDERS (defaults to "recent")
+        order: "asc" or "desc" (defaults to the sort's usual direction)
+        limit: Number of results to fetch
+        
+    Returns:
+        Tuple of (sort, descending, after, limit), after being the (sort value, id)
+        of the previous page's last row, or None
+        
+    Raises:
+        StatusError: If validation fails or the cursor was not issued for this list
+    """
+    validated_limit = _validate_limit(limit)
+    
+    # A cursor carries the sort of the pages it continues (a different one given with it is an error)
+    if cursor is not None:
+        try:
+            cursor_media_type, cursor_list, cursor_sort, cursor_order, after_value, after_id = decode_cursor(cursor)
+        except ValueError:
+            raise StatusError("Invalid cursor")
+        if (cursor_media_type, cursor_list) != (media_type, list_name) or not isinstance(after_id, int):
+            raise StatusError("Invalid cursor")
+        if sort not in (None, cursor_sort) or order not in (None, cursor_order):
+            raise StatusError("Cursor was issued for another sort order")
+        sort, order = cursor_sort, cursor_order
+        after = (after_value, after_id)
+    else:
+        after = None
+    
+    sort = sort or "recent"
+    if sort not in LIBRARY_SORT_ORDERS or (sort in LIBRARY_SEEN_ONLY_SORTS and list_name != "seen"):
+        raise StatusError("Invalid sort order")
+    
+    order = order or LIBRARY_SORT_ORDERS[sort]
+    if order not in ("asc", "desc"):
+        raise StatusError("Invalid order: must be asc or desc")
+    
+    return sort, order == "desc", after, validated_limit
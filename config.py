@@ -14,3 +14,28 @@ class Config:
 
     API_KEY = os.getenv("TMDB_API_KEY")
 
+    # Point at a local stand-in (tests/tmdb_stub.py) for offline load tests
+    TMDB_BASE_URL = os.getenv("TMDB_BASE_URL", "https://api.themoviedb.org/3")
+
+    # TMDB image CDN; point at tests/tmdb_stub.py (e.g. http://127.0.0.1:8001/t/p) for offline tests
+    TMDB_IMAGE_BASE_URL = os.getenv("TMDB_IMAGE_BASE_URL", "https://image.tmdb.org/t/p")
+
+    # Disk cache of proxied images (originals and resized variants)
+    IMAGE_CACHE_DIR = os.getenv("IMAGE_CACHE_DIR", os.path.join(BASE_DIR, "instance", "image_cache"))
+
+    # Size cap of the image cache in MB (least recently used files are deleted past it); 0 for no cap
+    IMAGE_CACHE_MAX_MB = int(os.getenv("IMAGE_CACHE_MAX_MB", "2048"))
+
+    # Upstream requests/second allowed per worker (TMDB allows ~50/s per IP)
+    TMDB_RATE_LIMIT = float(os.getenv("TMDB_RATE_LIMIT", "40"))
+
+    # Take part in the periodic new season scan. Workers and hosts share it: each run is claimed
+    # in sync_state, so one process scans per interval. Set 0 everywhere to only run
+    # `flask --app app:create_app series scan-new-seasons` from cron
+    NEW_SEASON_SCAN_ENABLED = os.getenv("NEW_SEASON_SCAN_ENABLED", "1") == "1"
+
+    # Bearer token that unlocks the full metrics at /health/tmdb; without it (or when unset) only the status is returned
+    HEALTH_METRICS_TOKEN = os.getenv("HEALTH_METRICS_TOKEN", "")
+
+    # Title cache file shared by the workers of a host (memory-mapped); empty disables it
+    SHARED_CACHE_PATH = os.getenv("SHARED_CACHE_PATH", os.path.join(BASE_DIR, "instance", "title_cache.bin"))
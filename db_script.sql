@@ -30,6 +30,8 @@ CREATE TABLE `user_series_progress` (
   `last_season_seen` int DEFAULT 1,
   `status` varchar(255),
   `user_rating` float,
+  `title_sort` varchar(255),
+  `release_year` smallint,
   `updated_at` timestamp default CURRENT_TIMESTAMP on update CURRENT_TIMESTAMP,
   PRIMARY KEY (`user_id`, `api_serie_id`)
 );
@@ -38,6 +40,8 @@ CREATE TABLE `user_movies_seen` (
   `user_id` int,
   `api_movie_id` int,
   `user_rating` float,
+  `title_sort` varchar(255),
+  `release_year` smallint,
   `updated_at` timestamp default CURRENT_TIMESTAMP on update CURRENT_TIMESTAMP,
   PRIMARY KEY (`user_id`, `api_movie_id`)
 );
@@ -45,6 +49,8 @@ CREATE TABLE `user_movies_seen` (
 CREATE TABLE `user_movies_watchlist` (
   `user_id` int,
   `api_movie_id` int,
+  `title_sort` varchar(255),
+  `release_year` smallint,
   `updated_at` timestamp default CURRENT_TIMESTAMP on update CURRENT_TIMESTAMP,
   PRIMARY KEY (`user_id`, `api_movie_id`)
 );
@@ -52,10 +58,45 @@ CREATE TABLE `user_movies_watchlist` (
 CREATE TABLE `user_series_watchlist` (
   `user_id` int,
   `api_serie_id` int,
+  `title_sort` varchar(255),
+  `release_year` smallint,
   `updated_at` timestamp default CURRENT_TIMESTAMP on update CURRENT_TIMESTAMP,
   PRIMARY KEY (`user_id`, `api_serie_id`)
 );
 
+-- Projected TMDB record per title (zlib-compressed JSON), shared by all workers
+CREATE TABLE `title_metadata` (
+  `media_type` ENUM('movie', 'tv'),
+  `tmdb_id` int,
+  `payload` BLOB NOT NULL,
+  `fetched_at` timestamp default CURRENT_TIMESTAMP,
+  PRIMARY KEY (`media_type`, `tmdb_id`)
+);
+
+-- Every TMDB id with its original title, loaded from the daily export files (flask catalog import)
+CREATE TABLE `title_catalog` (
+  `media_type` ENUM('movie', 'tv'),
+  `tmdb_id` int,
+  `title` varchar(512) NOT NULL,
+  `popularity` float NOT NULL DEFAULT 0,
+  `adult` boolean NOT NULL DEFAULT false,
+  `updated_at` timestamp default CURRENT_TIMESTAMP,
+  PRIMARY KEY (`media_type`, `tmdb_id`)
+);
+
+-- Progress markers of background jobs (e.g. the TMDB changes feed high-water mark)
+CREATE TABLE `sync_state` (
+  `name` varchar(64) PRIMARY KEY,
+  `value` varchar(255) NOT NULL,
+  `updated_at` timestamp default CURRENT_TIMESTAMP
+);
+
+-- Count of writes to each user's lists (user_id 0: to every user's), checked by the per-worker list caches
+CREATE TABLE `library_versions` (
+  `user_id` int PRIMARY KEY,
+  `version` bigint NOT NULL DEFAULT 0
+);
+
 ALTER TABLE `notifications` ADD FOREIGN KEY (`user_id`) REFERENCES `users` (`id`) ON DELETE CASCADE;
 
 ALTER TABLE `user_series_progress` ADD FOREIGN KEY (`user_id`) REFERENCES `users` (`id`) ON DELETE CASCADE;
@@ -78,8 +119,29 @@ CREATE INDEX idx_user_movies_watchlist_pagination ON user_movies_watchlist (user
 -- Series progress: for pagination queries
 CREATE INDEX idx_user_series_progress_pagination ON user_series_progress (user_id, updated_at DESC, api_serie_id DESC);
 
+-- Series progress: for the new season scan (all users of a series)
+CREATE INDEX idx_user_series_progress_serie ON user_series_progress (api_serie_id, last_season_seen);
+
 -- Series watchlist: for pagination queries
 CREATE INDEX idx_user_series_watchlist_pagination ON user_series_watchlist (user_id, updated_at DESC, api_serie_id DESC);
 
+-- Library sort orders (keyset pages by rating, title and release year; see app/services/db/library.py)
+CREATE INDEX idx_user_movies_seen_rating ON user_movies_seen (user_id, user_rating, api_movie_id);
+CREATE INDEX idx_user_movies_seen_title ON user_movies_seen (user_id, title_sort, api_movie_id);
+CREATE INDEX idx_user_movies_seen_year ON user_movies_seen (user_id, release_year, api_movie_id);
+CREATE INDEX idx_user_movies_watchlist_title ON user_movies_watchlist (user_id, title_sort, api_movie_id);
+CREATE INDEX idx_user_movies_watchlist_year ON user_movies_watchlist (user_id, release_year, api_movie_id);
+CREATE INDEX idx_user_series_progress_rating ON user_series_progress (user_id, user_rating, api_serie_id);
+CREATE INDEX idx_user_series_progress_title ON user_series_progress (user_id, title_sort, api_serie_id);
+CREATE INDEX idx_user_series_progress_year ON user_series_progress (user_id, release_year, api_serie_id);
+CREATE INDEX idx_user_series_watchlist_title ON user_series_watchlist (user_id, title_sort, api_serie_id);
+CREATE INDEX idx_user_series_watchlist_year ON user_series_watchlist (user_id, release_year, api_serie_id);
+
+-- Databases created before the sort keys existed also need (for each of the four list tables):
+-- ALTER TABLE user_movies_seen ADD COLUMN title_sort varchar(255), ADD COLUMN release_year smallint;
+
 -- Notifications: for fetching user notifications (unread first, by date)
-CREATE INDEX idx_notifications_user_read_date ON notifications (user_id, is_read, created_at DESC);
\ No newline at end of file
+CREATE INDEX idx_notifications_user_read_date ON notifications (user_id, is_read, created_at DESC);
+
+-- Title catalog: most popular titles per media type
+CREATE INDEX idx_title_catalog_popularity ON title_catalog (media_type, popularity);
@@ -0,0 +1,83 @@
+"""
+Microbenchmark: decoding + projecting TMDB payloads.
+
+Compares the previous path (json.loads of the whole body, dicts kept until
+_filter_fields runs) with app/services/api/projection.py (orjson when installed,
+projection right after decoding) on synthetic payloads from tests/tmdb_stub.py:
+a 20-result search page, a movie details payload (one per card on 30-title
+watched/watchlist pages) and a TV details payload with external_ids.
+
+Usage:
+    python tests/bench_json_decode.py [--repeat 2000]
+"""
+import argparse
+import json
+import os
+import sys
+import timeit
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from tmdb_stub import synthetic_page, synthetic_title
+from app.constants import ALLOWED_FIELDS_SEARCH, ALLOWED_FIELDS_TITLE_SEARCH
+from app.services.api import projection
+
+
+def _filter_fields(item: dict, allowed_fields):
+    return {k: v for k, v in item.items() if k in allowed_fields}
+
+
+def build_payloads() -> dict:
+    return {
+        "search page (20 results)": (
+            json.dumps(synthetic_page("/search/multi?dark", "all", 1, name_prefix="dark")).encode(),
+            lambda data: [_filter_fields(i, ALLOWED_FIELDS_SEARCH) for i in data["results"]],
+            projection.project_list
+        ),
+        "movie details": (
+            json.dumps(synthetic_title("movie", 550, detailed=True)).encode(),
+            lambda data: _filter_fields(data, ALLOWED_FIELDS_TITLE_SEARCH),
+            projection.project_details
+        ),
+        "tv details + external_ids": (
+            json.dumps({**synthetic_title("tv", 1399, detailed=True), "external_ids": {"imdb_id": "tt0944947", "tvdb_id": 121361}}).encode(),
+            lambda data: _filter_fields(data, ALLOWED_FIELDS_TITLE_SEARCH),
+            projection.project_details
+        ),
+    }
+
+
+def retained_bytes(fn) -> int:
+    """Bytes still allocated by the value fn() returns."""
+    tracemalloc.start()
+    value = fn()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del value
+    return size
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=2000)
+    args = parser.parse_args()
+
+    print(f"orjson available: {projection.orjson is not None}")
+    print(f"{'payload':28} {'path':26} {'us/op':>8} {'kept bytes':>11}")
+    for name, (body, old_filter, new_project) in build_payloads().items():
+        paths = {
+            "json.loads (full dict)": lambda: json.loads(body),
+            "json.loads + filter": lambda: old_filter(json.loads(body)),
+            "decode_json + project": lambda: new_project(projection.decode_json(body)),
+        }
+        for label, fn in paths.items():
+            seconds = min(timeit.repeat(fn, number=args.repeat, repeat=3)) / args.repeat
+            print(f"{name:28} {label:26} {seconds * 1e6:8.1f} {retained_bytes(fn):11}")
+        print(f"{'':28} {'(body size)':26} {'':8} {len(body):11}")
+
+
+if __name__ == "__main__":
+    main()
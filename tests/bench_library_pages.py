@@ -0,0 +1,169 @@
+"""
+Benchmark: watched/watchlist pages through app/services/library_pages.py.
+
+Seeds a throwaway SQLite database with one user per list size, each with that
+many titles in all four lists (movies/series, watched/watchlist), and the
+titles' metadata in title_metadata (so no TMDB request is made). For every
+list and size it reports, per 30-title page:
+
+- previous route: keyset query of `limit` rows, metadata batch, merge (the
+  code the four routes used to repeat)
+- cold page: the engine with an empty page cache (limit + 1 rows, same batch)
+- cached page: the same page again
+- walk: every page of the list, following the cursor, cold
+
+Then, for the largest list, the cost of the first and of the last page of
+every sort order (cold), which keyset cursors keep the same however deep the
+page is.
+
+Usage:
+    python tests/bench_library_pages.py [--sizes 30 300 3000] [--repeat 20]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+WORKDIR = tempfile.mkdtemp(prefix="bench_library_pages_")
+os.environ["DATABASE_URI"] = "sqlite:///" + os.path.join(WORKDIR, "bench.db")
+os.environ["SHARED_CACHE_PATH"] = os.path.join(WORKDIR, "title_cache.bin")
+os.environ.setdefault("TMDB_API_KEY", "bench")
+os.environ["TMDB_BASE_URL"] = "http://127.0.0.1:9/3"  # Nothing should reach TMDB
+
+from sqlalchemy import text
+from tmdb_stub import synthetic_title
+from app import create_app
+from app.extensions import db
+from app.services.api.tmdb_client import run_async
+from app.services.db import (
+    get_movies_watched, get_movies_watchlist, get_series_watched, get_series_watchlist, save_titles_metadata
+)
+from app.services.library_pages import LibraryPages, _merge_user_data
+from app.services.search_info import fetch_titles_info_batch, _project_title
+from app.validations import validate_library_page_params
+from app.constants import LIBRARY_SORT_ORDERS, LIBRARY_SEEN_ONLY_SORTS
+
+LIMIT = 30
+# What the routes used before the engine: (keyset query, id column, cursor argument)
+PREVIOUS_LISTS = {
+    ("movie", "seen"): (get_movies_watched, "api_movie_id", "last_movie_id"),
+    ("movie", "watchlist"): (get_movies_watchlist, "api_movie_id", "last_movie_id"),
+    ("tv", "seen"): (get_series_watched, "api_serie_id", "last_serie_id"),
+    ("tv", "watchlist"): (get_series_watchlist, "api_serie_id", "last_serie_id"),
+}
+TABLES = {
+    ("movie", "seen"): "INSERT INTO user_movies_seen (user_id, api_movie_id, user_rating, updated_at) VALUES (:user_id, :tmdb_id, :tmdb_id % 21 / 2.0, :updated_at)",
+    ("movie", "watchlist"): "INSERT INTO user_movies_watchlist (user_id, api_movie_id, updated_at) VALUES (:user_id, :tmdb_id, :updated_at)",
+    ("tv", "seen"): "INSERT INTO user_series_progress (user_id, api_serie_id, last_season_seen, status, user_rating, updated_at) VALUES (:user_id, :tmdb_id, 1, 'Watching', :tmdb_id % 21 / 2.0, :updated_at)",
+    ("tv", "watchlist"): "INSERT INTO user_series_watchlist (user_id, api_serie_id, updated_at) VALUES (:user_id, :tmdb_id, :updated_at)",
+}
+
+
+def seed(sizes):
+    """User i + 1 has sizes[i] titles in every list. Returns {size: user_id}."""
+    start = datetime(2025, 1, 1)
+    users = {}
+    for user_id, size in enumerate(sizes, start=1):
+        users[size] = user_id
+        for key, insert in TABLES.items():
+            db.session.execute(text(insert), [
+                {"user_id": user_id, "tmdb_id": tmdb_id, "updated_at": start + timedelta(seconds=tmdb_id)}
+                for tmdb_id in range(1, size + 1)
+            ])
+    db.session.commit()
+    largest = max(sizes)
+    for media_type in ("movie", "tv"):
+        save_titles_metadata(media_type, {
+            tmdb_id: _project_title(synthetic_title(media_type, tmdb_id, detailed=True), tmdb_id, media_type)
+            for tmdb_id in range(1, largest + 1)
+        })
+    return users
+
+
+def previous_route(user_id, media_type, list_name, last_id=None, last_date=None):
+    fetch, id_field, cursor_arg = PREVIOUS_LISTS[(media_type, list_name)]
+    rows = fetch(user_id=user_id, last_date=last_date, limit=LIMIT, **{cursor_arg: last_id})
+    ids = [r[id_field] for r in rows]
+    user_data_map = {r[id_field]: r for r in rows}
+    title_info_map = run_async(fetch_titles_info_batch(ids, media_type))
+    results = [_merge_user_data(title_info_map[i], user_data_map.get(i)) for i in ids if i in title_info_map]
+    return {"results": results, "has_more": len(rows) >= LIMIT}
+
+
+def timed(fn, repeat: int) -> float:
+    """Best time of fn() in ms."""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best * 1000
+
+
+def page_after(pages: LibraryPages, user_id, media_type, list_name, sort=None, cursor=None) -> dict:
+    """A page as the route reads it (cursor validated and decoded)."""
+    sort, descending, after, limit = validate_library_page_params(media_type, list_name, cursor, sort, None, LIMIT)
+    return pages.get_page(user_id, media_type, list_name, sort, descending, after, limit)
+
+
+def walk(pages: LibraryPages, user_id, media_type, list_name, sort=None):
+    """(pages in the list, cursor of its last page)"""
+    count, cursor = 0, None
+    while True:
+        page = page_after(pages, user_id, media_type, list_name, sort, cursor)
+        count += 1
+        if not page["has_more"]:
+            return count, cursor
+        cursor = page["next_cursor"]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[30, 300, 3000])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        users = seed(args.sizes)
+        # Warm the title metadata path once, so every run below reads the same caches
+        for media_type in ("movie", "tv"):
+            run_async(fetch_titles_info_batch(list(range(1, max(args.sizes) + 1)), media_type))
+
+        print(f"{'list':16} {'titles':>7} {'previous ms':>12} {'cold ms':>8} {'cached ms':>10} {'walk ms':>9} {'pages':>6}")
+        for (media_type, list_name) in PREVIOUS_LISTS:
+            for size in args.sizes:
+                user_id = users[size]
+                pages = LibraryPages()
+                previous = timed(lambda: previous_route(user_id, media_type, list_name), args.repeat)
+                cold = timed(lambda: (pages.invalidate(user_id, media_type, list_name), page_after(pages, user_id, media_type, list_name)), args.repeat)
+                cached = timed(lambda: page_after(pages, user_id, media_type, list_name), args.repeat)
+                pages.invalidate(user_id, media_type, list_name)
+                started = time.perf_counter()
+                count, _ = walk(pages, user_id, media_type, list_name)
+                walked = (time.perf_counter() - started) * 1000
+                print(f"{media_type + ' ' + list_name:16} {size:7} {previous:12.2f} {cold:8.2f} {cached:10.3f} {walked:9.1f} {count:6}")
+
+        size = max(args.sizes)
+        user_id = users[size]
+        print(f"\n{size} titles, cold pages by sort order")
+        print(f"{'list':16} {'sort':>7} {'first ms':>9} {'last ms':>8} {'pages':>6}")
+        for (media_type, list_name) in PREVIOUS_LISTS:
+            for sort in LIBRARY_SORT_ORDERS:
+                if sort in LIBRARY_SEEN_ONLY_SORTS and list_name != "seen":
+                    continue
+                pages = LibraryPages()
+                count, last_cursor = walk(pages, user_id, media_type, list_name, sort)
+                first = timed(lambda: (pages.invalidate(user_id, media_type, list_name), page_after(pages, user_id, media_type, list_name, sort)), args.repeat)
+                last = timed(lambda: (pages.invalidate(user_id, media_type, list_name), page_after(pages, user_id, media_type, list_name, sort, last_cursor)), args.repeat)
+                print(f"{media_type + ' ' + list_name:16} {sort:>7} {first:9.2f} {last:8.2f} {count:6}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Memory benchmark: bytes per cached title, card dicts vs TitleRecord.
+
+Builds the cards the local title index keeps (app/services/search_index.py)
+for synthetic titles from tests/tmdb_stub.py, half movies and half series,
+once as the projected card dicts it used to hold and once as
+app/services/title_record.py records, and reports the memory each set
+retains per title. Also times the conversion back to card dicts.
+
+Usage:
+    python tests/bench_title_records.py [--titles 200000]
+"""
+import argparse
+import gc
+import json
+import os
+import sys
+import timeit
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+os.environ.setdefault("DATABASE_URI", "sqlite://")
+
+from tmdb_stub import synthetic_title
+from app.services.search_info import _project_title
+from app.services.title_record import TitleRecord
+
+
+def payloads(count: int) -> list[bytes]:
+    """Encoded details payloads, so each build decodes its own strings like the app does."""
+    return [
+        json.dumps(synthetic_title("movie" if i % 2 else "tv", i, detailed=True)).encode()
+        for i in range(1, count + 1)
+    ]
+
+
+def build_dicts(bodies):
+    return [_project_title(json.loads(body), i, "movie" if i % 2 else "tv") for i, body in enumerate(bodies, start=1)]
+
+
+def build_records(bodies):
+    return [TitleRecord.from_dict(_project_title(json.loads(body), i, "movie" if i % 2 else "tv")) for i, body in enumerate(bodies, start=1)]
+
+
+def retained_bytes(build, bodies) -> int:
+    """Bytes still allocated by the list build() returns."""
+    gc.collect()
+    tracemalloc.start()
+    value = build(bodies)
+    gc.collect()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del value
+    return size
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--titles", type=int, default=200_000)
+    args = parser.parse_args()
+
+    bodies = payloads(args.titles)
+    dict_bytes = retained_bytes(build_dicts, bodies)
+    record_bytes = retained_bytes(build_records, bodies)
+
+    print(f"{args.titles} titles")
+    print(f"{'representation':16} {'total MB':>9} {'bytes/title':>12}")
+    for label, size in (("card dict", dict_bytes), ("TitleRecord", record_bytes)):
+        print(f"{label:16} {size / 2**20:9.1f} {size / args.titles:12.0f}")
+    print(f"saved: {1 - record_bytes / dict_bytes:.0%}")
+
+    # The same cards come back out
+    dicts, records = build_dicts(bodies[:1000]), build_records(bodies[:1000])
+    assert all(r.to_dict()["title"] == d["title"] and r.to_dict()["release_date"] == d["release_date"] for d, r in zip(dicts, records))
+
+    repeat = 100_000
+    print(f"{'to_dict()':16} {min(timeit.repeat(records[0].to_dict, number=repeat, repeat=3)) / repeat * 1e6:8.2f} us")
+    print(f"{'dict(card)':16} {min(timeit.repeat(lambda: dict(dicts[0]), number=repeat, repeat=3)) / repeat * 1e6:8.2f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Shared test setup.
+
+Each pytest session gets its own directory for the sqlite database, the shared
+title cache file and the image cache. The environment is set here, before any
+test module imports the app (Config reads it at import time), and the
+directory is removed when the session ends.
+"""
+import asyncio
+import os
+import shutil
+import tempfile
+import threading
+
+SESSION_DIR = tempfile.mkdtemp(prefix="filseries_tests_")
+os.environ["DATABASE_URI"] = "sqlite:///" + os.path.join(SESSION_DIR, "test.db")
+os.environ["SHARED_CACHE_PATH"] = os.path.join(SESSION_DIR, "title_cache.bin")
+os.environ["IMAGE_CACHE_DIR"] = os.path.join(SESSION_DIR, "image_cache")
+os.environ.setdefault("TMDB_API_KEY", "test")
+
+import pytest
+from aiohttp import web
+
+
+@pytest.fixture(scope="session", autouse=True)
+def database():
+    """The session's database, with every table created."""
+    from app.extensions import app, db
+
+    with app.app_context():
+        db.create_all()
+    yield db
+    with app.app_context():
+        db.session.remove()
+        db.engine.dispose()
+    shutil.rmtree(SESSION_DIR, ignore_errors=True)
+
+
+@pytest.fixture
+def serve():
+    """
+    Runs aiohttp applications (e.g. tests/tmdb_stub.py's) on a loop thread of
+    their own: serve(web_app) returns the base URL it listens on.
+    """
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, name="test-server", daemon=True)
+    thread.start()
+    runners = []
+
+    async def start(web_app):
+        runner = web.AppRunner(web_app)
+        await runner.setup()
+        await web.TCPSite(runner, "127.0.0.1", 0).start()
+        runners.append(runner)
+        return f"http://127.0.0.1:{runner.addresses[0][1]}"
+
+    yield lambda web_app: asyncio.run_coroutine_threadsafe(start(web_app), loop).result(5)
+    for runner in runners:
+        asyncio.run_coroutine_threadsafe(runner.cleanup(), loop).result(5)
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join(5)
+    loop.close()
+
+
+@pytest.fixture
+def tmdb_client():
+    """tmdb_client(base_url) -> a TMDBClient of its own (cache, limiter, breaker), closed after the test."""
+    from app.services.api.tmdb_client import TMDBClient
+
+    clients = []
+
+    def make(base_url: str):
+        client = TMDBClient(base_url=base_url, api_key="test")
+        clients.append(client)
+        return client
+
+    yield make
+    for client in clients:
+        client.close()
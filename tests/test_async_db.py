@@ -0,0 +1,60 @@
+"""
+The user-marks queries of a title page run while its TMDB request is in flight.
+
+    python -m pytest tests/test_async_db.py
+"""
+import asyncio
+import threading
+import time
+import pytest
+from app.services import search_info
+from app.services.async_db import run_db
+from app.services.api.tmdb_client import run_async
+
+DELAY = 0.3  # Seconds taken by each side
+
+
+@pytest.fixture
+def slow_sources(monkeypatch):
+    """TMDB details that take DELAY on the event loop, user marks that block for DELAY."""
+    calls = {}
+
+    async def details(tmdb_id, search_type):
+        await asyncio.sleep(DELAY)
+        return {"info": {"id": tmdb_id, "title": "Title", "release_date": "2020-01-01"}, "tconst": "tt0000001", "seasons": None}
+
+    def marks(user_id, tmdb_id, search_type):
+        calls["thread"] = threading.current_thread().name
+        time.sleep(DELAY)
+        return {"seen": [1], "watchlist": True}
+
+    monkeypatch.setattr(search_info, "get_title_details_on_api", details)
+    monkeypatch.setattr(search_info, "fetch_user_marks", marks)
+    return calls
+
+
+def test_title_info_overlaps_db_and_tmdb(slow_sources):
+    started = time.monotonic()
+    data = run_async(search_info.get_title_info(1, "movie", user_id=1))
+    elapsed = time.monotonic() - started
+
+    assert data["seen"] == [1] and data["watchlist"] is True
+    assert slow_sources["thread"].startswith("db")
+    assert elapsed < DELAY * 1.6, f"took {elapsed:.2f}s: DB and TMDB ran one after the other"
+
+
+def test_run_db_keeps_the_loop_free():
+    ticks = []
+
+    async def ticker():
+        while True:
+            ticks.append(time.monotonic())
+            await asyncio.sleep(0.01)
+
+    async def scenario():
+        task = asyncio.ensure_future(ticker())
+        await run_db(time.sleep, DELAY)
+        task.cancel()
+
+    run_async(scenario())
+    assert len(ticks) > DELAY / 0.01 / 2
@@ -0,0 +1,103 @@
+"""
+Resumable import of TMDB's daily id exports (app/services/catalog_import.py).
+
+    python -m pytest tests/test_catalog_import.py
+"""
+import gzip
+import json
+import os
+import pytest
+from sqlalchemy import text
+from app.exceptions import CatalogImportError
+from app.extensions import app, db
+from app.services import catalog_import
+from app.services.catalog_import import import_export, load_progress, progress_path
+
+LINES = 25
+BAD_LINES = (7, 18)
+
+
+@pytest.fixture
+def export(tmp_path):
+    """A movie export of LINES lines, BAD_LINES of them malformed (ids 1..LINES)."""
+    path = str(tmp_path / "movie_ids_05_15_2025.json.gz")
+    with gzip.open(path, "wb") as f:
+        for i in range(1, LINES + 1):
+            line = b"{not json" if i in BAD_LINES else json.dumps({"id": i, "original_title": f"Title {i}", "popularity": i / 10, "adult": False}).encode()
+            f.write(line + b"\n")
+    return path
+
+
+@pytest.fixture
+def catalog():
+    """ids in title_catalog (movies), emptied around the test."""
+    with app.app_context():
+        db.session.execute(text("DELETE FROM title_catalog"))
+        db.session.commit()
+        yield lambda: sorted(db.session.execute(text("SELECT tmdb_id FROM title_catalog WHERE media_type='movie'")).scalars())
+        db.session.execute(text("DELETE FROM title_catalog"))
+        db.session.commit()
+
+
+@pytest.fixture
+def writes(monkeypatch):
+    """The ids of every batch written; set fail_at to make that batch (1-based) fail."""
+    state = {"batches": [], "fail_at": None}
+    upsert = catalog_import.upsert_catalog_rows
+
+    def record(rows):
+        if len(state["batches"]) + 1 == state["fail_at"]:
+            state["fail_at"] = None
+            return False
+        state["batches"].append([row["tmdb_id"] for row in rows])
+        return upsert(rows)
+
+    monkeypatch.setattr(catalog_import, "upsert_catalog_rows", record)
+    return state
+
+
+def test_import_skips_malformed_lines(export, catalog, writes):
+    progress = import_export(export, batch_size=10)
+
+    assert catalog() == [i for i in range(1, LINES + 1) if i not in BAD_LINES]
+    assert (progress["lines"], progress["rows"], progress["skipped"], progress["done"]) == (LINES, LINES - 2, 2, True)
+    assert [len(batch) for batch in writes["batches"]] == [10, 10, 3]
+
+
+def test_interrupted_import_resumes_after_the_last_written_batch(export, catalog, writes):
+    writes["fail_at"] = 2
+    with pytest.raises(CatalogImportError):
+        import_export(export, batch_size=10)
+    assert load_progress(export)["lines"] == 11
+    assert load_progress(export)["skipped"] == 1
+
+    progress = import_export(export, batch_size=10)
+    written = [i for batch in writes["batches"] for i in batch]
+    # No line is imported twice
+    assert sorted(written) == [i for i in range(1, LINES + 1) if i not in BAD_LINES]
+    assert (progress["rows"], progress["skipped"]) == (LINES - 2, 2)
+    assert catalog() == sorted(written)
+
+    # A finished import isn't run again
+    assert import_export(export, batch_size=10)["done"]
+    assert len(writes["batches"]) == 3
+
+
+def test_progress_of_another_version_of_the_export_is_ignored(export, catalog, writes):
+    writes["fail_at"] = 2
+    with pytest.raises(CatalogImportError):
+        import_export(export, batch_size=10)
+
+    # Replaced by a newer export under the same name
+    os.utime(export, (1, 1))
+    assert load_progress(export)["lines"] == 0
+    import_export(export, batch_size=10)
+    assert writes["batches"][1][0] == 1
+
+
+def test_progress_without_resume_starts_over(export, catalog, writes):
+    import_export(export, batch_size=10)
+    assert os.path.exists(progress_path(export))
+
+    import_export(export, batch_size=10, resume=False)
+    assert len(writes["batches"]) == 6
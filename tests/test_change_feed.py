@@ -0,0 +1,39 @@
+"""
+Evictions driven by TMDB's changes feed (app/services/change_feed.py).
+
+    python -m pytest tests/test_change_feed.py
+"""
+from datetime import datetime, timedelta, timezone
+import pytest
+from app.extensions import app, db
+from app.services import change_feed
+
+
+@pytest.fixture
+def poller(monkeypatch):
+    """A poller whose feed lists movie 550 and which records the ids it expires."""
+    expired = []
+
+    async def all_changed_ids(start_date, end_date):
+        return [{550}, set()]
+
+    def expire(media_type, ids):
+        expired.append((media_type, list(ids)))
+        return len(ids)
+
+    monkeypatch.setattr(change_feed, "_all_changed_ids", all_changed_ids)
+    monkeypatch.setattr(change_feed, "expire_titles_metadata", expire)
+    poller = change_feed.ChangeFeedPoller()
+    poller._mark = datetime.now(timezone.utc) - timedelta(minutes=5)
+    with app.app_context():
+        yield poller, expired
+
+
+def test_title_edited_again_the_same_day_is_evicted_again(poller):
+    poller, expired = poller
+    # 09:00: the title is evicted, then refetched and stored again by a page view
+    assert poller.poll()
+    # 15:00: edited again; the feed lists the same id for the same day
+    assert poller.poll()
+
+    assert [e for e in expired if e[0] == "movie"] == [("movie", [550]), ("movie", [550])]
@@ -0,0 +1,95 @@
+"""
+Signed pagination cursors (app/utils/cursors.py) and their validation for the
+library lists (validate_library_page_params).
+
+    python -m pytest tests/test_cursors.py
+"""
+import base64
+import json
+import pytest
+from app.extensions import app
+from app.exceptions import StatusError
+from app.utils.cursors import encode_cursor, decode_cursor
+from app.validations import validate_library_page_params
+
+
+@pytest.fixture(autouse=True)
+def signing_key(monkeypatch):
+    monkeypatch.setattr(app, "secret_key", "test-key")
+    with app.app_context():
+        yield
+
+
+def rating_cursor(value=7.3, tmdb_id=42, media_type="movie", list_name="seen", order="desc"):
+    return encode_cursor([media_type, list_name, "rating", order, value, tmdb_id])
+
+
+def test_cursor_round_trip():
+    assert decode_cursor(rating_cursor()) == ["movie", "seen", "rating", "desc", 7.3, 42]
+    assert decode_cursor(encode_cursor(["tv", "seen", "title", "asc", None, 7])) == ["tv", "seen", "title", "asc", None, 7]
+
+
+def test_cursor_is_url_safe():
+    cursor = encode_cursor(["movie", "seen", "title", "asc", "ü/+?&" * 10, 1])
+    assert all(c.isalnum() or c in "-_." for c in cursor)
+
+
+@pytest.mark.parametrize("garbage", ["", "abc", "a.b.c", "!!!.???", ".", None, 12])
+def test_garbage_cursor_is_rejected(garbage):
+    with pytest.raises(ValueError):
+        decode_cursor(garbage)
+
+
+def test_edited_payload_is_rejected():
+    payload, signature = rating_cursor().split(".")
+    forged = base64.urlsafe_b64encode(json.dumps([1, "movie", "seen", "rating", "desc", 9.9, 1]).encode()).rstrip(b"=").decode()
+    with pytest.raises(ValueError):
+        decode_cursor(f"{forged}.{signature}")
+
+
+def test_edited_signature_is_rejected():
+    payload, signature = rating_cursor().split(".")
+    flipped = ("A" if signature[0] != "A" else "B") + signature[1:]
+    with pytest.raises(ValueError):
+        decode_cursor(f"{payload}.{flipped}")
+
+
+def test_cursor_signed_with_another_key_is_rejected(monkeypatch):
+    cursor = rating_cursor()
+    monkeypatch.setattr(app, "secret_key", "rotated-key")
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
+
+
+def test_validation_takes_sort_from_cursor():
+    sort, descending, after, limit = validate_library_page_params("movie", "seen", rating_cursor(), None, None, 10)
+    assert (sort, descending, after, limit) == ("rating", True, (7.3, 42), 10)
+
+
+@pytest.mark.parametrize("cursor", ["garbage", "abc.def"])
+def test_validation_rejects_bad_cursor(cursor):
+    with pytest.raises(StatusError):
+        validate_library_page_params("movie", "seen", cursor, None, None, 10)
+
+
+def test_validation_rejects_tampered_cursor():
+    payload, signature = rating_cursor().split(".")
+    edited = payload[:-4] + ("AAAA" if not payload.endswith("AAAA") else "BBBB")
+    with pytest.raises(StatusError):
+        validate_library_page_params("movie", "seen", f"{edited}.{signature}", None, None, 10)
+
+
+@pytest.mark.parametrize("media_type, list_name", [("movie", "watchlist"), ("tv", "seen"), ("tv", "watchlist")])
+def test_validation_rejects_cursor_of_another_list(media_type, list_name):
+    with pytest.raises(StatusError):
+        validate_library_page_params(media_type, list_name, rating_cursor(), None, None, 10)
+
+
+@pytest.mark.parametrize("sort, order", [("title", None), ("recent", None), (None, "asc"), ("rating", "asc")])
+def test_validation_rejects_cursor_with_another_sort(sort, order):
+    with pytest.raises(StatusError):
+        validate_library_page_params("movie", "seen", rating_cursor(), sort, order, 10)
+
+
+def test_validation_accepts_cursor_with_its_own_sort():
+    assert validate_library_page_params("movie", "seen", rating_cursor(), "rating", "desc", 10)[0] == "rating"
@@ -0,0 +1,42 @@
+"""
+Access to the TMDB metrics at /health/tmdb (app/routes/main.py).
+
+    python -m pytest tests/test_health.py
+"""
+import pytest
+from app.extensions import app
+from app.routes import main
+from config import Config
+
+
+def health(headers=None):
+    with app.test_request_context("/health/tmdb", headers=headers or {}):
+        response, status = main.tmdb_health()
+        return status, response.get_json()
+
+
+@pytest.fixture
+def token(monkeypatch):
+    monkeypatch.setattr(Config, "HEALTH_METRICS_TOKEN", "s3cret")
+    return "s3cret"
+
+
+def test_anonymous_request_gets_only_the_status(token):
+    assert health() == (200, {"status": "ok"})
+
+
+@pytest.mark.parametrize("auth", ["Bearer wrong", "s3cret", "Bearer ", "Basic s3cret"])
+def test_wrong_token_gets_only_the_status(token, auth):
+    assert health({"Authorization": auth}) == (200, {"status": "ok"})
+
+
+def test_token_unlocks_metrics(token):
+    status, body = health({"Authorization": f"Bearer {token}"})
+    assert status == 200
+    assert body["status"] == "ok"
+    assert {"circuit_breaker", "cache", "shared_cache"} <= body.keys()
+
+
+def test_metrics_are_closed_without_a_configured_token(monkeypatch):
+    monkeypatch.setattr(Config, "HEALTH_METRICS_TOKEN", "")
+    assert health({"Authorization": "Bearer "}) == (200, {"status": "ok"})
@@ -0,0 +1,99 @@
+"""
+First build of the home page snapshot (app/services/home_snapshot.py).
+
+    python -m pytest tests/test_home_snapshot.py
+"""
+import threading
+import pytest
+from app.services import home_snapshot
+from app.services.home_snapshot import HomeSnapshot, EMPTY_SNAPSHOT
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+    def time(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(home_snapshot, "time", clock)
+    return clock
+
+
+@pytest.fixture
+def home_data(monkeypatch):
+    """TMDB's home sections as returned by get_home_page_data; calls are counted, results set per test."""
+    state = {"calls": 0, "data": {}, "gate": None}
+
+    def get_home_page_data():
+        state["calls"] += 1
+        if state["gate"] is not None:
+            state["gate"].wait(5)
+        return state["data"]
+
+    monkeypatch.setattr(home_snapshot, "get_home_page_data", get_home_page_data)
+    monkeypatch.setattr(home_snapshot, "run_async", lambda data: data)
+    return state
+
+
+@pytest.fixture
+def snapshot(monkeypatch):
+    snapshot = HomeSnapshot()
+    monkeypatch.setattr(snapshot._task, "start", lambda: None)
+    return snapshot
+
+
+def test_requests_during_the_first_build_are_served_empty(snapshot, home_data, clock):
+    home_data["data"] = {"trending": [{"id": 1}]}
+    home_data["gate"] = threading.Event()
+    first = []
+    builder = threading.Thread(target=lambda: first.append(snapshot.get()))
+    builder.start()
+    while home_data["calls"] == 0:
+        pass
+
+    assert snapshot.get() is EMPTY_SNAPSHOT
+    home_data["gate"].set()
+    builder.join()
+
+    assert first[0]["trending"] == ({"id": 1},)
+    assert home_data["calls"] == 1
+
+
+def test_failed_first_build_is_retried_after_a_growing_delay(snapshot, home_data, clock):
+    assert snapshot.get() is EMPTY_SNAPSHOT
+    assert snapshot.get() is EMPTY_SNAPSHOT
+    assert home_data["calls"] == 1
+
+    clock.now += home_snapshot.HOME_SNAPSHOT_RETRY_DELAY
+    snapshot.get()
+    assert home_data["calls"] == 2
+
+    # The second failure waits twice as long
+    clock.now += home_snapshot.HOME_SNAPSHOT_RETRY_DELAY
+    snapshot.get()
+    assert home_data["calls"] == 2
+
+    home_data["data"] = {"popular_movies": [{"id": 2}]}
+    clock.now += home_snapshot.HOME_SNAPSHOT_RETRY_DELAY
+    assert snapshot.get()["popular_movies"] == ({"id": 2},)
+    assert snapshot.get()["popular_movies"] == ({"id": 2},)
+    assert home_data["calls"] == 3
+
+
+def test_build_that_raises_backs_off_too(snapshot, home_data, clock, monkeypatch):
+    def fail():
+        home_data["calls"] += 1
+        raise RuntimeError("TMDB down")
+
+    monkeypatch.setattr(home_snapshot, "get_home_page_data", fail)
+    assert snapshot.get() is EMPTY_SNAPSHOT
+    assert snapshot.get() is EMPTY_SNAPSHOT
+    assert home_data["calls"] == 1
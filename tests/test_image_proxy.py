@@ -0,0 +1,178 @@
+"""
+Disk cache of proxied TMDB images (app/services/image_proxy.py).
+
+    python -m pytest tests/test_image_proxy.py
+"""
+import io
+import os
+import zlib
+import pytest
+from werkzeug.exceptions import NotFound
+from app.extensions import app
+from app.routes import images
+from app.services import image_proxy
+from app.services.image_proxy import ImageProxy
+
+PIL = pytest.importorskip("PIL.Image")
+
+
+@pytest.fixture(autouse=True)
+def no_background_prune(monkeypatch):
+    """Tests prune by calling maintain()/prune() themselves."""
+    monkeypatch.setattr(image_proxy.PeriodicTask, "start", lambda self: None)
+
+
+def png(width: int, filename: str = "") -> bytes:
+    """A poster of the width, in a colour of its own per file name (the cache is content-addressed)."""
+    colour = tuple(zlib.crc32(filename.encode()).to_bytes(4, "big")[:3])
+    out = io.BytesIO()
+    PIL.new("RGB", (width, width * 3 // 2), colour).save(out, "PNG")
+    return out.getvalue()
+
+
+class Fetcher:
+    """TMDB stand-in: renditions of the given sizes (each named size's width), records what's asked."""
+
+    def __init__(self, sizes=("w185", "w342", "w500", "original"), body=None):
+        self.sizes = sizes
+        self.body = body
+        self.asked = []
+
+    def __call__(self, size, filename):
+        self.asked.append(size)
+        if size not in self.sizes:
+            return None
+        return self.body or png(2000 if size == "original" else int(size[1:]), filename)
+
+
+def test_variant_is_made_from_the_rendition_of_its_width(tmp_path):
+    fetcher = Fetcher()
+    proxy = ImageProxy(str(tmp_path), fetcher)
+    path, mimetype, _ = proxy.get("w342", "poster.jpg")
+
+    assert fetcher.asked == ["w342"]
+    assert mimetype == "image/jpeg"
+    with PIL.open(path) as img:
+        assert img.width == 342
+
+
+def test_original_is_fetched_when_tmdb_has_no_rendition_of_the_width(tmp_path):
+    fetcher = Fetcher()
+    path, _, _ = ImageProxy(str(tmp_path), fetcher).get("w1280", "poster.jpg")
+
+    assert fetcher.asked == ["w1280", "original"]
+    with PIL.open(path) as img:
+        assert img.width == 1280
+
+
+def test_failed_resize_is_recorded_and_source_served_with_its_type(tmp_path):
+    fetcher = Fetcher(body=b"not an image")
+    proxy = ImageProxy(str(tmp_path), fetcher)
+    first = proxy.get("w342", "poster.png")
+    resizes = proxy.resizes
+    second = proxy.get("w342", "poster.png")
+
+    assert first == second
+    assert first[1] == "image/png"
+    assert proxy.resize_failures == 1 and proxy.resizes == resizes
+
+
+def test_cache_is_pruned_to_the_cap_keeping_recently_used_files(tmp_path, monkeypatch):
+    proxy = ImageProxy(str(tmp_path), Fetcher(), max_bytes=10 ** 9)
+    for i in range(6):
+        proxy.get("w342", f"poster{i}.jpg")
+    assert proxy.prune() == 0
+    used = proxy.stats()["bytes"]
+
+    # Everything was last used long ago, then one image is served again
+    for dirpath, _, names in os.walk(tmp_path):
+        for name in names:
+            os.utime(os.path.join(dirpath, name), (1, 1))
+    monkeypatch.setattr(image_proxy, "IMAGE_TOUCH_INTERVAL", 0)
+    kept = proxy.get("w342", "poster0.jpg")[0]
+
+    proxy.max_bytes = used // 2
+    assert proxy.prune() > 0
+    assert proxy.stats()["bytes"] <= used // 2 * image_proxy.IMAGE_CACHE_PRUNE_TARGET
+    assert os.path.exists(kept)
+
+    # Evicted images are fetched again
+    assert os.path.exists(proxy.get("w342", "poster5.jpg")[0])
+
+
+def test_writes_past_the_cap_are_pruned_in_the_background(tmp_path, monkeypatch):
+    proxy = ImageProxy(str(tmp_path), Fetcher(), max_bytes=20_000)
+    proxy.maintain()
+    for i in range(20):
+        proxy.get("w342", f"poster{i}.jpg")
+
+    # Requests only count their writes
+    assert proxy.evictions == 0
+    assert proxy.maintain() > 0
+    on_disk = sum(os.path.getsize(os.path.join(d, n)) for d, _, names in os.walk(tmp_path) for n in names)
+    assert on_disk <= 20_000 * image_proxy.IMAGE_CACHE_PRUNE_TARGET
+
+    # Under the cap and measured recently: nothing to walk
+    monkeypatch.setattr(image_proxy.os, "walk", None)
+    assert proxy.maintain() == 0
+
+
+# ============================================================
+# Route
+# ============================================================
+
+@pytest.fixture
+def served(tmp_path, monkeypatch):
+    """The proxy behind /images/<size>/<file>, on a cache of its own."""
+    proxy = ImageProxy(str(tmp_path), Fetcher())
+    monkeypatch.setattr(images, "get_image_proxy", lambda: proxy)
+    return proxy
+
+
+def serve(size, filename, accept):
+    with app.test_request_context(f"/images/{size}/{filename}", headers={"Accept": accept}):
+        try:
+            response = images.tmdb_image(size, filename)
+        except NotFound:
+            return 404, None
+        response.close()
+        return response.status_code, response.mimetype
+
+
+@pytest.mark.parametrize("accept", ["*/*", "image/*", "image/webp;q=0, */*", "text/html,image/jpeg"])
+def test_jpeg_without_an_explicit_webp_accept(served, accept):
+    assert serve("w342", "poster.jpg", accept) == (200, "image/jpeg")
+
+
+@pytest.mark.skipif(not image_proxy.WEBP_SUPPORTED, reason="needs Pillow with WebP")
+def test_webp_for_an_explicit_webp_accept(served):
+    assert serve("w342", "poster.jpg", "image/avif,image/webp,*/*;q=0.8") == (200, "image/webp")
+
+
+def test_file_pruned_before_it_is_opened_is_made_again(served, monkeypatch):
+    get = served.get
+    pruned = []
+
+    def get_then_prune(*args, **kwargs):
+        image = get(*args, **kwargs)
+        if not pruned:
+            os.unlink(image[0])
+            pruned.append(image[0])
+        return image
+
+    monkeypatch.setattr(served, "get", get_then_prune)
+    assert serve("w342", "poster.jpg", "*/*") == (200, "image/jpeg")
+    assert served.resizes == 2
+    assert os.path.exists(pruned[0])
+
+
+def test_file_gone_on_every_try_is_not_found(served, monkeypatch):
+    get = served.get
+
+    def get_then_prune(*args, **kwargs):
+        image = get(*args, **kwargs)
+        os.unlink(image[0])
+        return image
+
+    monkeypatch.setattr(served, "get", get_then_prune)
+    assert serve("w342", "poster.jpg", "*/*") == (404, None)
@@ -0,0 +1,110 @@
+"""
+Per-worker caches of the library lists (app/services/db/membership.py and
+app/services/library_pages.py) seeing writes made through other workers.
+
+    python -m pytest tests/test_library_cache.py
+"""
+import pytest
+from sqlalchemy import text
+from app.extensions import app, db
+from app.services import library_pages
+from app.services.db import membership
+from app.services.db import add_movie_to_seen, remove_movie_from_seen, fetch_user_marks, fetch_user_marks_id, library_cache
+from app.services.db.membership import LibraryCache
+
+USER_ID = 9002
+
+
+@pytest.fixture(autouse=True)
+def empty_lists():
+    with app.app_context():
+        db.session.execute(text("DELETE FROM user_movies_seen WHERE user_id=:user_id"), {"user_id": USER_ID})
+        db.session.commit()
+        yield
+        db.session.execute(text("DELETE FROM user_movies_seen WHERE user_id=:user_id"), {"user_id": USER_ID})
+        db.session.commit()
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(membership, "time", clock)
+    return clock
+
+
+@pytest.fixture
+def fake_titles(monkeypatch):
+    async def fetch(title_ids, media_type):
+        return {i: {"id": i, "title": f"Title {i}", "release_date": "2000-01-01"} for i in title_ids}
+
+    monkeypatch.setattr(library_pages, "fetch_titles_info_batch", fetch)
+
+
+def test_cached_negative_of_another_worker_sees_add_after_the_check_interval(clock):
+    other_worker = LibraryCache()
+    with app.app_context():
+        assert other_worker.contains(USER_ID, "movie", "seen", 550) is False
+        # Written through this worker's cache; the other one isn't told
+        assert add_movie_to_seen(USER_ID, 550)
+        clock.now += other_worker.check_interval
+        assert other_worker.contains(USER_ID, "movie", "seen", 550) is True
+        assert other_worker.loads == 2
+
+        assert remove_movie_from_seen(USER_ID, 550)
+        clock.now += other_worker.check_interval
+        assert other_worker.contains(USER_ID, "movie", "seen", 550) is False
+
+
+def test_checks_within_the_interval_make_no_query(clock):
+    other_worker = LibraryCache()
+    with app.app_context():
+        other_worker.contains(USER_ID, "movie", "seen", 550)
+        reads = other_worker.version_reads
+        for _ in range(10):
+            assert other_worker.contains(USER_ID, "movie", "seen", 550) is False
+            clock.now += other_worker.check_interval / 20
+
+        assert other_worker.version_reads == reads
+        assert other_worker.loads == 1
+
+
+def test_writing_worker_sees_its_writes_at_once_without_reloading(clock):
+    with app.app_context():
+        library_cache.get(USER_ID)
+        loads = library_cache.loads
+        assert add_movie_to_seen(USER_ID, 551)
+        assert library_cache.contains(USER_ID, "movie", "seen", 551) is True
+        assert library_cache.loads == loads
+
+
+def test_detail_and_card_marks_see_add():
+    with app.app_context():
+        LibraryCache().get(USER_ID)
+        assert fetch_user_marks(USER_ID, 552, "movie")["seen"] == []
+        assert add_movie_to_seen(USER_ID, 552, 7.5)
+        assert fetch_user_marks(USER_ID, 552, "movie")["seen"][0]["user_rating"] == 7.5
+        assert fetch_user_marks_id(USER_ID, {"movie": [552]})["movie"] == {552: {"seen": True, "in_watchlist": False}}
+
+
+def test_cached_page_of_another_worker_is_dropped_after_add(fake_titles, clock):
+    # Versions and recorded writes of another process
+    other_worker = library_pages.LibraryPages(library=LibraryCache())
+    with app.app_context():
+        assert add_movie_to_seen(USER_ID, 553)
+        first = other_worker.get_page(USER_ID, "movie", "seen", "recent", True, None, 10)
+        assert other_worker.get_page(USER_ID, "movie", "seen", "recent", True, None, 10) is first
+        assert other_worker.hits == 1
+
+        assert add_movie_to_seen(USER_ID, 554)
+        clock.now += other_worker.library.check_interval
+        page = other_worker.get_page(USER_ID, "movie", "seen", "recent", True, None, 10)
+        assert sorted(card["id"] for card in page["results"]) == [553, 554]
+        assert other_worker.hits == 1
@@ -0,0 +1,160 @@
+"""
+Keyset pages of the library lists (app/services/db/library.py).
+
+    python -m pytest tests/test_library_pages.py
+"""
+import pytest
+from sqlalchemy import text
+from app.extensions import app, db
+from app.services import library_pages
+from app.services.db import get_library_page, save_titles_metadata
+from app.services.db.library import _keyset_condition
+from app.validations import validate_library_page_params
+
+USER_ID = 9001
+
+
+@pytest.fixture
+def seen_movies():
+    """Inserts the given (api_movie_id, user_rating) rows into the user's watched movies."""
+    with app.app_context():
+        db.session.execute(text("DELETE FROM user_movies_seen WHERE user_id=:user_id"), {"user_id": USER_ID})
+        db.session.commit()
+
+        def insert(rows):
+            db.session.execute(
+                text("INSERT INTO user_movies_seen (user_id, api_movie_id, user_rating) VALUES (:user_id, :id, :rating)"),
+                [{"user_id": USER_ID, "id": tmdb_id, "rating": rating} for tmdb_id, rating in rows]
+            )
+            db.session.commit()
+
+        yield insert
+        db.session.execute(text("DELETE FROM user_movies_seen WHERE user_id=:user_id"), {"user_id": USER_ID})
+        db.session.commit()
+
+
+def walk(sort: str, descending: bool, limit: int) -> list[int]:
+    """Ids of every page of the user's watched movies, following the keyset."""
+    ids, after = [], None
+    while True:
+        rows = get_library_page(USER_ID, "movie", "seen", sort, descending, after, limit)
+        ids += [row["api_movie_id"] for row in rows]
+        if len(rows) < limit:
+            return ids
+        after = (rows[-1]["sort_value"], rows[-1]["api_movie_id"])
+
+
+@pytest.mark.parametrize("descending", [True, False])
+def test_rating_ties_are_paged_once(seen_movies, descending):
+    # Page boundaries fall inside the run of 7.3s
+    seen_movies([(i, 7.3) for i in range(1, 11)] + [(11, 8.6), (12, 5.1)])
+    ids = walk("rating", descending, limit=3)
+
+    expected = [12] + list(range(1, 11)) + [11]
+    assert ids == (expected[::-1] if descending else expected)
+
+
+def test_rating_cursor_is_narrowed_to_float_on_mysql():
+    # MySQL keeps user_rating as a 4-byte FLOAT: 7.3 is stored as 7.300000190734863
+    condition = _keyset_condition("user_rating", "api_movie_id", True, 7.3, "mysql")
+    assert condition.count("CAST(:after_value AS FLOAT)") == 2
+    assert "< :after_value" not in condition and "= :after_value" not in condition
+    assert "CAST" not in _keyset_condition("title_sort", "api_movie_id", True, "a", "mysql")
+    assert "CAST" not in _keyset_condition("user_rating", "api_movie_id", True, 7.3, "sqlite")
+
+
+@pytest.fixture
+def fake_titles(monkeypatch):
+    """Title metadata without TMDB: "Title <id>" released in 2000 + id % 20. Records the ids asked for."""
+    asked = []
+
+    async def fetch(title_ids, media_type):
+        asked.append(list(title_ids))
+        return {i: {"id": i, "title": f"Title {i}", "release_date": f"{2000 + i % 20}-01-01"} for i in title_ids}
+
+    monkeypatch.setattr(library_pages, "fetch_titles_info_batch", fetch)
+    return asked
+
+
+def test_first_title_page_fills_at_most_a_page_of_keys(seen_movies, fake_titles):
+    seen_movies([(i, None) for i in range(1, 101)])
+    with app.app_context():
+        library_pages.LibraryPages().get_page(USER_ID, "movie", "seen", "title", False, None, 10)
+        missing = db.session.execute(
+            text("SELECT COUNT(*) FROM user_movies_seen WHERE user_id=:user_id AND title_sort IS NULL"), {"user_id": USER_ID}
+        ).scalar()
+
+    assert len(fake_titles[0]) == 10
+    assert missing == 90
+
+
+def test_backfill_fills_every_row_in_batches(seen_movies, fake_titles):
+    seen_movies([(i, None) for i in range(1, 26)])
+    with app.app_context():
+        stats = library_pages.backfill_sort_keys(batch_size=10)
+        rows = db.session.execute(
+            text("SELECT api_movie_id, title_sort, release_year FROM user_movies_seen WHERE user_id=:user_id"), {"user_id": USER_ID}
+        ).fetchall()
+
+    assert stats["filled"] >= 25
+    assert all(len(ids) <= 10 for ids in fake_titles)
+    assert {(i, f"title {i}", 2000 + i % 20) for i in range(1, 26)} == set(rows)
+
+
+def test_sort_key_of_an_added_title_is_read_from_the_store_only(fake_titles):
+    with app.app_context():
+        save_titles_metadata("movie", {990001: {"id": 990001, "title": "Amélie", "release_date": "2001-04-25"}})
+        assert library_pages.get_title_sort_key("movie", 990001) == ("amelie", 2001)
+        # Not stored yet: left to the backfill
+        assert library_pages.get_title_sort_key("movie", 990002) == (None, None)
+
+    assert fake_titles == []
+
+
+def engine_walk(sort: str, order: str, limit: int) -> list[int]:
+    """Ids of every page served by the engine, following next_cursor as the route does."""
+    pages = library_pages.LibraryPages()
+    ids, cursor = [], None
+    while True:
+        sort_, descending, after, limit_ = validate_library_page_params("movie", "seen", cursor, None if cursor else sort, None if cursor else order, limit)
+        page = pages.get_page(USER_ID, "movie", "seen", sort_, descending, after, limit_)
+        ids += [card["id"] for card in page["results"]]
+        if not page["has_more"]:
+            return ids
+        cursor = page["next_cursor"]
+
+
+@pytest.mark.parametrize("sort, column", [("rating", "user_rating"), ("title", "title_sort"), ("year", "release_year"), ("recent", "updated_at")])
+@pytest.mark.parametrize("order", ["asc", "desc"])
+def test_pages_cover_nulls_and_ties_once_in_order(fake_titles, monkeypatch, sort, column, order):
+    # Keys that can't be filled (TMDB down), so NULL titles stay NULL
+    monkeypatch.setattr(library_pages, "get_title_sort_keys", lambda media_type, tmdb_ids: {})
+    # 40 rows over 3 values plus NULL, so every page boundary falls inside a run of equal keys
+    values = {
+        "user_rating": [None, 6.5, 7.3, 8.1],
+        "title_sort": [None, "alien", "heat", "up"],
+        "release_year": [None, 1979, 1995, 2009],
+        "updated_at": ["2025-01-01 10:00:00", "2025-01-02 10:00:00", "2025-01-02 10:00:00", "2025-01-03 10:00:00"],
+    }
+    rows = []
+    for tmdb_id in range(1, 41):
+        row = {"user_id": USER_ID, "id": tmdb_id, "user_rating": None, "title_sort": "", "release_year": None, "updated_at": "2025-01-01 10:00:00"}
+        row[column] = values[column][tmdb_id * 7 % 4]
+        rows.append(row)
+    with app.app_context():
+        db.session.execute(text("DELETE FROM user_movies_seen WHERE user_id=:user_id"), {"user_id": USER_ID})
+        db.session.execute(text("""
+            INSERT INTO user_movies_seen (user_id, api_movie_id, user_rating, title_sort, release_year, updated_at)
+            VALUES (:user_id, :id, :user_rating, :title_sort, :release_year, :updated_at)
+        """), rows)
+        db.session.commit()
+        try:
+            ids = engine_walk(sort, order, limit=6)
+        finally:
+            db.session.execute(text("DELETE FROM user_movies_seen WHERE user_id=:user_id"), {"user_id": USER_ID})
+            db.session.commit()
+
+    # NULL sorts as the smallest value, ties by id in the same direction
+    expected = sorted(rows, key=lambda r: (r[column] is not None, r[column] or 0, r["id"]))
+    expected = [r["id"] for r in expected]
+    assert ids == (expected[::-1] if order == "desc" else expected)
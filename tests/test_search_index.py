@@ -0,0 +1,122 @@
+"""
+Local title index (app/services/search_index.py) and its periodic sync
+(app/services/search_info.py).
+
+    python -m pytest tests/test_search_index.py
+"""
+import asyncio
+import pytest
+from sqlalchemy import text
+from app.extensions import app, db
+from app.services import search_info
+from app.services.search_index import TitleIndex, fold, trigrams
+
+
+def card(tmdb_id: int, title: str, media_type: str = "movie", popularity: float = 10.0) -> dict:
+    return {"id": tmdb_id, "media_type": media_type, "title": title, "release_date": "2001-01-01", "popularity": popularity}
+
+
+@pytest.fixture
+def index():
+    index = TitleIndex()
+    index.add_many([
+        card(1, "Amélie"),
+        card(2, "The Dark Knight", popularity=90.0),
+        card(3, "Dark City"),
+        card(4, "Darkest Hour"),
+        card(5, "Dark", "tv", popularity=50.0),
+    ])
+    return index
+
+
+def ids(results) -> list[int]:
+    return [result["id"] for result in results]
+
+
+# ============================================================
+# Matching
+# ============================================================
+
+def test_fold_strips_accents_case_and_punctuation():
+    assert fold("Amélie: Le Fabuleux Destin!") == "amelie le fabuleux destin"
+
+
+def test_every_word_must_match_exactly_or_by_prefix(index):
+    assert ids(index.search("dark knight")) == [2]
+    assert ids(index.search("AMELIE")) == [1]
+    # The last word of an as-you-type query is a prefix
+    assert set(ids(index.search("dark ci"))) == {3}
+    assert 4 in ids(index.search("dar"))
+    assert ids(index.search("dark xyzzy")) == []
+
+
+def test_exact_title_ranks_first_then_title_start_then_popularity(index):
+    # "Dark" is the title, "Dark City" starts with the word, "Darkest Hour" with a prefix of it
+    assert ids(index.search("dark")) == [5, 3, 4, 2]
+    index.add(card(7, "Dark Water", popularity=20.0))
+    assert ids(index.search("dark"))[1:3] == [7, 3]
+    assert ids(index.search("dark", media_type="tv")) == [5]
+
+
+def test_misspelled_word_matches_similar_tokens_by_trigram(index):
+    assert ids(index.search("amelei")) == [1]
+    assert ids(index.search("knigt dark")) == [2]
+    assert ids(index.search("zzyzx")) == []
+    # Exact matches outrank fuzzy ones
+    index.add(card(6, "Knigt"))
+    assert ids(index.search("knigt")) == [6, 2]
+
+
+def test_removing_the_last_title_with_a_token_drops_it_from_the_vocabulary(index):
+    index.remove("movie", 1)
+    assert index.search("amelie") == []
+    assert "amelie" not in index._postings and "amelie" not in index._vocab
+    assert all("amelie" not in index._trigrams.get(t, ()) for t in trigrams("amelie"))
+
+    # Tokens still held by other titles stay
+    index.remove("movie", 3)
+    assert "dark" in index._vocab and "city" not in index._vocab
+    assert ids(index.search("dark")) == [5, 4, 2]
+
+
+def test_reindexing_a_renamed_title_drops_its_old_tokens(index):
+    index.add(card(4, "Winston"))
+    assert "darkest" not in index._vocab and "hour" not in index._vocab
+    assert index.search("hour") == []
+    assert ids(index.search("winston")) == [4]
+    assert len(index) == 5
+
+
+# ============================================================
+# Periodic sync
+# ============================================================
+
+@pytest.fixture
+def sync(monkeypatch):
+    """_sync_title_index with its reads and TMDB fetches counted."""
+    calls = {"synced": 0, "fetched": []}
+
+    def sync_from_store():
+        calls["synced"] += 1
+
+    async def fetch_titles_info_batch(title_ids, media_type):
+        calls["fetched"].append((media_type, list(title_ids)))
+
+    monkeypatch.setattr(search_info.title_index, "sync_from_store", sync_from_store)
+    monkeypatch.setattr(search_info, "get_user_titles_missing_metadata", lambda: {"movie": [550, 551]})
+    monkeypatch.setattr(search_info, "fetch_titles_info_batch", fetch_titles_info_batch)
+    monkeypatch.setattr(search_info, "run_async", asyncio.run)
+    with app.app_context():
+        db.session.execute(text("DELETE FROM sync_state WHERE name=:name"), {"name": search_info.BACKFILL_STATE_NAME})
+        db.session.commit()
+        yield calls
+        db.session.execute(text("DELETE FROM sync_state WHERE name=:name"), {"name": search_info.BACKFILL_STATE_NAME})
+        db.session.commit()
+
+
+def test_every_worker_syncs_but_one_backfills(sync):
+    for _ in range(3):
+        search_info._sync_title_index()
+
+    assert sync["synced"] == 3
+    assert sync["fetched"] == [("movie", [550, 551])]
@@ -0,0 +1,80 @@
+"""
+Exclusive runs of the periodic new season scan (app/services/season_scanner.py).
+
+    python -m pytest tests/test_season_scan.py
+"""
+import threading
+from datetime import datetime, timedelta
+import pytest
+from flask import url_for
+from sqlalchemy import text
+from werkzeug.routing import Map, Rule
+from app.extensions import app, db
+from app.services import season_scanner
+from app.services.db import claim_sync_slot
+from app.utils.converters import MediaTypeConverter
+
+NAME = "test_scan_slot"
+
+
+@pytest.fixture
+def slot():
+    with app.app_context():
+        db.session.execute(text("DELETE FROM sync_state WHERE name IN (:name, :scan)"), {"name": NAME, "scan": season_scanner.STATE_NAME})
+        db.session.commit()
+        yield
+        db.session.execute(text("DELETE FROM sync_state WHERE name IN (:name, :scan)"), {"name": NAME, "scan": season_scanner.STATE_NAME})
+        db.session.commit()
+
+
+def test_slot_is_claimed_once_per_interval(slot):
+    now = datetime(2026, 1, 1, 12)
+    assert claim_sync_slot(NAME, now, now + timedelta(hours=12))
+    assert not claim_sync_slot(NAME, now, now + timedelta(hours=12))
+    assert not claim_sync_slot(NAME, now + timedelta(hours=11), now + timedelta(hours=23))
+    assert claim_sync_slot(NAME, now + timedelta(hours=12), now + timedelta(hours=24))
+
+
+def test_concurrent_workers_claim_one_scan(slot, monkeypatch):
+    runs = []
+    monkeypatch.setattr(season_scanner, "scan_new_seasons", lambda: runs.append(1))
+    barrier = threading.Barrier(4)
+
+    def worker():
+        with app.app_context():
+            barrier.wait()
+            season_scanner.scheduled_scan()
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    # A restarted worker doesn't scan again either
+    with app.app_context():
+        season_scanner.scheduled_scan()
+
+    assert len(runs) == 1
+
+
+def test_due_seasons_link_to_the_series_page_outside_a_request(monkeypatch):
+    # The title route, as create_app() registers it
+    url_map = Map([Rule("/title/<media:media_type>/<int:id>", endpoint="titles.title")], converters={"media": MediaTypeConverter})
+    monkeypatch.setattr(app, "url_map", url_map)
+    candidates = [
+        {"api_serie_id": 1399, "min_season": 1, "oldest_update": datetime(2026, 1, 1)},
+        {"api_serie_id": 1400, "min_season": 3, "oldest_update": datetime(2026, 1, 1)},
+    ]
+    latest = [
+        {"season_number": 2, "air_date": "2026-02-01", "name": "Dragons"},
+        {"season_number": 3, "air_date": "2026-02-01", "name": "Seen"},
+    ]
+    with app.test_request_context():
+        expected = url_for("titles.title", media_type="tv", id=1399)
+
+    seasons = season_scanner._due_seasons(candidates, latest)
+    assert expected == "/title/tv/1399"
+    assert [season["target_url"] for season in seasons] == [expected]
+
+    monkeypatch.setitem(app.config, "APPLICATION_ROOT", "/films")
+    assert season_scanner._due_seasons(candidates, latest)[0]["target_url"] == f"/films{expected}"
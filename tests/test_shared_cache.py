@@ -0,0 +1,167 @@
+"""
+Title cache shared by the workers of a host (app/services/shared_cache.py).
+
+    python -m pytest tests/test_shared_cache.py
+"""
+import time
+import pytest
+from app.services import shared_cache
+from app.services.shared_cache import SharedTitleCache, SEQ, SLOT_HEADER, MEDIA_CODES
+from app.services.title_record import TitleRecord
+
+pytestmark = pytest.mark.skipif(shared_cache.fcntl is None, reason="needs flock()")
+
+WAYS = 4
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return SharedTitleCache(str(tmp_path / "title_cache.bin"), slots=16, slot_size=256, ways=WAYS)
+
+
+def record(tmdb_id: int, media_type: str = "movie", title: str = None) -> TitleRecord:
+    return TitleRecord(tmdb_id, media_type, title or f"Title {tmdb_id}", 2000 + tmdb_id % 20, 71, 12.5, f"/p{tmdb_id}.jpg", None, (18, 35))
+
+
+def same_set_ids(cache, count: int, media_type: str = "movie") -> list[int]:
+    """count ids that hash to the same set of ways."""
+    first = cache._set_offsets(MEDIA_CODES[media_type], 1)
+    return [i for i in range(1, 10000) if cache._set_offsets(MEDIA_CODES[media_type], i) == first][:count]
+
+
+def slot_of(cache, tmdb_id: int, media_type: str = "movie") -> int:
+    """Offset of the slot holding a title, or None."""
+    media = MEDIA_CODES[media_type]
+    for offset in cache._set_offsets(media, tmdb_id):
+        _, slot_media, _, _, slot_id, _, _ = SLOT_HEADER.unpack_from(cache._map(), offset)
+        if (slot_media, slot_id) == (media, tmdb_id):
+            return offset
+    return None
+
+
+def test_record_round_trip(cache):
+    assert cache.put_many([record(550), record(550, "tv", "Série ünïcode")]) == 2
+
+    assert cache.get("movie", 550).to_dict() == record(550).to_dict()
+    assert cache.get("tv", 550).to_dict() == record(550, "tv", "Série ünïcode").to_dict()
+    assert cache.get("movie", 551) is None
+    assert cache.get_many("movie", [550, 551]).keys() == {550}
+
+
+def test_records_are_seen_by_another_process_mapping(cache):
+    cache.put(record(550))
+    other_worker = SharedTitleCache(cache.path, slots=16, slot_size=256, ways=WAYS)
+    assert other_worker.get("movie", 550).title == "Title 550"
+
+
+def test_full_set_evicts_with_clock(cache):
+    ids = same_set_ids(cache, WAYS + 2)
+    other = [i for i in range(1, 10000) if i not in ids][:3]
+    cache.put_many([record(i) for i in ids[:WAYS] + other])
+
+    # Every way was just written (referenced): a full sweep clears them, then the hand's way goes
+    cache.put(record(ids[WAYS]))
+    assert cache.evictions == 1
+    # (slot_of looks without reading, which would set reference bits)
+    assert [i for i in ids[:WAYS + 1] if slot_of(cache, i) is None] == [ids[0]]
+
+    # A read gives its way a second chance: the hand passes it and takes the next one
+    cache.get("movie", ids[1])
+    cache.put(record(ids[WAYS + 1]))
+    assert cache.evictions == 2
+    assert [i for i in ids if slot_of(cache, i) is None] == [ids[0], ids[2]]
+
+    # Titles of other sets are untouched
+    assert cache.get_many("movie", other).keys() == set(other)
+
+
+def test_refresh_reuses_the_title_slot(cache):
+    ids = same_set_ids(cache, WAYS)
+    cache.put_many([record(i) for i in ids])
+    cache.put(record(ids[0], title="Renamed"))
+
+    assert cache.evictions == 0
+    assert cache.get("movie", ids[0]).title == "Renamed"
+    assert all(cache.get("movie", i) is not None for i in ids)
+
+
+def test_reader_retries_a_slot_being_written(cache, monkeypatch):
+    cache.put(record(550, title="Before"))
+    offset = slot_of(cache, 550)
+    mm = cache._map()
+    # A writer in another process is halfway through: odd sequence number, payload partly replaced
+    seq = SEQ.unpack_from(mm, offset)[0]
+    SEQ.pack_into(mm, offset, seq + 1)
+    mm[offset + SLOT_HEADER.size:offset + SLOT_HEADER.size + 4] = b"\xff\xff\xff\xff"
+
+    def writer_finishes():
+        cache._write(mm, offset, MEDIA_CODES["movie"], 550, int(time.time()), record(550, title="After").to_bytes())
+
+    monkeypatch.setattr(shared_cache, "_pause", writer_finishes)
+    assert cache.get("movie", 550).title == "After"
+    assert cache.retries == 1
+    assert cache.rejected == 0
+
+
+def test_reader_gives_up_on_a_slot_left_torn(cache, monkeypatch):
+    cache.put(record(550))
+    offset = slot_of(cache, 550)
+    # Writer killed mid-write: the number stays odd
+    SEQ.pack_into(cache._map(), offset, SEQ.unpack_from(cache._map(), offset)[0] + 1)
+    monkeypatch.setattr(shared_cache, "_pause", lambda: None)
+
+    assert cache.get("movie", 550) is None
+    assert cache.retries == shared_cache.SHARED_CACHE_READ_RETRIES
+    assert cache.rejected == 1
+
+    # The next process to open the file clears it
+    reopened = SharedTitleCache(cache.path, slots=16, slot_size=256, ways=WAYS)
+    assert reopened.get("movie", 550) is None
+    assert reopened.repaired == 1
+
+
+def test_corrupt_payload_is_a_miss_without_retries(cache):
+    cache.put(record(550))
+    offset = slot_of(cache, 550)
+    mm = cache._map()
+    mm[offset + SLOT_HEADER.size] ^= 0xFF
+
+    assert cache.get("movie", 550) is None
+    assert cache.retries == 0
+    assert cache.rejected == 1
+
+
+def test_record_too_big_for_a_slot_is_rejected(cache):
+    big = record(550, title="x" * 300)
+    assert len(big.to_bytes()) > cache.max_payload
+
+    assert cache.put(big) is False
+    assert cache.put_many([big, record(551)]) == 1
+    assert cache.rejected == 2
+    assert cache.get("movie", 550) is None
+    assert cache.get("movie", 551) is not None
+
+
+def test_invalidate_drops_only_the_given_titles(cache):
+    cache.put_many([record(550), record(551), record(550, "tv")])
+
+    assert cache.invalidate("movie", [550, 999]) == 1
+    assert cache.get("movie", 550) is None
+    assert cache.get("movie", 551) is not None
+    assert cache.get("tv", 550) is not None
+    assert cache.invalidate("person", [551]) == 0
+
+
+def test_invalidate_before_drops_older_records(cache, monkeypatch):
+    now = time.time()
+    monkeypatch.setattr(shared_cache.time, "time", lambda: now - 100)
+    cache.put(record(550))
+    monkeypatch.setattr(shared_cache.time, "time", lambda: now)
+    cache.put(record(551))
+
+    assert cache.invalidate_before(now - 50) == 1
+    assert cache.get("movie", 550) is None
+    assert cache.get("movie", 551) is not None
+    # A dropped slot takes new records
+    cache.put(record(550))
+    assert cache.get("movie", 550) is not None
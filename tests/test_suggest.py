@@ -0,0 +1,93 @@
+"""
+Radix trie behind the search suggestions (app/services/suggest.py).
+
+    python -m pytest tests/test_suggest.py
+"""
+from app.services.suggest import PrefixTrie
+# Constants
+from app.constants import SUGGEST_LIMIT
+
+
+def suggestion(tmdb_id: int, title: str, popularity: float = 10.0, media_type: str = "movie") -> dict:
+    return {"id": tmdb_id, "media_type": media_type, "title": title, "year": "2001", "poster_path": None, "popularity": popularity}
+
+
+def titles(results) -> list[str]:
+    return [result["title"] for result in results]
+
+
+def test_shared_prefix_splits_the_edge():
+    trie = PrefixTrie()
+    trie.add(suggestion(1, "Darkness"))
+    assert trie._root.children["d"][0] == "darkness"
+
+    trie.add(suggestion(2, "Darkman"))
+    label, middle = trie._root.children["d"]
+    assert label == "dark"
+    assert {edge[0] for edge in middle.children.values()} == {"ness", "man"}
+    # The split node covers the titles of both branches
+    assert {key for _, key in middle.top} == {("movie", 1), ("movie", 2)}
+    assert trie.nodes == 4
+
+
+def test_title_that_ends_mid_edge_splits_it_too():
+    trie = PrefixTrie()
+    trie.add(suggestion(1, "Darkness"))
+    trie.add(suggestion(2, "Dark"))
+
+    label, node = trie._root.children["d"]
+    assert label == "dark"
+    assert node.children["n"][0] == "ness"
+    assert titles(trie.lookup("dark")) == ["Darkness", "Dark"]
+    assert titles(trie.lookup("darkn")) == ["Darkness"]
+
+
+def test_lookup_ending_inside_an_edge_finds_the_titles_below_it():
+    trie = PrefixTrie()
+    trie.add(suggestion(1, "Interstellar", 80.0))
+    trie.add(suggestion(2, "Inception", 90.0))
+
+    assert titles(trie.lookup("i")) == ["Inception", "Interstellar"]
+    assert titles(trie.lookup("inte")) == ["Interstellar"]
+    assert trie.lookup("intx") == []
+    assert trie.lookup("interstellarx") == []
+
+
+def test_titles_are_found_from_their_word_starts():
+    trie = PrefixTrie()
+    trie.add(suggestion(1, "The Dark Knight"))
+
+    assert titles(trie.lookup("knig")) == ["The Dark Knight"]
+    assert titles(trie.lookup("dark k")) == ["The Dark Knight"]
+    assert trie.lookup("ark") == []
+
+
+def test_each_node_keeps_only_the_most_popular_titles():
+    trie = PrefixTrie()
+    for i in range(SUGGEST_LIMIT + 4):
+        trie.add(suggestion(i, f"Star {i}", popularity=float(i)))
+
+    expected = [f"Star {i}" for i in range(SUGGEST_LIMIT + 3, 3, -1)]
+    assert titles(trie.lookup("st")) == expected
+    # A less popular title doesn't displace them; a more popular one does
+    trie.add(suggestion(100, "Stargate", popularity=0.5))
+    assert titles(trie.lookup("star")) == expected
+    trie.add(suggestion(101, "Starman", popularity=99.0))
+    assert titles(trie.lookup("star")) == ["Starman"] + expected[:-1]
+
+    nodes = [trie._root]
+    while nodes:
+        node = nodes.pop()
+        assert len(node.top) <= SUGGEST_LIMIT
+        assert [weight for weight, _ in node.top] == sorted((weight for weight, _ in node.top), reverse=True)
+        nodes.extend(child for _, child in node.children.values())
+
+
+def test_readded_title_is_not_listed_twice():
+    trie = PrefixTrie()
+    trie.add(suggestion(1, "Alien", 10.0))
+    trie.add(suggestion(2, "Aliens", 20.0))
+    trie.add(suggestion(1, "Alien", 30.0))
+
+    assert titles(trie.lookup("ali")) == ["Alien", "Aliens"]
+    assert len(trie) == 2
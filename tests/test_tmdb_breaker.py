@@ -0,0 +1,94 @@
+"""
+Circuit breaker probes and deadlines of TMDB requests (app/services/api/tmdb_client.py).
+
+    python -m pytest tests/test_tmdb_breaker.py
+"""
+import asyncio
+import time
+import pytest
+from aiohttp import web
+from app.exceptions import TMDBUnavailable
+from app.services.api import tmdb_client as tmdb_client_module
+from app.services.api.circuit_breaker import CLOSED, OPEN, HALF_OPEN
+
+DEADLINE = 1.0
+
+
+@pytest.fixture
+def upstream(serve, tmdb_client, monkeypatch):
+    """A client of a server with a slow, a garbled, a failing and a healthy endpoint; deadlines of DEADLINE seconds."""
+    async def slow(request):
+        await asyncio.sleep(5)
+        return web.json_response({})
+
+    async def garbled(request):
+        return web.Response(body=b"<html>gateway", content_type="application/json")
+
+    async def failing(request):
+        return web.Response(status=503)
+
+    async def healthy(request):
+        return web.json_response({"id": 550})
+
+    web_app = web.Application()
+    web_app.router.add_get("/slow", slow)
+    web_app.router.add_get("/garbled", garbled)
+    web_app.router.add_get("/failing", failing)
+    web_app.router.add_get("/healthy", healthy)
+    monkeypatch.setattr(tmdb_client_module, "TMDB_DEFAULT_TIMEOUT", DEADLINE)
+    return tmdb_client(serve(web_app))
+
+
+def half_open(client):
+    """Put the client's breaker where the next request is its probe."""
+    breaker = client.breaker
+    breaker._state = OPEN
+    breaker._opened_at = time.monotonic() - breaker.reset_timeout
+    assert breaker.state == HALF_OPEN
+
+
+def test_cancelled_probe_frees_the_probe_slot(upstream):
+    half_open(upstream)
+
+    async def cancel_probe():
+        task = asyncio.get_running_loop().create_task(upstream._fetch("/slow"))
+        await asyncio.sleep(0.2)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    upstream.run(cancel_probe())
+    assert upstream.breaker.state == HALF_OPEN
+    assert upstream.run(upstream._fetch("/healthy"))[0] == {"id": 550}
+    assert upstream.breaker.state == CLOSED
+
+
+def test_probe_with_a_body_that_does_not_decode_reopens_the_breaker(upstream):
+    half_open(upstream)
+    with pytest.raises(ValueError):
+        upstream.run(upstream._fetch("/garbled"))
+    assert upstream.breaker.state == OPEN
+
+
+def test_rate_limiter_wait_stops_at_the_deadline(upstream):
+    # Paused well past the deadline, as after a long Retry-After
+    upstream.limiter.on_throttle(30)
+    started = time.monotonic()
+    with pytest.raises(TMDBUnavailable):
+        upstream.run(upstream._fetch("/healthy"))
+
+    assert time.monotonic() - started < DEADLINE + 0.5
+    assert upstream.breaker.state == CLOSED
+    assert upstream.upstream_requests == 0
+
+
+def test_backoff_stops_at_the_deadline(upstream, monkeypatch):
+    monkeypatch.setattr(tmdb_client_module, "TMDB_RETRY_BASE_DELAY", 30)
+    monkeypatch.setattr(tmdb_client_module, "TMDB_RETRY_MAX_DELAY", 30)
+    monkeypatch.setattr(tmdb_client_module.random, "uniform", lambda low, high: high)
+    started = time.monotonic()
+    with pytest.raises(TMDBUnavailable):
+        upstream.run(upstream._fetch("/failing"))
+
+    assert time.monotonic() - started < DEADLINE + 0.5
+    assert upstream.upstream_requests == 1
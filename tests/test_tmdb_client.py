@@ -0,0 +1,260 @@
+"""
+TMDB client against the local stand-in (tests/tmdb_stub.py): response cache
+(app/services/api/response_cache.py), request coalescing, conditional
+revalidation and the adaptive rate limiter (app/services/api/rate_limiter.py).
+
+    python -m pytest tests/test_tmdb_client.py
+"""
+import asyncio
+import time
+import pytest
+from app.services.api.circuit_breaker import CLOSED
+from app.services.api.rate_limiter import AdaptiveRateLimiter
+from app.services.api.response_cache import ResponseCache, FRESH, MISS, make_cache_key
+from app.constants import TMDB_THROTTLE_RETRIES
+from tmdb_stub import create_stub_app, parse_args
+
+# The stub keys its state by string, as scripts run it
+pytestmark = pytest.mark.filterwarnings("ignore:It is recommended to use web.AppKey")
+
+MOVIE = "/movie/550"
+
+
+@pytest.fixture
+def stub(serve, tmdb_client):
+    """stub(*argv) -> (client, stub state): a TMDB client of a stub started with those command line flags."""
+    def start(*argv):
+        stub_app = create_stub_app(parse_args(list(argv)))
+        return tmdb_client(serve(stub_app) + "/3"), stub_app["state"]
+
+    return start
+
+
+def expire(client, path: str, params: dict = None, stale: bool = True):
+    """Age a cached response past its TTL (and past the stale grace period with stale=False)."""
+    entry = client.cache._entries[make_cache_key(path, params)]
+    entry.expires_at = 0.0
+    if not stale:
+        entry.stale_until = 0.0
+
+
+async def settle(client):
+    """Wait for the background refreshes started by get_json."""
+    while client._inflight:
+        await asyncio.gather(*client._inflight.values(), return_exceptions=True)
+
+
+# ============================================================
+# Response cache
+# ============================================================
+
+def test_cache_evicts_least_recently_used_over_its_byte_budget():
+    cache = ResponseCache(max_bytes=100, ttls={"details": 60})
+    cache.set("a", {"id": 1}, 40, "details")
+    cache.set("b", {"id": 2}, 40, "details")
+    cache.get("a")
+    cache.set("c", {"id": 3}, 40, "details")
+
+    assert cache.get("b") == (MISS, None)
+    assert cache.get("a") == (FRESH, {"id": 1})
+    assert cache.evictions == 1
+    # Bigger than the whole budget: never cached
+    cache.set("d", {}, 101, "details")
+    assert cache.get("d") == (MISS, None)
+
+
+def test_cached_response_is_served_without_a_request(stub):
+    client, state = stub()
+    first = client.run(client.get_json(MOVIE, ttl_class="details"))
+    assert client.run(client.get_json(MOVIE, ttl_class="details")) == first
+
+    assert state.requests["movie"] == 1
+    assert client.cache.hits == 1
+
+
+def test_expired_response_is_served_stale_and_refreshed_in_the_background(stub):
+    client, state = stub()
+    first = client.run(client.get_json(MOVIE, ttl_class="details"))
+    expire(client, MOVIE)
+
+    async def stale_then_refreshed():
+        value = await client.get_json(MOVIE, ttl_class="details")
+        # Answered from the cache before the refresh went out
+        assert state.requests["movie"] == 1
+        await settle(client)
+        return value
+
+    assert client.run(stale_then_refreshed()) == first
+    assert client.cache.stale_hits == 1
+    assert state.requests["movie"] == 2
+    assert client.cache.get(make_cache_key(MOVIE))[0] == FRESH
+
+
+def test_response_past_the_grace_period_is_fetched_again(stub):
+    client, state = stub()
+    client.run(client.get_json(MOVIE, ttl_class="details"))
+    expire(client, MOVIE, stale=False)
+
+    assert client.run(client.get_json(MOVIE, ttl_class="details"))["id"] == 550
+    assert client.cache.stale_hits == 0
+    assert state.requests["movie"] == 2
+
+
+def test_cached_response_is_served_while_tmdb_is_down(stub):
+    client, state = stub()
+    first = client.run(client.get_json(MOVIE, ttl_class="details"))
+    expire(client, MOVIE, stale=False)
+    for _ in range(client.breaker.failure_threshold):
+        client.breaker.record_failure()
+
+    assert client.run(client.get_json(MOVIE, ttl_class="details")) == first
+    assert state.requests["movie"] == 1
+
+
+# ============================================================
+# Coalescing
+# ============================================================
+
+def test_concurrent_identical_lookups_make_one_request(stub):
+    client, state = stub("--latency", "100")
+
+    async def lookups():
+        return await asyncio.gather(*(client.get_json(MOVIE, ttl_class="details") for _ in range(10)))
+
+    results = client.run(lookups())
+    assert all(result == results[0] for result in results)
+    assert state.requests["movie"] == 1
+    assert client.coalesced == 9
+
+
+def test_uncached_lookups_are_coalesced_too(stub):
+    client, state = stub("--latency", "100")
+
+    async def lookups():
+        return await asyncio.gather(*(client.get_json(MOVIE) for _ in range(5)), client.get_json("/movie/551"))
+
+    results = client.run(lookups())
+    assert [result["id"] for result in results] == [550] * 5 + [551]
+    assert state.requests["movie"] == 2
+
+
+def test_cancelled_caller_does_not_cancel_the_shared_fetch(stub):
+    client, state = stub("--latency", "200")
+
+    async def cancel_one():
+        loop = asyncio.get_running_loop()
+        first = loop.create_task(client.get_json(MOVIE, ttl_class="details"))
+        second = loop.create_task(client.get_json(MOVIE, ttl_class="details"))
+        await asyncio.sleep(0.05)
+        first.cancel()
+        return await second
+
+    assert client.run(cancel_one())["id"] == 550
+    assert state.requests["movie"] == 1
+    assert client.cache.get(make_cache_key(MOVIE))[0] == FRESH
+
+
+# ============================================================
+# Rate limiter
+# ============================================================
+
+def test_throttled_requests_cut_the_rate_and_give_up(stub):
+    client, state = stub("--throttle-rate", "1", "--retry-after", "0.05")
+    limiter = client.limiter
+
+    assert client.run(client.get_json(MOVIE)) is None
+    assert state.statuses[429] == TMDB_THROTTLE_RETRIES + 1
+    assert limiter.throttled == TMDB_THROTTLE_RETRIES + 1
+    assert limiter.rate == max(limiter.min_rate, limiter.max_rate * limiter.decrease ** limiter.throttled)
+    # Busy, not down
+    assert client.breaker.state == CLOSED
+
+
+def test_rate_recovers_additively_after_throttling(stub):
+    client, state = stub("--throttle-rate", "1", "--retry-after", "0")
+    limiter = client.limiter
+    client.run(client.get_json(MOVIE))
+    throttled_rate = limiter.rate
+
+    state.args.throttle_rate = 0.0
+    for tmdb_id in range(551, 554):
+        client.run(client.get_json(f"/movie/{tmdb_id}"))
+    assert limiter.rate == pytest.approx(throttled_rate + 3 * limiter.increase)
+
+
+def test_bucket_paces_requests_past_the_burst():
+    limiter = AdaptiveRateLimiter(max_rate=20, burst=2)
+
+    async def take(count):
+        started = time.monotonic()
+        for _ in range(count):
+            async with limiter:
+                pass
+        return time.monotonic() - started
+
+    # The burst is free, the 4 tokens after it come 1/20 s apart
+    assert asyncio.run(take(6)) >= 4 / 20 * 0.9
+
+
+def test_requests_in_flight_are_capped():
+    limiter = AdaptiveRateLimiter(max_rate=1000, max_concurrency=2)
+    in_flight = []
+
+    async def request():
+        async with limiter:
+            in_flight.append(1)
+            peak.append(len(in_flight))
+            await asyncio.sleep(0.02)
+            in_flight.pop()
+
+    async def requests():
+        await asyncio.gather(*(request() for _ in range(6)))
+
+    peak = []
+    asyncio.run(requests())
+    assert max(peak) == 2
+
+
+# ============================================================
+# Conditional revalidation
+# ============================================================
+
+def test_unchanged_response_is_revalidated_with_its_etag(stub):
+    client, state = stub()
+    first = client.run(client.get_json(MOVIE, ttl_class="details"))
+    expire(client, MOVIE)
+
+    async def stale_then_revalidated():
+        assert await client.get_json(MOVIE, ttl_class="details") is first
+        await settle(client)
+
+    client.run(stale_then_revalidated())
+    assert state.statuses[304] == 1
+    assert client.revalidated == 1
+    # The decoded value is kept, its TTL restarted
+    assert client.cache.get(make_cache_key(MOVIE)) == (FRESH, first)
+    assert client.cache.get(make_cache_key(MOVIE))[1] is first
+
+
+def test_changed_response_replaces_the_cached_one(stub):
+    client, state = stub()
+    client.run(client.get_json(MOVIE, ttl_class="details"))
+    key = make_cache_key(MOVIE)
+    # Validator of an older version of the title
+    client.cache._entries[key].etag = '"edited-since"'
+    expire(client, MOVIE, stale=False)
+
+    assert client.run(client.get_json(MOVIE, ttl_class="details"))["id"] == 550
+    assert state.statuses == {200: 2}
+    assert client.revalidated == 0
+    assert client.cache.validators(key)[0] != '"edited-since"'
+
+
+def test_response_evicted_during_revalidation_is_fetched_in_full(stub, monkeypatch):
+    client, state = stub()
+    client.run(client.get_json(MOVIE, ttl_class="details"))
+    expire(client, MOVIE, stale=False)
+    monkeypatch.setattr(client.cache, "refresh", lambda key, ttl_class: None)
+
+    assert client.run(client.get_json(MOVIE, ttl_class="details"))["id"] == 550
+    assert state.statuses == {200: 2, 304: 1}
@@ -1,5 +1,4 @@
 from flask import Flask, render_template
-import os
 from jinja2 import Environment, FileSystemLoader
 
 app = Flask(__name__, template_folder="../app/templates")
@@ -0,0 +1,374 @@
+"""
+Local stand-in for the TMDB API, for offline load testing and benchmarks.
+
+Serves every endpoint used by app/services/api/api_info.py from recorded JSON
+fixtures when available and from deterministic synthetic data otherwise, with
+configurable latency, 5xx error rate and 429 throttling.
+
+Usage:
+    python tests/tmdb_stub.py --port 8001 --latency 40 --jitter 20 --error-rate 0.01 --rate-limit 50
+
+Then point the app at it:
+    TMDB_BASE_URL=http://127.0.0.1:8001/3 python app.py
+
+Images are served at /t/p/{size}/{file} (generated with Pillow when it is
+installed, a tiny fixed JPEG otherwise); point the image proxy at them with
+    TMDB_IMAGE_BASE_URL=http://127.0.0.1:8001/t/p
+
+Fixtures are looked up as <fixtures>/<path>.json, e.g. fixtures/movie/550.json or
+fixtures/trending/all/week.json (query strings are ignored, except for page=N,
+which maps to <path>.page<N>.json). With --record-from, missing fixtures are
+fetched from a real TMDB base URL (using TMDB_API_KEY) and saved.
+"""
+import argparse
+import asyncio
+import base64
+import hashlib
+import io
+import json
+import os
+import random
+import time
+from collections import Counter
+from aiohttp import web, ClientSession
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+GENRES = {
+    28: "Action", 12: "Adventure", 16: "Animation", 35: "Comedy", 80: "Crime",
+    99: "Documentary", 18: "Drama", 10751: "Family", 14: "Fantasy", 36: "History",
+    27: "Horror", 10402: "Music", 9648: "Mystery", 10749: "Romance", 878: "Science Fiction",
+    53: "Thriller", 10752: "War", 37: "Western"
+}
+WORDS = [
+    "Dark", "Last", "Silent", "Golden", "Lost", "Broken", "Hidden", "Wild", "Red", "Endless",
+    "Night", "River", "Empire", "Storm", "Garden", "Signal", "Harbor", "Echo", "Frontier", "Crown"
+]
+RESULTS_PER_PAGE = 20
+TOTAL_PAGES = 10
+CHANGES_PER_PAGE = 100
+CHANGES_PAGES = 3
+IMAGE_ORIGINAL_WIDTH = 1000
+# 2x3 JPEG served for every image when Pillow is not installed
+FALLBACK_JPEG = base64.b64decode(
+    "/9j/4AAQSkZJRgABAQAAAQABAAD/2wBDABALDA4MChAODQ4SERATGCgaGBYWGDEjJR0oOjM9PDkzODdASFxOQERXRTc4UG1RV19iZ2hnPk1xeXBkeFxlZ2P/"
+    "2wBDARESEhgVGC8aGi9jQjhCY2NjY2NjY2NjY2NjY2NjY2NjY2NjY2NjY2NjY2NjY2NjY2NjY2NjY2NjY2NjY2NjY2P/wAARCAADAAIDASIAAhEBAxEB/8QAHwAA"
+    "AQUBAQEBAQEAAAAAAAAAAAECAwQFBgcICQoL/8QAtRAAAgEDAwIEAwUFBAQAAAF9AQIDAAQRBRIhMUEGE1FhByJxFDKBkaEII0KxwRVS0fAkM2JyggkKFhcYGRolJico"
+    "KSo0NTY3ODk6Q0RFRkdISUpTVFVWV1hZWmNkZWZnaGlqc3R1dnd4eXqDhIWGh4iJipKTlJWWl5iZmqKjpKWmp6ipqrKztLW2t7i5usLDxMXGx8jJytLT1NXW19jZ2uHi"
+    "4+Tl5ufo6erx8vP09fb3+Pn6/8QAHwEAAwEBAQEBAQEBAQAAAAAAAAECAwQFBgcICQoL/8QAtREAAgECBAQDBAcFBAQAAQJ3AAECAxEEBSExBhJBUQdhcRMiMoEIFEKR"
+    "obHBCSMzUvAVYnLRChYkNOEl8RcYGRomJygpKjU2Nzg5OkNERUZHSElKU1RVVldYWVpjZGVmZ2hpanN0dXZ3eHl6goOEhYaHiImKkpOUlZaXmJmaoqOkpaanqKmqsrO0"
+    "tba3uLm6wsPExcbHyMnK0tPU1dbX2Nna4uPk5ebn6Onq8vP09fb3+Pn6/9oADAMBAAIRAxEAPwDFooorsNT/2Q=="
+)
+
+
+# ============================================================
+# Synthetic data
+# ============================================================
+
+def _rng(*parts) -> random.Random:
+    return random.Random("/".join(str(p) for p in parts))
+
+def _title_name(rng: random.Random, prefix: str = None) -> str:
+    words = rng.sample(WORDS, 2)
+    if prefix:
+        words[0] = prefix.title()
+    return f"The {words[0]} {words[1]}" if rng.random() < 0.3 else f"{words[0]} {words[1]}"
+
+def synthetic_title(media_type: str, tmdb_id: int, detailed: bool = False, name_prefix: str = None) -> dict:
+    """Deterministic title record shaped like TMDB's list items (or details with detailed=True)."""
+    rng = _rng(media_type, tmdb_id, name_prefix)
+    name = _title_name(rng, name_prefix)
+    genre_ids = rng.sample(sorted(GENRES), rng.randint(1, 3))
+    date = f"{rng.randint(1960, 2025)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}"
+
+    item = {
+        "adult": False,
+        "id": tmdb_id,
+        "overview": " ".join(rng.choice(WORDS).lower() for _ in range(60)).capitalize() + ".",
+        "poster_path": f"/{hashlib.md5(f'p{media_type}{tmdb_id}'.encode()).hexdigest()[:27]}.jpg",
+        "backdrop_path": f"/{hashlib.md5(f'b{media_type}{tmdb_id}'.encode()).hexdigest()[:27]}.jpg",
+        "genre_ids": genre_ids,
+        "original_language": rng.choice(["en", "en", "en", "fr", "ja", "ko", "es"]),
+        "popularity": round(rng.uniform(1, 500), 3),
+        "vote_average": round(rng.uniform(3, 9), 1),
+        "vote_count": rng.randint(0, 30000),
+        "media_type": media_type,
+    }
+    if media_type == "movie":
+        item.update(title=name, original_title=name, release_date=date, video=False)
+    else:
+        item.update(name=name, original_name=name, first_air_date=date, origin_country=["US"])
+
+    if not detailed:
+        return item
+
+    # Details payloads carry genres objects and no media_type
+    del item["genre_ids"], item["media_type"]
+    item["genres"] = [{"id": g, "name": GENRES[g]} for g in genre_ids]
+    item["production_companies"] = [
+        {"id": rng.randint(1, 99999), "name": f"{rng.choice(WORDS)} Pictures", "logo_path": None, "origin_country": "US"}
+        for _ in range(rng.randint(1, 4))
+    ]
+    item["spoken_languages"] = [{"english_name": "English", "iso_639_1": "en", "name": "English"}]
+    item["status"] = "Released"
+    item["tagline"] = f"{rng.choice(WORDS)} {rng.choice(WORDS).lower()}."
+    if media_type == "movie":
+        item["runtime"] = rng.randint(80, 180)
+        item["imdb_id"] = f"tt{tmdb_id:07d}"
+    else:
+        seasons_count = rng.randint(1, 8)
+        item["number_of_seasons"] = seasons_count
+        item["number_of_episodes"] = seasons_count * 10
+        item["episode_run_time"] = [rng.randint(20, 60)]
+        item["seasons"] = [
+            {
+                "id": tmdb_id * 100 + n,
+                "season_number": n,
+                "name": "Specials" if n == 0 else f"Season {n}",
+                "episode_count": 10,
+                "air_date": date,
+                "overview": "",
+                "poster_path": None
+            }
+            for n in range(0, seasons_count + 1)
+        ]
+    return item
+
+def synthetic_page(seed: str, media_type: str, page: int, name_prefix: str = None) -> dict:
+    """A page of list results; media_type 'all' mixes movies and series."""
+    rng = _rng(seed, page)
+    results = []
+    for _ in range(RESULTS_PER_PAGE):
+        item_type = media_type if media_type in ("movie", "tv") else rng.choice(["movie", "tv"])
+        results.append(synthetic_title(item_type, rng.randint(1, 999999), name_prefix=name_prefix))
+    return {
+        "page": page,
+        "results": results,
+        "total_pages": TOTAL_PAGES,
+        "total_results": TOTAL_PAGES * RESULTS_PER_PAGE
+    }
+
+
+def synthetic_changes(media_type: str, start_date: str, end_date: str, page: int) -> dict:
+    """A page of the changes feed (low ids, so a test can cache some of them first)."""
+    rng = _rng("changes", media_type, start_date, end_date, page)
+    return {
+        "page": page,
+        "results": [{"id": rng.randint(1, 5000), "adult": False} for _ in range(CHANGES_PER_PAGE)],
+        "total_pages": CHANGES_PAGES,
+        "total_results": CHANGES_PAGES * CHANGES_PER_PAGE
+    }
+
+
+def synthetic_payload(path: str, query) -> dict:
+    """Build the synthetic response for an API path (without the /3 prefix), or None for 404."""
+    parts = [p for p in path.split("/") if p]
+    page = int(query.get("page", 1))
+
+    # /trending/{media_type}/{time_window}
+    if len(parts) == 3 and parts[0] == "trending":
+        return synthetic_page(path, parts[1], page)
+    # /search/{multi|movie|tv}?query=
+    if len(parts) == 2 and parts[0] == "search":
+        q = query.get("query", "").strip()
+        if not q:
+            return {"page": 1, "results": [], "total_pages": 0, "total_results": 0}
+        return synthetic_page(f"{path}?{q.lower()}", parts[1], page, name_prefix=q.split()[0])
+
+    if not parts or parts[0] not in ("movie", "tv"):
+        return None
+    media_type = parts[0]
+
+    # /{media_type}/popular, /{media_type}/top_rated
+    if len(parts) == 2 and parts[1] in ("popular", "top_rated"):
+        return synthetic_page(path, media_type, page)
+    # /{media_type}/changes?start_date=&end_date=
+    if len(parts) == 2 and parts[1] == "changes":
+        return synthetic_changes(media_type, query.get("start_date", ""), query.get("end_date", ""), page)
+    if len(parts) < 2 or not parts[1].isdigit():
+        return None
+    tmdb_id = int(parts[1])
+
+    # /{media_type}/{id}
+    if len(parts) == 2:
+        payload = synthetic_title(media_type, tmdb_id, detailed=True)
+        if "external_ids" in query.get("append_to_response", "").split(","):
+            payload["external_ids"] = {"imdb_id": f"tt{tmdb_id:07d}"}
+        return payload
+    # /{media_type}/{id}/external_ids
+    if parts[2] == "external_ids":
+        return {"id": tmdb_id, "imdb_id": f"tt{tmdb_id:07d}"}
+    # /{media_type}/{id}/similar, /{media_type}/{id}/recommendations
+    if parts[2] in ("similar", "recommendations"):
+        return synthetic_page(path, media_type, page)
+    return None
+
+def synthetic_image(size: str, filename: str) -> bytes:
+    """Deterministic 2:3 JPEG for an image path; 'original' is IMAGE_ORIGINAL_WIDTH wide, 'wN' is N wide."""
+    if Image is None:
+        return FALLBACK_JPEG
+    width = IMAGE_ORIGINAL_WIDTH if size == "original" else int(size.lstrip("w") or IMAGE_ORIGINAL_WIDTH)
+    rng = _rng("image", filename)
+    top = tuple(rng.randint(0, 255) for _ in range(3))
+    bottom = tuple(rng.randint(0, 255) for _ in range(3))
+    gradient = Image.linear_gradient("L").resize((width, width * 3 // 2))
+    img = Image.composite(Image.new("RGB", gradient.size, bottom), Image.new("RGB", gradient.size, top), gradient)
+    out = io.BytesIO()
+    img.save(out, "JPEG", quality=85)
+    return out.getvalue()
+
+
+# ============================================================
+# Server
+# ============================================================
+
+class StubState:
+
+    def __init__(self, args):
+        self.args = args
+        self.rng = random.Random(args.seed)
+        self.requests = Counter()
+        self.statuses = Counter()
+        self.tokens = float(args.rate_limit or 0)
+        self.tokens_updated = time.monotonic()
+        self.upstream = None
+
+    def allow(self) -> bool:
+        """Token bucket emulating TMDB's per-IP rate limit."""
+        if not self.args.rate_limit:
+            return True
+        now = time.monotonic()
+        self.tokens = min(self.args.rate_limit, self.tokens + (now - self.tokens_updated) * self.args.rate_limit)
+        self.tokens_updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+
+    def fixture_path(self, path: str, query) -> str:
+        if not self.args.fixtures:
+            return None
+        name = path.strip("/") or "index"
+        page = query.get("page")
+        if page and page != "1":
+            name += f".page{page}"
+        return os.path.join(self.args.fixtures, f"{name}.json")
+
+    async def load(self, path: str, query):
+        """Return (payload bytes or None) from fixtures, the recording upstream or synthetic data."""
+        fixture = self.fixture_path(path, query)
+        if fixture and os.path.exists(fixture):
+            with open(fixture, "rb") as f:
+                return f.read()
+
+        if self.args.record_from:
+            body = await self.record(path, query, fixture)
+            if body is not None:
+                return body
+
+        payload = synthetic_payload(path, query)
+        return json.dumps(payload).encode() if payload is not None else None
+
+    async def record(self, path: str, query, fixture: str):
+        if self.upstream is None:
+            self.upstream = ClientSession()
+        params = dict(query)
+        params["api_key"] = os.getenv("TMDB_API_KEY", "")
+        async with self.upstream.get(f"{self.args.record_from.rstrip('/')}{path}", params=params) as resp:
+            if resp.status != 200:
+                return None
+            body = await resp.read()
+        if fixture:
+            os.makedirs(os.path.dirname(fixture), exist_ok=True)
+            with open(fixture, "wb") as f:
+                f.write(body)
+        return body
+
+
+async def handle(request: web.Request) -> web.Response:
+    state: StubState = request.app["state"]
+    args = state.args
+    path = "/" + request.match_info["path"]
+    state.requests[path.split("/")[1] if path.count("/") > 1 else path] += 1
+
+    def respond(status: int, **kwargs):
+        state.statuses[status] += 1
+        return web.Response(status=status, **kwargs)
+
+    # Latency
+    delay = args.latency + (state.rng.uniform(-args.jitter, args.jitter) if args.jitter else 0)
+    if delay > 0:
+        await asyncio.sleep(delay / 1000)
+
+    # Injected failures
+    if not state.allow() or state.rng.random() < args.throttle_rate:
+        return respond(429, headers={"Retry-After": str(args.retry_after)}, text='{"status_code":25}', content_type="application/json")
+    if state.rng.random() < args.error_rate:
+        return respond(503, text='{"status_code":9}', content_type="application/json")
+
+    body = await state.load(path, request.query)
+    if body is None:
+        return respond(404, text='{"status_code":34}', content_type="application/json")
+
+    etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+    if request.headers.get("If-None-Match") == etag:
+        return respond(304, headers={"ETag": etag})
+    return respond(200, body=body, headers={"ETag": etag, "Cache-Control": "public, max-age=60"}, content_type="application/json")
+
+
+async def image(request: web.Request) -> web.Response:
+    state: StubState = request.app["state"]
+    size, filename = request.match_info["size"], request.match_info["file"]
+    state.requests["images"] += 1
+    if not (size == "original" or size[1:].isdigit()):
+        state.statuses[404] += 1
+        return web.Response(status=404)
+    if state.args.latency:
+        await asyncio.sleep(state.args.latency / 1000)
+    state.statuses[200] += 1
+    return web.Response(body=synthetic_image(size, filename), content_type="image/jpeg")
+
+
+async def stats(request: web.Request) -> web.Response:
+    state: StubState = request.app["state"]
+    return web.json_response({"requests": state.requests, "statuses": {str(k): v for k, v in state.statuses.items()}})
+
+
+def create_stub_app(args) -> web.Application:
+    app = web.Application()
+    app["state"] = StubState(args)
+    app.router.add_get("/__stats", stats)
+    app.router.add_get("/3/{path:.*}", handle)
+    app.router.add_get("/t/p/{size}/{file}", image)
+
+    async def close_upstream(app):
+        if app["state"].upstream is not None:
+            await app["state"].upstream.close()
+
+    app.on_cleanup.append(close_upstream)
+    return app
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Local TMDB API stand-in")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--fixtures", default=None, help="Directory with recorded JSON fixtures")
+    parser.add_argument("--record-from", default=None, help="Real API base URL to record missing fixtures from")
+    parser.add_argument("--latency", type=float, default=0.0, help="Mean added latency (ms)")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Latency jitter (+/- ms)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with 503")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="Fraction of requests answered with 429")
+    parser.add_argument("--rate-limit", type=float, default=0.0, help="Requests/s above which 429 is returned (0 = off)")
+    parser.add_argument("--retry-after", type=float, default=1.0, help="Retry-After seconds sent with 429")
+    parser.add_argument("--seed", type=int, default=0)
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    print(f"TMDB stub listening on http://{args.host}:{args.port}/3 (stats at /__stats)")
+    web.run_app(create_stub_app(args), host=args.host, port=args.port, print=None)